@@ -6,6 +6,12 @@ from database import init_database
 from routes.tasks import tasks_bp
 from routes.appointments import appointments_bp
 from routes.dashboard import dashboard_bp
+from routes.search import search_bp
+from routes.sync import sync_bp
+from routes.events import events_bp
+from routes.transfer import transfer_bp
+from routes.system import system_bp
+from utils.archiver import start_archiver
 from utils.logger import setup_logger
 import config
 
@@ -20,6 +26,11 @@ app.config['SECRET_KEY'] = config.SECRET_KEY
 app.register_blueprint(tasks_bp)
 app.register_blueprint(appointments_bp)
 app.register_blueprint(dashboard_bp)
+app.register_blueprint(search_bp)
+app.register_blueprint(sync_bp)
+app.register_blueprint(events_bp)
+app.register_blueprint(transfer_bp)
+app.register_blueprint(system_bp)
 
 @app.route('/')
 def index():
@@ -43,6 +54,9 @@ if __name__ == '__main__':
     logger.info("Iniciando aplicação...")
     init_database()
     
+    # Arquivamento periódico de tarefas concluídas (se configurado)
+    start_archiver()
+    
     # Iniciar servidor
     logger.info(f"Servidor rodando em http://{config.HOST}:{config.PORT}")
     app.run(
@@ -12,6 +12,71 @@ DEBUG = os.environ.get('FLASK_DEBUG', '0') == '1'
 HOST = os.environ.get('FLASK_HOST', '127.0.0.1')
 PORT = int(os.environ.get('FLASK_PORT', 5000))
 
+# Configurações do Banco de Dados
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 8))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))  # segundos
+
+# Group commit: mutações enviadas a uma única thread escritora e agrupadas por transação
+DB_GROUP_COMMIT = os.environ.get('DB_GROUP_COMMIT', '0') == '1'
+DB_WRITER_MAX_BATCH = int(os.environ.get('DB_WRITER_MAX_BATCH', 500))
+
+# Paginação das listagens
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', 100))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 1000))
+
+# Cartões por coluna na carga do quadro kanban (/api/tasks/board)
+BOARD_COLUMN_SIZE = int(os.environ.get('BOARD_COLUMN_SIZE', 50))
+
+# Itens por página (consulta própria) nas respostas em streaming
+STREAM_BATCH_SIZE = int(os.environ.get('STREAM_BATCH_SIZE', 500))
+
+# Horizontes dos itens urgentes do dashboard (em dias)
+URGENT_DEADLINE_DAYS = int(os.environ.get('URGENT_DEADLINE_DAYS', 3))
+UPCOMING_APPOINTMENT_DAYS = int(os.environ.get('UPCOMING_APPOINTMENT_DAYS', 2))  # hoje e amanhã
+
+# Maior intervalo aceito pelos endpoints de calendário (em dias)
+CALENDAR_MAX_RANGE_DAYS = int(os.environ.get('CALENDAR_MAX_RANGE_DAYS', 366))
+
+# Limite de operações por requisição nos endpoints de lote
+BULK_MAX_OPERATIONS = int(os.environ.get('BULK_MAX_OPERATIONS', 10000))
+
+# Registros gravados por transação na importação (/api/import)
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 1000))
+
+# Arquivamento de tarefas concluídas (tarefas_arquivo): idade mínima da conclusão
+# em dias, tarefas por transação e intervalo da execução em segundo plano
+# (em segundos; 0 desativa, deixando o arquivamento para o manage.py)
+TASK_ARCHIVE_DAYS = int(os.environ.get('TASK_ARCHIVE_DAYS', 365))
+TASK_ARCHIVE_BATCH_SIZE = int(os.environ.get('TASK_ARCHIVE_BATCH_SIZE', 1000))
+TASK_ARCHIVE_INTERVAL = float(os.environ.get('TASK_ARCHIVE_INTERVAL', 0))
+
+# Retenção do registro de exclusões usado por /api/sync (em dias)
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+
+# Feed de eventos (SSE): eventos mantidos no banco, intervalo de verificação,
+# eventos em memória por processo e intervalo do heartbeat
+EVENT_LOG_RETENTION = int(os.environ.get('EVENT_LOG_RETENTION', 10000))
+EVENTS_POLL_INTERVAL = float(os.environ.get('EVENTS_POLL_INTERVAL', 0.5))  # segundos
+EVENTS_BUFFER_SIZE = int(os.environ.get('EVENTS_BUFFER_SIZE', 1000))
+EVENTS_HEARTBEAT = float(os.environ.get('EVENTS_HEARTBEAT', 15))  # segundos
+# Assinantes simultâneos do feed por processo: cada um ocupa uma thread do
+# servidor WSGI enquanto estiver conectado, então o limite deve ficar abaixo
+# do número de threads do servidor; acima dele /api/events responde 503
+EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('EVENTS_MAX_SUBSCRIBERS', 32))
+
+# Cache de respostas GET (entradas; 0 desativa)
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 256))
+
+# PRAGMAs aplicados a cada conexão no momento da abertura
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -20000)),  # negativo = KiB (~20 MB)
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),  # ms
+    'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+
 # Constantes de Negócio
 class TaskStatus(str, Enum):
     PENDENTE = 'pendente'
@@ -1,36 +1,853 @@
 """
 Gerenciamento de banco de dados SQLite
 """
+import os
+import queue
 import sqlite3
+import threading
+import time
+from concurrent.futures import Future
 from contextlib import contextmanager
-from typing import Generator, Any, List, Optional, Union, Tuple
+from typing import Callable, Generator, Any, Dict, List, Optional, Union, Tuple, TypeVar
 import config
 from utils.logger import setup_logger
+from utils.ranking import keys_after
 
 logger = setup_logger(__name__)
 
+T = TypeVar('T')
+
+def _open_connection(database_path: str, pragmas: Dict[str, Any], **kwargs: Any) -> sqlite3.Connection:
+    """Abre uma nova conexão aplicando o perfil de PRAGMAs"""
+    conn = sqlite3.connect(
+        database_path,
+        timeout=pragmas.get('busy_timeout', 5000) / 1000,
+        check_same_thread=False,
+        **kwargs
+    )
+    conn.row_factory = sqlite3.Row  # Permite acessar colunas por nome
+    for name, value in pragmas.items():
+        conn.execute(f'PRAGMA {name} = {value}')
+    return conn
+
+def open_connection(database_path: Optional[str] = None) -> sqlite3.Connection:
+    """
+    Abre uma conexão avulsa, fora do pool, com o perfil de PRAGMAs configurado
+
+    Para threads de longa duração (ex.: a verificação do feed de eventos)
+    que não devem ocupar uma das conexões do pool.
+
+    Args:
+        database_path: Caminho do banco (padrão config.DATABASE_PATH)
+    """
+    return _open_connection(database_path or config.DATABASE_PATH, config.SQLITE_PRAGMAS)
+
+class ConnectionPool:
+    """
+    Pool limitado de conexões SQLite reaproveitadas entre requisições
+
+    As conexões são abertas sob demanda até ``max_size`` e recebem o perfil
+    de PRAGMAs configurado no momento da abertura.
+    """
+
+    def __init__(self, database_path: str, max_size: int, timeout: float,
+                 pragmas: Optional[Dict[str, Any]] = None):
+        self.database_path = database_path
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self.pragmas = pragmas or {}
+        self.pid = os.getpid()
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._acquisitions = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Obtém uma conexão do pool, abrindo uma nova se houver capacidade
+
+        Raises:
+            sqlite3.OperationalError: Se nenhuma conexão ficar livre dentro do timeout
+        """
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+
+        if conn is None:
+            with self._lock:
+                can_open = self._opened < self.max_size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    conn = _open_connection(self.database_path, self.pragmas)
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                start = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise sqlite3.OperationalError(
+                        f"Nenhuma conexão livre no pool após {self.timeout}s"
+                    )
+                waited = time.perf_counter() - start
+                with self._lock:
+                    self._waits += 1
+                    self._total_wait += waited
+                    self._max_wait = max(self._max_wait, waited)
+
+        with self._lock:
+            self._acquisitions += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection, discard: bool = False) -> None:
+        """Devolve uma conexão ao pool (ou a descarta se estiver inutilizável)"""
+        if not discard and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
+
+        if discard:
+            with self._lock:
+                self._opened -= 1
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            return
+
+        self._idle.put(conn)
+
+    def close_all(self) -> None:
+        """Fecha todas as conexões ociosas"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._opened -= 1
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna estatísticas de tamanho e tempo de espera do pool"""
+        with self._lock:
+            idle = self._idle.qsize()
+            return {
+                'max_size': self.max_size,
+                'abertas': self._opened,
+                'ociosas': idle,
+                'em_uso': self._opened - idle,
+                'aquisicoes': self._acquisitions,
+                'esperas': self._waits,
+                'timeouts': self._timeouts,
+                'espera_total_ms': round(self._total_wait * 1000, 3),
+                'espera_media_ms': round(self._total_wait * 1000 / self._waits, 3) if self._waits else 0.0,
+                'espera_max_ms': round(self._max_wait * 1000, 3),
+            }
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """
+    Retorna o pool de conexões do processo atual, criando-o sob demanda
+
+    Um novo pool é criado após um fork para que processos filhos nunca
+    compartilhem conexões abertas pelo processo pai.
+    """
+    global _pool
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid() and pool.database_path == config.DATABASE_PATH:
+        return pool
+
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid() and _pool.database_path == config.DATABASE_PATH:
+            return _pool
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close_all()
+        _pool = ConnectionPool(
+            config.DATABASE_PATH,
+            max_size=config.DB_POOL_SIZE,
+            timeout=config.DB_POOL_TIMEOUT,
+            pragmas=config.SQLITE_PRAGMAS
+        )
+        logger.info(f"Pool de conexões criado (max_size={_pool.max_size})")
+        return _pool
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Retorna estatísticas do pool de conexões"""
+    return get_pool().stats()
+
+def close_pool() -> None:
+    """Fecha as conexões ociosas do pool atual"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool.pid == os.getpid():
+            _pool.close_all()
+        _pool = None
+
+class GroupCommitWriter:
+    """
+    Thread escritora única que agrupa as mutações enfileiradas (group commit)
+
+    Cada mutação é uma função que recebe a conexão do escritor. Tudo o que
+    estiver na fila quando a thread acorda é aplicado em uma só transação,
+    com um SAVEPOINT por item para que a falha de um não desfaça os demais.
+    O resultado de cada item é entregue ao chamador por um ``Future`` somente
+    após o COMMIT.
+    """
+
+    _STOP = object()
+
+    def __init__(self, database_path: str, pragmas: Optional[Dict[str, Any]] = None,
+                 max_batch: int = 500):
+        self.database_path = database_path
+        self.pragmas = pragmas or {}
+        self.max_batch = max(1, max_batch)
+        self.pid = os.getpid()
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._failures = 0
+        self._last_batch = 0
+        self._max_batch_seen = 0
+
+        self._thread = threading.Thread(target=self._run, name='sqlite-group-commit', daemon=True)
+        self._thread.start()
+
+    def submit(self, func: Callable[[sqlite3.Connection], T]) -> "Future[T]":
+        """Enfileira uma mutação e retorna o Future com seu resultado"""
+        future: "Future[T]" = Future()
+        self._queue.put((func, future))
+        return future
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Processa o que estiver pendente e encerra a thread escritora"""
+        self._queue.put(self._STOP)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            conn = _open_connection(self.database_path, self.pragmas, isolation_level=None)
+        except sqlite3.Error as e:
+            logger.critical(f"Escritor não conseguiu abrir o banco: {e}")
+            while True:
+                item = self._queue.get()
+                if item is self._STOP:
+                    return
+                item[1].set_exception(e)
+
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._STOP:
+                    break
+
+                batch = [item]
+                stop = False
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is self._STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+
+                self._apply(conn, batch)
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _apply(self, conn: sqlite3.Connection, batch: List[Tuple[Callable, Future]]) -> None:
+        """Aplica um lote de mutações em uma única transação"""
+        outcomes = []
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for func, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute('SAVEPOINT item')
+                try:
+                    outcomes.append((future, func(conn), None))
+                    conn.execute('RELEASE item')
+                except Exception as e:
+                    conn.execute('ROLLBACK TO item')
+                    conn.execute('RELEASE item')
+                    outcomes.append((future, None, e))
+            conn.execute('COMMIT')
+        except Exception as e:
+            logger.error(f"Erro ao aplicar lote de escrita: {e}")
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            for func, future in batch:
+                if future.running():
+                    future.set_exception(e)
+            with self._lock:
+                self._failures += 1
+            return
+
+        with self._lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._last_batch = len(batch)
+            self._max_batch_seen = max(self._max_batch_seen, len(batch))
+
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna profundidade da fila e métricas de tamanho de lote"""
+        with self._lock:
+            return {
+                'fila': self._queue.qsize(),
+                'lotes': self._batches,
+                'itens': self._items,
+                'falhas': self._failures,
+                'lote_medio': round(self._items / self._batches, 2) if self._batches else 0.0,
+                'ultimo_lote': self._last_batch,
+                'maior_lote': self._max_batch_seen,
+            }
+
+_writer: Optional[GroupCommitWriter] = None
+_writer_lock = threading.Lock()
+
+def get_writer() -> GroupCommitWriter:
+    """Retorna a thread escritora do processo atual, criando-a sob demanda"""
+    global _writer
+    writer = _writer
+    if writer is not None and writer.pid == os.getpid() and writer.database_path == config.DATABASE_PATH:
+        return writer
+
+    with _writer_lock:
+        if _writer is not None and _writer.pid == os.getpid() and _writer.database_path == config.DATABASE_PATH:
+            return _writer
+        if _writer is not None and _writer.pid == os.getpid():
+            _writer.stop()
+        _writer = GroupCommitWriter(
+            config.DATABASE_PATH,
+            pragmas=config.SQLITE_PRAGMAS,
+            max_batch=config.DB_WRITER_MAX_BATCH
+        )
+        logger.info("Escritor com group commit iniciado")
+        return _writer
+
+def get_writer_stats() -> Optional[Dict[str, Any]]:
+    """Retorna métricas da thread escritora (None se o group commit estiver desativado)"""
+    if not config.DB_GROUP_COMMIT:
+        return None
+    return get_writer().stats()
+
+def execute_write(func: Callable[[sqlite3.Connection], T]) -> T:
+    """
+    Executa uma função de escrita em uma transação
+
+    Com ``config.DB_GROUP_COMMIT`` ativo a função é enviada à thread
+    escritora e agrupada com as demais mutações pendentes; caso contrário
+    roda em uma conexão do pool dentro de uma transação IMMEDIATE própria.
+
+    Args:
+        func: Função que recebe a conexão e executa as escritas
+
+    Returns:
+        O valor retornado por func
+    """
+    if config.DB_GROUP_COMMIT:
+        return get_writer().submit(func).result()
+
+    with get_db_connection() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        return func(conn)
+
+def execute_read(func: Callable[[sqlite3.Connection], T]) -> T:
+    """
+    Executa uma função de leitura dentro de uma única transação, para que
+    todas as consultas vejam o mesmo estado do banco
+
+    Args:
+        func: Função que recebe a conexão e executa as consultas
+
+    Returns:
+        O valor retornado por func
+    """
+    with get_db_connection() as conn:
+        conn.execute('BEGIN')
+        return func(conn)
+
 @contextmanager
 def get_db_connection() -> Generator[sqlite3.Connection, None, None]:
     """
-    Context manager para conexão com o banco de dados
+    Context manager para conexão com o banco de dados (obtida do pool)
     
     Yields:
         sqlite3.Connection: Conexão com o banco
     """
-    conn = None
+    pool = get_pool()
+    conn = pool.acquire()
+    discard = False
     try:
-        conn = sqlite3.connect(config.DATABASE_PATH)
-        conn.row_factory = sqlite3.Row  # Permite acessar colunas por nome
         yield conn
         conn.commit()
     except sqlite3.Error as e:
-        if conn:
+        try:
             conn.rollback()
+        except sqlite3.Error:
+            discard = True
         logger.error(f"Erro no banco de dados: {e}")
         raise
+    except BaseException:
+        try:
+            conn.rollback()
+        except sqlite3.Error:
+            discard = True
+        raise
     finally:
-        if conn:
-            conn.close()
+        pool.release(conn, discard=discard)
+
+# Posição de cada prioridade na ordenação das tarefas (urgente primeiro)
+PRIORITY_RANK_SQL = (
+    "CASE prioridade WHEN 'urgente' THEN 1 WHEN 'alta' THEN 2 "
+    "WHEN 'media' THEN 3 ELSE 4 END"
+)
+
+def _ensure_column(cursor: sqlite3.Cursor, table: str, column: str, definition: str) -> None:
+    """Adiciona uma coluna a uma tabela existente, se ela ainda não existir"""
+    columns = {row[1] for row in cursor.execute(f'PRAGMA table_xinfo({table})')}
+    if column not in columns:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition.strip()}')
+        logger.info(f"Coluna {table}.{column} adicionada")
+
+# Contadores do dashboard: escopo -> (tabela, coluna da chave ou None para o total, consulta de reconstrução)
+STAT_COUNTERS = {
+    'tarefas': ('tarefas', None, "SELECT 'total', COUNT(*) FROM tarefas"),
+    'tarefas_status': ('tarefas', 'status', 'SELECT status, COUNT(*) FROM tarefas GROUP BY status'),
+    'tarefas_prioridade': ('tarefas', 'prioridade', 'SELECT prioridade, COUNT(*) FROM tarefas GROUP BY prioridade'),
+    'tarefas_categoria': ('tarefas', 'categoria', 'SELECT categoria, COUNT(*) FROM tarefas GROUP BY categoria'),
+    # Tarefas arquivadas, somadas às ativas nas estatísticas do dashboard
+    'tarefas_arquivo': ('tarefas_arquivo', None, "SELECT 'total', COUNT(*) FROM tarefas_arquivo"),
+    'tarefas_arquivo_status': ('tarefas_arquivo', 'status',
+                               'SELECT status, COUNT(*) FROM tarefas_arquivo GROUP BY status'),
+    'tarefas_arquivo_prioridade': ('tarefas_arquivo', 'prioridade',
+                                   'SELECT prioridade, COUNT(*) FROM tarefas_arquivo GROUP BY prioridade'),
+    'tarefas_arquivo_categoria': ('tarefas_arquivo', 'categoria',
+                                  'SELECT categoria, COUNT(*) FROM tarefas_arquivo GROUP BY categoria'),
+    'compromissos': ('compromissos', None, "SELECT 'total', COUNT(*) FROM compromissos"),
+    'compromissos_dia': ('compromissos', 'data', 'SELECT data, COUNT(*) FROM compromissos GROUP BY data'),
+}
+
+def _counter_increment(scope: str, key: str) -> str:
+    """SQL que soma 1 ao contador (escopo, chave), criando-o se necessário"""
+    return (f"INSERT INTO estatisticas_contadores (escopo, chave, total) VALUES ('{scope}', {key}, 1) "
+            f"ON CONFLICT (escopo, chave) DO UPDATE SET total = total + 1;")
+
+def _counter_decrement(scope: str, key: str) -> str:
+    """SQL que subtrai 1 do contador (escopo, chave), removendo-o ao chegar a zero"""
+    return (f"UPDATE estatisticas_contadores SET total = total - 1 WHERE escopo = '{scope}' AND chave = {key};\n"
+            f"DELETE FROM estatisticas_contadores WHERE escopo = '{scope}' AND chave = {key} AND total <= 0;")
+
+def _create_counter_triggers(cursor: sqlite3.Cursor) -> bool:
+    """
+    Cria os triggers que mantêm estatisticas_contadores em dia
+    
+    Returns:
+        True se algum trigger foi criado agora (os contadores dessa tabela
+        precisam ser recalculados)
+    """
+    existing = {row[0] for row in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_%_contadores_%'"
+    )}
+    created = False
+    for table in sorted({source[0] for source in STAT_COUNTERS.values()}):
+        created = created or f'trg_{table}_contadores_insert' not in existing
+        scopes = [(scope, column) for scope, (src, column, _) in STAT_COUNTERS.items() if src == table]
+        columns = [column for _, column in scopes if column]
+        
+        def key(column: Optional[str], prefix: str) -> str:
+            return f'{prefix}.{column}' if column else "'total'"
+        
+        on_insert = '\n'.join(_counter_increment(scope, key(column, 'new')) for scope, column in scopes)
+        on_delete = '\n'.join(_counter_decrement(scope, key(column, 'old')) for scope, column in scopes)
+        on_update = '\n'.join(
+            _counter_decrement(scope, key(column, 'old')) + '\n' + _counter_increment(scope, key(column, 'new'))
+            for scope, column in scopes if column
+        )
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_contadores_insert AFTER INSERT ON {table}
+            BEGIN
+                {on_insert}
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_contadores_delete AFTER DELETE ON {table}
+            BEGIN
+                {on_delete}
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_contadores_update
+            AFTER UPDATE OF {', '.join(columns)} ON {table}
+            BEGIN
+                {on_update}
+            END
+        ''')
+    return created
+
+def _expected_stat_counters(cursor: sqlite3.Cursor) -> Dict[Tuple[str, str], int]:
+    """Recalcula todos os contadores a partir das tabelas de origem"""
+    expected = {}
+    for scope, (_, _, query) in STAT_COUNTERS.items():
+        for key, total in cursor.execute(query):
+            if total:
+                expected[(scope, key)] = total
+    return expected
+
+def _rebuild_stat_counters(cursor: sqlite3.Cursor) -> None:
+    """Substitui o conteúdo de estatisticas_contadores pelos valores recalculados"""
+    cursor.execute('DELETE FROM estatisticas_contadores')
+    cursor.executemany(
+        'INSERT INTO estatisticas_contadores (escopo, chave, total) VALUES (?, ?, ?)',
+        [(scope, key, total) for (scope, key), total in _expected_stat_counters(cursor).items()]
+    )
+
+def check_stat_counters() -> List[Dict[str, Any]]:
+    """
+    Compara os contadores materializados com as tabelas de origem
+    
+    Returns:
+        Lista de divergências ({'escopo', 'chave', 'esperado', 'atual'}); vazia se consistente
+    """
+    with get_db_connection() as conn:
+        conn.execute('BEGIN')  # Leitura consistente das duas fontes
+        expected = _expected_stat_counters(conn.cursor())
+        actual = {
+            (row['escopo'], row['chave']): row['total']
+            for row in conn.execute('SELECT escopo, chave, total FROM estatisticas_contadores')
+        }
+    
+    return [
+        {'escopo': scope, 'chave': key, 'esperado': expected.get((scope, key), 0),
+         'atual': actual.get((scope, key), 0)}
+        for scope, key in sorted(set(expected) | set(actual))
+        if expected.get((scope, key), 0) != actual.get((scope, key), 0)
+    ]
+
+def rebuild_stat_counters() -> None:
+    """Reconstrói os contadores materializados do dashboard"""
+    def _apply(conn: sqlite3.Connection) -> None:
+        _rebuild_stat_counters(conn.cursor())
+    
+    execute_write(_apply)
+    logger.info("Contadores de estatísticas reconstruídos")
+
+def get_stat_counters(scopes: Union[List[str], Tuple[str, ...]]) -> Dict[str, Dict[str, int]]:
+    """
+    Lê os contadores materializados de um ou mais escopos
+    
+    Returns:
+        Dicionário escopo -> {chave: total}
+    """
+    placeholders = ', '.join('?' * len(scopes))
+    rows = execute_query(
+        f'SELECT escopo, chave, total FROM estatisticas_contadores WHERE escopo IN ({placeholders})',
+        list(scopes)
+    )
+    counters: Dict[str, Dict[str, int]] = {scope: {} for scope in scopes}
+    for row in rows:
+        counters[row['escopo']][row['chave']] = row['total']
+    return counters
+
+# Colunas indexadas pela busca textual de cada tabela (tabela FTS5 <tabela>_fts)
+FTS_COLUMNS = {
+    'tarefas': ('titulo', 'descricao', 'categoria', 'palavra_chave', 'observacoes'),
+    'tarefas_arquivo': ('titulo', 'descricao', 'categoria', 'palavra_chave', 'observacoes'),
+    'compromissos': ('titulo', 'assunto_principal', 'palavra_chave', 'notas_reuniao'),
+}
+
+def _create_fts_index(cursor: sqlite3.Cursor, table: str, columns: Tuple[str, ...]) -> None:
+    """
+    Cria a tabela FTS5 de conteúdo externo de uma tabela e os triggers que
+    a mantêm sincronizada (reconstruindo o índice na primeira criação)
+    """
+    fts = f'{table}_fts'
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts,)
+    ).fetchone()
+    
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    
+    cursor.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+            {cols},
+            content='{table}', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table}
+        BEGIN
+            INSERT INTO {fts} (rowid, {cols}) VALUES (new.id, {new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_{fts}_update AFTER UPDATE OF {cols} ON {table}
+        BEGIN
+            INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO {fts} (rowid, {cols}) VALUES (new.id, {new_values});
+        END
+    ''')
+    
+    if not exists:
+        cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+        logger.info(f"Índice de busca {fts} criado")
+
+# Tabelas com sequência de alterações (sincronização incremental)
+SYNC_TABLES = ('tarefas', 'compromissos')
+
+def _create_sync_log(cursor: sqlite3.Cursor) -> None:
+    """
+    Cria a sequência global de alterações, o registro de exclusões e os
+    triggers que carimbam a coluna seq a cada escrita
+
+    Cada INSERT/UPDATE recebe o próximo valor de sincronizacao.seq na linha
+    alterada; cada DELETE grava uma exclusão com o próximo valor. Linhas
+    anteriores à migração recebem valores novos, em ordem de id.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sincronizacao (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            seq INTEGER NOT NULL DEFAULT 0,
+            exclusoes_podadas_ate INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO sincronizacao (id) VALUES (1)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS exclusoes (
+            seq INTEGER PRIMARY KEY,
+            tabela TEXT NOT NULL,
+            registro_id INTEGER NOT NULL,
+            excluido_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    for table in SYNC_TABLES:
+        cursor.execute(f'''
+            UPDATE {table} SET seq = (SELECT seq FROM sincronizacao) + id WHERE seq IS NULL
+        ''')
+        cursor.execute(f'''
+            UPDATE sincronizacao
+            SET seq = MAX(seq, (SELECT COALESCE(MAX(seq), 0) FROM {table}))
+        ''')
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_seq ON {table}(seq)')
+        
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_seq_insert AFTER INSERT ON {table}
+            BEGIN
+                UPDATE sincronizacao SET seq = seq + 1;
+                UPDATE {table} SET seq = (SELECT seq FROM sincronizacao) WHERE id = new.id;
+            END
+        ''')
+        # A condição ignora a própria atualização de seq feita pelos triggers
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_seq_update AFTER UPDATE ON {table}
+            WHEN new.seq IS old.seq
+            BEGIN
+                UPDATE sincronizacao SET seq = seq + 1;
+                UPDATE {table} SET seq = (SELECT seq FROM sincronizacao) WHERE id = new.id;
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_seq_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE sincronizacao SET seq = seq + 1;
+                INSERT INTO exclusoes (seq, tabela, registro_id)
+                VALUES ((SELECT seq FROM sincronizacao), '{table}', old.id);
+            END
+        ''')
+
+def _backfill_task_positions(cursor: sqlite3.Cursor) -> None:
+    """
+    Atribui posição no quadro às tarefas que ainda não têm uma
+    
+    Em cada coluna (status) as tarefas sem posição vão para o fim, na ordem
+    usada pelo quadro antes da coluna existir (prioridade, data limite, id).
+    """
+    # Uma busca por status em idx_tarefas_status_posicao (NULLs vêm primeiro)
+    for status in (s.value for s in config.TaskStatus):
+        ids = [row[0] for row in cursor.execute('''
+            SELECT id FROM tarefas WHERE status = ? AND posicao IS NULL
+            ORDER BY prioridade_rank, data_limite, id
+        ''', (status,)).fetchall()]
+        if not ids:
+            continue
+        last = cursor.execute('SELECT MAX(posicao) FROM tarefas WHERE status = ?', (status,)).fetchone()[0]
+        cursor.executemany('UPDATE tarefas SET posicao = ? WHERE id = ?',
+                           zip(keys_after(last, len(ids)), ids))
+        logger.info(f"Posições atribuídas a {len(ids)} tarefas ({status})")
+
+def _create_completion_tracking(cursor: sqlite3.Cursor) -> None:
+    """
+    Cria os triggers que mantêm tarefas.concluido_em: preenchido quando a
+    tarefa passa a 'concluida' e limpo quando ela é reaberta, então edições
+    posteriores não alteram a data do histórico
+    
+    Tarefas concluídas antes da coluna existir recebem a data da última
+    alteração. A escrita dos triggers carimba seq junto, para não disparar
+    de novo os triggers de sincronização e de eventos.
+    """
+    done = config.TaskStatus.CONCLUIDA.value
+    filled = cursor.execute(f'''
+        UPDATE tarefas SET concluido_em = COALESCE(atualizado_em, criado_em, CURRENT_TIMESTAMP)
+        WHERE status = '{done}' AND concluido_em IS NULL
+    ''').rowcount
+    if filled:
+        logger.info(f"Data de conclusão preenchida em {filled} tarefas")
+    
+    stamp = '''
+        UPDATE sincronizacao SET seq = seq + 1;
+        UPDATE tarefas SET concluido_em = {value}, seq = (SELECT seq FROM sincronizacao)
+        WHERE id = new.id;
+    '''
+    # Recriado: tarefas desarquivadas já chegam com a data de conclusão original
+    cursor.execute('DROP TRIGGER IF EXISTS trg_tarefas_concluido_insert')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_tarefas_concluido_insert AFTER INSERT ON tarefas
+        WHEN new.status = '{done}' AND new.concluido_em IS NULL
+        BEGIN
+            {stamp.format(value='CURRENT_TIMESTAMP')}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_tarefas_concluido_update AFTER UPDATE OF status ON tarefas
+        WHEN (new.status = '{done}') != (old.status = '{done}')
+        BEGIN
+            {stamp.format(value=f"CASE WHEN new.status = '{done}' THEN CURRENT_TIMESTAMP END")}
+        END
+    ''')
+
+def _create_event_log(cursor: sqlite3.Cursor) -> None:
+    """
+    Cria o log de eventos (criação, alteração e exclusão) de tarefas e
+    compromissos, preenchido por triggers e lido pelo feed /api/events
+
+    O id é AUTOINCREMENT para nunca ser reaproveitado depois da poda, já que
+    os clientes retomam o feed pelo último id recebido. O log mantém apenas
+    os config.EVENT_LOG_RETENTION eventos mais recentes.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS eventos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabela TEXT NOT NULL,
+            registro_id INTEGER NOT NULL,
+            operacao TEXT NOT NULL,
+            criado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    for table in SYNC_TABLES:
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_evento_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO eventos (tabela, registro_id, operacao) VALUES ('{table}', new.id, 'criado');
+            END
+        ''')
+        # Ignora a atualização de seq feita pelos triggers de sincronização
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_evento_update AFTER UPDATE ON {table}
+            WHEN new.seq IS old.seq
+            BEGIN
+                INSERT INTO eventos (tabela, registro_id, operacao) VALUES ('{table}', new.id, 'atualizado');
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_evento_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO eventos (tabela, registro_id, operacao) VALUES ('{table}', old.id, 'excluido');
+            END
+        ''')
+    
+    # Poda a cada 1000 eventos; recriado para acompanhar a configuração de retenção
+    cursor.execute('DROP TRIGGER IF EXISTS trg_eventos_retencao')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_eventos_retencao AFTER INSERT ON eventos
+        WHEN new.id % 1000 = 0
+        BEGIN
+            DELETE FROM eventos WHERE id <= new.id - {int(config.EVENT_LOG_RETENTION)};
+        END
+    ''')
+
+# Tabelas cuja versão é mantida em versoes_tabela
+VERSIONED_TABLES = ('tarefas', 'tarefas_arquivo', 'compromissos')
+
+# Colunas copiadas entre tarefas e tarefas_arquivo (seq e prioridade_rank não são copiadas)
+TASK_ARCHIVE_COLUMNS = ('id', 'titulo', 'descricao', 'categoria', 'palavra_chave', 'prioridade',
+                        'status', 'data_limite', 'responsaveis', 'observacoes', 'checklist',
+                        'criado_em', 'atualizado_em', 'versao', 'posicao', 'concluido_em')
+
+def _create_task_archive(cursor: sqlite3.Cursor) -> None:
+    """
+    Cria tarefas_arquivo, que guarda as tarefas concluídas há muito tempo
+    fora da tabela ativa
+    
+    As tarefas mantêm o id ao serem arquivadas e desarquivadas (o
+    AUTOINCREMENT de tarefas nunca reaproveita ids). Não há seq: para a
+    sincronização, uma tarefa arquivada foi excluída da tabela ativa.
+    """
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS tarefas_arquivo (
+            id INTEGER PRIMARY KEY,
+            titulo TEXT NOT NULL,
+            descricao TEXT,
+            categoria TEXT NOT NULL,
+            palavra_chave TEXT,
+            prioridade TEXT NOT NULL,
+            status TEXT NOT NULL,
+            data_limite TEXT,
+            responsaveis TEXT,
+            observacoes TEXT,
+            checklist TEXT,
+            criado_em TIMESTAMP,
+            atualizado_em TIMESTAMP,
+            versao INTEGER NOT NULL DEFAULT 1,
+            posicao TEXT,
+            concluido_em TIMESTAMP,
+            arquivado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            prioridade_rank INTEGER GENERATED ALWAYS AS ({PRIORITY_RANK_SQL}) VIRTUAL
+        )
+    ''')
+    # Mesma ordem e cursor do histórico da tabela ativa
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tarefas_arquivo_concluido
+        ON tarefas_arquivo(concluido_em, id, categoria)
+    ''')
 
 def init_database() -> None:
     """
@@ -82,6 +899,27 @@ def init_database() -> None:
                 )
             ''')
             
+            # Migrações de colunas adicionadas após a criação original das tabelas
+            
+            # Posição numérica da prioridade, indexável (substitui o CASE no ORDER BY)
+            _ensure_column(cursor, 'tarefas', 'prioridade_rank', f'''
+                INTEGER GENERATED ALWAYS AS ({PRIORITY_RANK_SQL}) VIRTUAL
+            ''')
+            
+            # Sequência da última alteração de cada linha (sincronização incremental)
+            for table in SYNC_TABLES:
+                _ensure_column(cursor, table, 'seq', 'INTEGER')
+            
+            # Versão da linha, incrementada a cada atualização (controle otimista via If-Match)
+            for table in ('tarefas', 'compromissos'):
+                _ensure_column(cursor, table, 'versao', 'INTEGER NOT NULL DEFAULT 1')
+            
+            # Posição da tarefa na coluna do quadro (chave fracionária, utils/ranking.py)
+            _ensure_column(cursor, 'tarefas', 'posicao', 'TEXT')
+            
+            # Momento da conclusão da tarefa (mantido por triggers)
+            _ensure_column(cursor, 'tarefas', 'concluido_em', 'TIMESTAMP')
+            
             # Índices para melhor performance
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_tarefas_status ON tarefas(status)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_tarefas_prioridade ON tarefas(prioridade)')
@@ -89,6 +927,75 @@ def init_database() -> None:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_tarefas_palavra_chave ON tarefas(palavra_chave)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_compromissos_data ON compromissos(data)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_compromissos_palavra_chave ON compromissos(palavra_chave)')
+            # Listagens ordenadas por prioridade/data limite direto do índice
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tarefas_status_rank_limite ON tarefas(status, prioridade_rank, data_limite)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tarefas_rank_limite ON tarefas(prioridade_rank, data_limite)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tarefas_data_limite ON tarefas(data_limite)')
+            # Índices parciais das tarefas abertas (itens urgentes do dashboard)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tarefas_abertas_limite ON tarefas(data_limite) WHERE status != 'concluida'")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tarefas_abertas_prioridade ON tarefas(prioridade) WHERE status != 'concluida'")
+            # Paginação por cursor em (data, horario_inicio, id)
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_compromissos_data_horario ON compromissos(data, horario_inicio, id)')
+            # Ordem das colunas do quadro
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tarefas_status_posicao ON tarefas(status, posicao)')
+            # Histórico de concluídas: ordem e cursor em (concluido_em, id), categoria lida do próprio índice
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_tarefas_status_concluido
+                ON tarefas(status, concluido_em, id, categoria)
+            ''')
+            
+            # Arquivo das tarefas concluídas antigas
+            _create_task_archive(cursor)
+            
+            # Versão de cada tabela, incrementada por triggers a cada escrita
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS versoes_tabela (
+                    tabela TEXT PRIMARY KEY,
+                    versao INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            for table in VERSIONED_TABLES:
+                cursor.execute('INSERT OR IGNORE INTO versoes_tabela (tabela, versao) VALUES (?, 0)', (table,))
+                for operation in ('INSERT', 'UPDATE', 'DELETE'):
+                    cursor.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS trg_{table}_versao_{operation.lower()}
+                        AFTER {operation} ON {table}
+                        BEGIN
+                            UPDATE versoes_tabela SET versao = versao + 1 WHERE tabela = '{table}';
+                        END
+                    ''')
+            
+            # Contadores materializados para o dashboard, mantidos por triggers
+            counters_exist = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'estatisticas_contadores'"
+            ).fetchone()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS estatisticas_contadores (
+                    escopo TEXT NOT NULL,
+                    chave TEXT NOT NULL,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (escopo, chave)
+                ) WITHOUT ROWID
+            ''')
+            # Também recalcula quando uma tabela passa a ter contadores (ex.: tarefas_arquivo)
+            if _create_counter_triggers(cursor) or not counters_exist:
+                _rebuild_stat_counters(cursor)
+            
+            # Sequência de alterações e registro de exclusões para /api/sync
+            _create_sync_log(cursor)
+            
+            # Log de eventos para o feed de alterações em tempo real (/api/events)
+            _create_event_log(cursor)
+            
+            # Posições iniciais no quadro para tarefas anteriores à coluna posicao
+            _backfill_task_positions(cursor)
+            
+            # Data de conclusão das tarefas
+            _create_completion_tracking(cursor)
+            
+            # Busca textual (FTS5) mantida em sincronia por triggers
+            for table, columns in FTS_COLUMNS.items():
+                _create_fts_index(cursor, table, columns)
             
             logger.info("Banco de dados inicializado com sucesso")
     except Exception as e:
@@ -121,16 +1028,17 @@ def execute_query(query: str, params: Optional[Union[List, Tuple]] = None) -> Li
         logger.error(f"Erro ao executar query: {e}")
         raise
 
-def execute_update(query: str, params: Optional[Union[List, Tuple]] = None) -> int:
+def execute_query_columnar(query: str, params: Optional[Union[List, Tuple]] = None) -> Tuple[List[str], List[tuple]]:
     """
-    Executa uma query INSERT/UPDATE/DELETE
+    Executa uma query SELECT e retorna os nomes das colunas e as linhas
+    como tuplas simples (sem sqlite3.Row nem dicionários por linha)
     
     Args:
         query: Query SQL
         params: Parâmetros da query (opcional)
         
     Returns:
-        ID do último registro inserido ou número de linhas afetadas
+        tuple: (nomes das colunas, lista de tuplas)
     """
     if params is not None and not isinstance(params, (list, tuple)):
         raise ValueError("Params deve ser uma lista ou tupla")
@@ -138,11 +1046,100 @@ def execute_update(query: str, params: Optional[Union[List, Tuple]] = None) -> i
     try:
         with get_db_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None
             if params:
                 cursor.execute(query, params)
             else:
                 cursor.execute(query)
-            return cursor.lastrowid if cursor.lastrowid else cursor.rowcount
+            columns = [description[0] for description in cursor.description]
+            return columns, cursor.fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Erro ao executar query: {e}")
+        raise
+
+def _is_insert(query: str) -> bool:
+    """Indica se a query é um INSERT/REPLACE"""
+    return query.lstrip().upper().startswith(('INSERT', 'REPLACE'))
+
+def execute_update(query: str, params: Optional[Union[List, Tuple]] = None) -> int:
+    """
+    Executa uma query INSERT/UPDATE/DELETE
+    
+    Args:
+        query: Query SQL
+        params: Parâmetros da query (opcional)
+        
+    Returns:
+        ID do último registro inserido ou número de linhas afetadas
+    """
+    if params is not None and not isinstance(params, (list, tuple)):
+        raise ValueError("Params deve ser uma lista ou tupla")
+
+    def _apply(conn: sqlite3.Connection) -> int:
+        cursor = conn.cursor()
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        # Conexões são reaproveitadas, então lastrowid pode trazer o
+        # valor de um INSERT anterior: só vale para INSERT/REPLACE
+        if _is_insert(query) and cursor.lastrowid:
+            return cursor.lastrowid
+        return cursor.rowcount
+
+    try:
+        return execute_write(_apply)
     except sqlite3.Error as e:
         logger.error(f"Erro ao executar update: {e}")
         raise
+
+def get_table_versions(tables: Union[List[str], Tuple[str, ...]]) -> Dict[str, int]:
+    """
+    Retorna a versão atual de cada tabela (incrementada a cada escrita)
+    
+    Args:
+        tables: Nomes das tabelas
+        
+    Returns:
+        Dicionário tabela -> versão
+    """
+    placeholders = ', '.join('?' * len(tables))
+    rows = execute_query(
+        f'SELECT tabela, versao FROM versoes_tabela WHERE tabela IN ({placeholders})',
+        list(tables)
+    )
+    versions = {table: 0 for table in tables}
+    versions.update({row['tabela']: row['versao'] for row in rows})
+    return versions
+
+def get_table_version(table: str) -> int:
+    """Retorna a versão atual de uma tabela"""
+    return get_table_versions([table])[table]
+
+def prune_tombstones(days: int) -> int:
+    """
+    Remove do registro de exclusões as entradas mais antigas que o prazo
+    
+    Clientes cujo último seq for anterior à poda precisam sincronizar do zero.
+    
+    Args:
+        days: Prazo de retenção, em dias
+        
+    Returns:
+        Quantidade de exclusões removidas
+    """
+    def _apply(conn: sqlite3.Connection) -> int:
+        row = conn.execute(
+            "SELECT MAX(seq) FROM exclusoes WHERE excluido_em < datetime('now', ?)",
+            (f'-{int(days)} days',)
+        ).fetchone()
+        if row[0] is None:
+            return 0
+        conn.execute(
+            'UPDATE sincronizacao SET exclusoes_podadas_ate = MAX(exclusoes_podadas_ate, ?)', (row[0],)
+        )
+        return conn.execute('DELETE FROM exclusoes WHERE seq <= ?', (row[0],)).rowcount
+    
+    removed = execute_write(_apply)
+    logger.info(f"{removed} exclusões removidas do registro de sincronização")
+    return removed
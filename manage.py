@@ -0,0 +1,89 @@
+"""
+Comandos de manutenção do banco de dados
+
+Uso:
+    python manage.py contadores verificar
+    python manage.py contadores reconstruir
+    python manage.py exclusoes podar [--dias N]
+    python manage.py arquivo arquivar [--dias N] [--lote N]
+    python manage.py arquivo desarquivar ID
+"""
+import argparse
+import sys
+import config
+from database import init_database, check_stat_counters, rebuild_stat_counters, prune_tombstones
+from models import TaskArchive
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+def counters_command(args: argparse.Namespace) -> int:
+    """Verifica ou reconstrói os contadores materializados do dashboard"""
+    if args.acao == 'reconstruir':
+        rebuild_stat_counters()
+        print("Contadores reconstruídos com sucesso")
+        return 0
+    
+    divergences = check_stat_counters()
+    if not divergences:
+        print("Contadores consistentes")
+        return 0
+    
+    print(f"{len(divergences)} contador(es) divergente(s):")
+    for item in divergences:
+        print(f"  {item['escopo']} / {item['chave']}: esperado {item['esperado']}, atual {item['atual']}")
+    print("Execute 'python manage.py contadores reconstruir' para corrigir")
+    return 1
+
+def tombstones_command(args: argparse.Namespace) -> int:
+    """Remove exclusões antigas do registro usado pela sincronização incremental"""
+    removed = prune_tombstones(args.dias)
+    print(f"{removed} exclusão(ões) com mais de {args.dias} dias removida(s)")
+    return 0
+
+def archive_command(args: argparse.Namespace) -> int:
+    """Arquiva tarefas concluídas antigas ou devolve uma tarefa à tabela ativa"""
+    if args.acao == 'desarquivar':
+        if args.id is None:
+            print("Informe o ID da tarefa a desarquivar")
+            return 1
+        task = TaskArchive.unarchive(args.id)
+        if task is None:
+            print(f"Tarefa {args.id} não está no arquivo")
+            return 1
+        print(f"Tarefa {args.id} desarquivada")
+        return 0
+    
+    archived = TaskArchive.archive(args.dias, args.lote)
+    print(f"{archived} tarefa(s) concluída(s) há mais de {args.dias} dias arquivada(s)")
+    return 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Manutenção do banco de dados')
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+    
+    counters = subparsers.add_parser('contadores', help='Contadores de estatísticas do dashboard')
+    counters.add_argument('acao', choices=['verificar', 'reconstruir'])
+    counters.set_defaults(func=counters_command)
+    
+    tombstones = subparsers.add_parser('exclusoes', help='Registro de exclusões da sincronização incremental')
+    tombstones.add_argument('acao', choices=['podar'])
+    tombstones.add_argument('--dias', type=int, default=config.SYNC_TOMBSTONE_RETENTION_DAYS,
+                            help='Prazo de retenção em dias')
+    tombstones.set_defaults(func=tombstones_command)
+    
+    archive = subparsers.add_parser('arquivo', help='Arquivamento de tarefas concluídas')
+    archive.add_argument('acao', choices=['arquivar', 'desarquivar'])
+    archive.add_argument('id', type=int, nargs='?', help='ID da tarefa (desarquivar)')
+    archive.add_argument('--dias', type=int, default=config.TASK_ARCHIVE_DAYS,
+                         help='Idade mínima da conclusão, em dias')
+    archive.add_argument('--lote', type=int, default=config.TASK_ARCHIVE_BATCH_SIZE,
+                         help='Tarefas movidas por transação')
+    archive.set_defaults(func=archive_command)
+    
+    args = parser.parse_args(argv)
+    init_database()
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,110 +3,631 @@ Modelos de dados para Tarefas e Compromissos
 """
 import json
 import sqlite3
-from typing import List, Dict, Any, Optional, Union
-from database import execute_query, execute_update
+import threading
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple, Union
+from database import (execute_query, execute_query_columnar, execute_read,
+                      execute_write, get_table_version, get_stat_counters, TASK_ARCHIVE_COLUMNS)
 from utils.logger import setup_logger
-from utils.validators import sanitize_string, sanitize_for_search
-from config import TaskStatus, TaskPriority
+from utils.pagination import encode_cursor, decode_cursor
+from utils.ranking import key_between
+from utils.validators import (sanitize_string, sanitize_for_search, build_fts_query,
+                              validate_task_data, validate_appointment_data)
+from config import TaskStatus, TaskPriority, STREAM_BATCH_SIZE
 
 logger = setup_logger(__name__)
 
+
+class ValidationError(ValueError):
+    """Dados inválidos para gravação; as mensagens ficam em errors"""
+    
+    def __init__(self, errors: List[str]):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+class VersionConflictError(Exception):
+    """A versão enviada pelo cliente (If-Match) não é mais a versão atual do registro"""
+    
+    def __init__(self, current: Dict[str, Any]):
+        super().__init__(f"Versão atual do registro {current['id']}: {current['versao']}")
+        self.current = current
+
+
+# Limite de variáveis por cláusula IN (abaixo do limite padrão do SQLite)
+_IN_CHUNK_SIZE = 900
+
+# Cache de contagens por (tabela, filtro), válido enquanto a versão da tabela não mudar
+_COUNT_CACHE: Dict[Tuple[str, str, Tuple], Tuple[int, int]] = {}
+_COUNT_CACHE_MAX = 256
+_count_cache_lock = threading.Lock()
+
+def _cached_count(table: str, where: str, params: List[Any]) -> int:
+    """
+    Conta as linhas de uma tabela que satisfazem o filtro, reaproveitando
+    o resultado enquanto a versão da tabela for a mesma
+    """
+    key = (table, where, tuple(params))
+    # A versão é lida antes da contagem: se houver escrita no meio, a entrada
+    # fica com versão antiga e é recalculada na próxima leitura
+    version = get_table_version(table)
+    with _count_cache_lock:
+        cached = _COUNT_CACHE.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+    
+    total = execute_query(f'SELECT COUNT(*) FROM {table} WHERE {where}', params if params else None)[0][0]
+    with _count_cache_lock:
+        if len(_COUNT_CACHE) >= _COUNT_CACHE_MAX:
+            _COUNT_CACHE.clear()
+        _COUNT_CACHE[key] = (version, total)
+    return total
+
+def _projection(fields: Optional[List[str]], allowed: Tuple[str, ...],
+                required: Tuple[str, ...] = ()) -> Tuple[str, Optional[List[str]]]:
+    """
+    Monta a lista de colunas do SELECT a partir dos campos pedidos
+    
+    O id sempre é incluído. Colunas necessárias à consulta (ordenação,
+    cursor) entram no SELECT mesmo quando não foram pedidas.
+    
+    Args:
+        fields: Campos pedidos pelo cliente (None = todos)
+        allowed: Campos permitidos
+        required: Colunas que a consulta precisa ler
+        
+    Returns:
+        tuple: (colunas para o SELECT, campos a devolver ou None se forem todos os lidos)
+        
+    Raises:
+        ValueError: Se algum campo não for permitido
+    """
+    if not fields:
+        return '*', None
+    invalid = [f for f in fields if f not in allowed]
+    if invalid:
+        raise ValueError(f"Campo inválido: {', '.join(invalid)}")
+    
+    output = list(dict.fromkeys(['id', *fields]))
+    columns = output + [c for c in required if c not in output]
+    return ', '.join(columns), (output if len(columns) > len(output) else None)
+
+def _project(data: Dict[str, Any], output: Optional[List[str]]) -> Dict[str, Any]:
+    """Remove do dicionário as colunas lidas apenas para uso interno da consulta"""
+    return data if output is None else {key: data[key] for key in output}
+
+def _columnar(columns: List[str], rows: List[tuple], output: Optional[List[str]],
+              decoders: Optional[Dict[str, Callable[[Any], Any]]] = None) -> Dict[str, Any]:
+    """
+    Monta o formato colunar ({'columns', 'rows'}) direto das tuplas do SQLite
+    
+    As tuplas só são recriadas quando há colunas internas a remover ou
+    valores a decodificar (ex.: checklist em JSON).
+    """
+    if output is not None:
+        columns = columns[:len(output)]
+        rows = [row[:len(output)] for row in rows]
+    for name, decode in (decoders or {}).items():
+        if name in columns:
+            index = columns.index(name)
+            rows = [(*row[:index], decode(row[index]), *row[index + 1:]) for row in rows]
+    return {'columns': columns, 'rows': rows}
+
+def _iter_pages(fetch_page: Callable[[Optional[str]], Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    Percorre todas as páginas de uma listagem por cursor (keyset)
+    
+    Cada página é uma leitura curta própria: a conexão volta ao pool e a
+    transação de leitura termina entre uma página e outra, então um download
+    longo não ocupa o pool nem impede checkpoints do WAL. Alterações feitas
+    durante a leitura podem aparecer nas páginas seguintes.
+    
+    Args:
+        fetch_page: Função que recebe o cursor (None na primeira página) e
+                    retorna {'items', 'next_cursor'}
+    """
+    cursor = None
+    while True:
+        page = fetch_page(cursor)
+        yield from page['items']
+        cursor = page['next_cursor']
+        if cursor is None:
+            return
+
+# Colunas preenchidas por triggers AFTER em cada tabela
+_TRIGGER_COLUMNS = {
+    'tarefas': ('seq', 'concluido_em'),
+    'compromissos': ('seq',)
+}
+
+def _stamped(conn: sqlite3.Connection, table: str, row: sqlite3.Row,
+             convert: Callable[[sqlite3.Row], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Converte a linha de um INSERT/UPDATE ... RETURNING
+    
+    O RETURNING reflete a linha antes dos triggers AFTER (seq, concluido_em);
+    os valores finais dessas colunas são relidos pela chave primária.
+    """
+    data = convert(row)
+    columns = _TRIGGER_COLUMNS[table]
+    current = conn.execute(f'SELECT {", ".join(columns)} FROM {table} WHERE id = ?', (data['id'],)).fetchone()
+    data.update(zip(columns, current))
+    return data
+
+def _update_returning(table: str, record_id: int, fields: List[str], params: List[Any],
+                      expected_version: Optional[int],
+                      convert: Callable[[sqlite3.Row], Dict[str, Any]],
+                      check: Optional[Callable[[Dict[str, Any]], None]] = None,
+                      prepare: Optional[Callable[[sqlite3.Connection, List[str], List[List[Any]]],
+                                                 List[List[Any]]]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Atualiza um registro em uma transação e retorna a linha nova (UPDATE ... RETURNING)
+    
+    A versão esperada entra no WHERE, então a verificação e a escrita são uma
+    única instrução; a linha atual só é lida quando nada foi atualizado, para
+    distinguir registro inexistente de conflito de versão.
+    
+    Args:
+        table: Tabela do registro
+        record_id: ID do registro
+        fields: Atribuições do SET (de _update_assignments)
+        params: Parâmetros das atribuições
+        expected_version: Versão exigida (If-Match) ou None
+        convert: Conversão da linha para dicionário
+        check: Validação da linha resultante; se lançar, a escrita é desfeita
+        prepare: Completa os parâmetros das atribuições dentro da transação
+        
+    Returns:
+        Registro atualizado ou None se não existir
+        
+    Raises:
+        VersionConflictError: Se a versão atual for diferente da esperada
+    """
+    where = 'id = ?'
+    where_params: List[Any] = [record_id]
+    if expected_version is not None:
+        where += ' AND versao = ?'
+        where_params.append(expected_version)
+    
+    def _apply(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+        if fields:
+            assignments = ', '.join([*fields, 'versao = versao + 1', 'atualizado_em = CURRENT_TIMESTAMP'])
+            values = prepare(conn, fields, [params])[0] if prepare else params
+            rows = conn.execute(f'UPDATE {table} SET {assignments} WHERE {where} RETURNING *',
+                                [*values, *where_params]).fetchall()
+        else:
+            rows = conn.execute(f'SELECT * FROM {table} WHERE {where}', where_params).fetchall()
+        
+        if not rows:
+            current = conn.execute(f'SELECT * FROM {table} WHERE id = ?', (record_id,)).fetchone()
+            if current is None:
+                return None
+            raise VersionConflictError(convert(current))
+        
+        data = _stamped(conn, table, rows[0], convert) if fields else convert(rows[0])
+        if check:
+            check(data)
+        return data
+    
+    return execute_write(_apply)
+
+def _delete_versioned(table: str, record_id: int, expected_version: Optional[int],
+                      convert: Callable[[sqlite3.Row], Dict[str, Any]]) -> int:
+    """
+    Exclui um registro, exigindo a versão informada (If-Match) se houver
+    
+    Returns:
+        Número de linhas excluídas
+        
+    Raises:
+        VersionConflictError: Se a versão atual for diferente da esperada
+    """
+    def _apply(conn: sqlite3.Connection) -> int:
+        if expected_version is None:
+            return conn.execute(f'DELETE FROM {table} WHERE id = ?', (record_id,)).rowcount
+        deleted = conn.execute(f'DELETE FROM {table} WHERE id = ? AND versao = ?',
+                               (record_id, expected_version)).rowcount
+        if not deleted:
+            current = conn.execute(f'SELECT * FROM {table} WHERE id = ?', (record_id,)).fetchone()
+            if current is not None:
+                raise VersionConflictError(convert(current))
+        return deleted
+    
+    return execute_write(_apply)
+
+def _fetch_existing(conn: sqlite3.Connection, table: str, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Busca as linhas existentes de uma tabela para uma lista de IDs"""
+    existing = {}
+    for start in range(0, len(ids), _IN_CHUNK_SIZE):
+        chunk = ids[start:start + _IN_CHUNK_SIZE]
+        placeholders = ', '.join('?' * len(chunk))
+        rows = conn.execute(f'SELECT * FROM {table} WHERE id IN ({placeholders})', chunk).fetchall()
+        existing.update({row['id']: dict(row) for row in rows})
+    return existing
+
+def _apply_bulk(table: str, operations: List[Dict[str, Any]],
+                validator: Callable[[Dict[str, Any]], Tuple[bool, List[str]]],
+                insert_query: str, insert_params: Callable[[Dict[str, Any]], Tuple],
+                update_assignments: Callable[[Dict[str, Any]], Tuple[List[str], List[Any]]],
+                prepare_inserts: Optional[Callable[[sqlite3.Connection, List[Tuple]], List[Tuple]]] = None,
+                prepare_updates: Optional[Callable[[sqlite3.Connection, List[str], List[List[Any]]],
+                                                   List[List[Any]]]] = None
+                ) -> List[Dict[str, Any]]:
+    """
+    Valida e aplica um lote de operações em uma única transação
+    
+    Operações inválidas são reportadas e ignoradas; as válidas são aplicadas
+    com executemany, na ordem criações, atualizações e exclusões. Atualizações
+    e exclusões com 'versao' só são aplicadas se a versão atual for a mesma.
+    Cada registro pode aparecer em apenas uma atualização ou exclusão do lote;
+    as repetições são rejeitadas, já que a versão é conferida antes do lote.
+    prepare_inserts e prepare_updates podem completar os parâmetros dos INSERTs
+    e dos UPDATEs dentro da transação.
+    
+    Returns:
+        Resultado de cada operação, na mesma ordem recebida
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(operations)
+    creates = []
+    updates = []
+    deletes = []
+    targets: Dict[int, int] = {}  # id -> índice da operação que já o altera
+    
+    def _fail(index: int, kind: Any, errors: List[str]) -> None:
+        results[index] = {'index': index, 'op': kind, 'success': False, 'errors': errors}
+    
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            _fail(index, None, ['Operação deve ser um objeto'])
+            continue
+        
+        kind = operation.get('op')
+        data = operation.get('data')
+        record_id = operation.get('id')
+        
+        if kind in ('update', 'delete') and (not isinstance(record_id, int) or isinstance(record_id, bool)):
+            _fail(index, kind, ["Campo 'id' inteiro é obrigatório"])
+        elif kind in ('create', 'update') and not isinstance(data, dict):
+            _fail(index, kind, ["Campo 'data' deve ser um objeto"])
+        elif kind == 'create':
+            is_valid, errors = validator(data)
+            if is_valid:
+                creates.append((index, insert_params(data)))
+            else:
+                _fail(index, kind, errors)
+        elif kind in ('update', 'delete') and operation.get('versao') is not None and (
+                not isinstance(operation['versao'], int) or isinstance(operation['versao'], bool)):
+            _fail(index, kind, ["Campo 'versao' deve ser inteiro"])
+        elif kind in ('update', 'delete') and record_id in targets:
+            _fail(index, kind, [f"Registro já alterado pela operação {targets[record_id]} do lote"])
+        elif kind == 'update':
+            targets[record_id] = index
+            updates.append((index, record_id, data, operation.get('versao')))
+        elif kind == 'delete':
+            targets[record_id] = index
+            deletes.append((index, record_id, operation.get('versao')))
+        else:
+            _fail(index, kind, ["Operação inválida. Use: create, update, delete"])
+    
+    def _apply(conn: sqlite3.Connection) -> None:
+        ids = sorted({op[1] for op in updates} | {op[1] for op in deletes})
+        existing = _fetch_existing(conn, table, ids) if ids else {}
+        
+        # Atualizações: validar com os dados mesclados e agrupar por conjunto de campos
+        update_groups: Dict[Tuple[str, ...], List[Tuple[int, int, List[Any]]]] = {}
+        for index, record_id, data, version in updates:
+            if record_id not in existing:
+                _fail(index, 'update', ['Registro não encontrado'])
+                continue
+            if version is not None and version != existing[record_id]['versao']:
+                _fail(index, 'update', [f"Versão desatualizada (atual: {existing[record_id]['versao']})"])
+                continue
+            is_valid, errors = validator({**existing[record_id], **data})
+            if not is_valid:
+                _fail(index, 'update', errors)
+                continue
+            fields, params = update_assignments(data)
+            if not fields:
+                results[index] = {'index': index, 'op': 'update', 'success': True, 'id': record_id}
+                continue
+            update_groups.setdefault(tuple(fields), []).append((index, record_id, params))
+        
+        if creates:
+            insert_rows = [params for _, params in creates]
+            if prepare_inserts:
+                insert_rows = prepare_inserts(conn, insert_rows)
+            conn.executemany(insert_query, insert_rows)
+            last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+            # IDs AUTOINCREMENT são contíguos dentro da transação de escrita
+            first_id = last_id - len(creates) + 1
+            for offset, (index, _) in enumerate(creates):
+                results[index] = {'index': index, 'op': 'create', 'success': True, 'id': first_id + offset}
+        
+        for fields, group in update_groups.items():
+            query = (f"UPDATE {table} SET {', '.join(fields)}, versao = versao + 1, "
+                     f"atualizado_em = CURRENT_TIMESTAMP WHERE id = ?")
+            values = [params for _, _, params in group]
+            if prepare_updates:
+                values = prepare_updates(conn, list(fields), values)
+            conn.executemany(query, [[*params, record_id] for params, (_, record_id, _) in zip(values, group)])
+            for index, record_id, _ in group:
+                results[index] = {'index': index, 'op': 'update', 'success': True, 'id': record_id}
+        
+        to_delete = []
+        for index, record_id, version in deletes:
+            if record_id not in existing:
+                _fail(index, 'delete', ['Registro não encontrado'])
+            elif version is not None and version != existing[record_id]['versao']:
+                _fail(index, 'delete', [f"Versão desatualizada (atual: {existing[record_id]['versao']})"])
+            else:
+                to_delete.append((index, record_id))
+        if to_delete:
+            conn.executemany(f'DELETE FROM {table} WHERE id = ?', [(record_id,) for _, record_id in to_delete])
+            for index, record_id in to_delete:
+                results[index] = {'index': index, 'op': 'delete', 'success': True, 'id': record_id}
+    
+    if creates or updates or deletes:
+        execute_write(_apply)
+    
+    return results
+
 class Task:
     """Modelo para Tarefas"""
     
+    _INSERT_QUERY = '''
+        INSERT INTO tarefas (
+            titulo, descricao, categoria, palavra_chave, prioridade,
+            status, data_limite, responsaveis, observacoes, checklist, posicao
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    _UPDATABLE_FIELDS = ['titulo', 'descricao', 'categoria', 'palavra_chave', 
+                         'prioridade', 'status', 'data_limite', 'responsaveis', 
+                         'observacoes', 'checklist']
+    
+    # Atribuição de posicao nas atualizações de status (no SET, status ainda é o valor antigo)
+    _STATUS_POSITION = 'posicao = CASE WHEN status = ? THEN posicao ELSE ? END'
+    
+    # Ordenação personalizada: prioridade (coluna gerada prioridade_rank),
+    # data limite e ID como desempate, servida por idx_tarefas_status_rank_limite
+    _ORDER_BY = 'prioridade_rank ASC, data_limite ASC, id ASC'
+    
+    # Ordem dos cartões em cada coluna do quadro, servida por idx_tarefas_status_posicao
+    _BOARD_ORDER = 'posicao ASC, id ASC'
+    
+    # Histórico de concluídas (mais recentes primeiro), servido por idx_tarefas_status_concluido
+    _HISTORY_ORDER = 'concluido_em DESC, id DESC'
+    
+    # Campos que podem ser selecionados com fields=
+    FIELDS = ('id', 'titulo', 'descricao', 'categoria', 'palavra_chave', 'prioridade',
+              'status', 'data_limite', 'responsaveis', 'observacoes', 'checklist',
+              'criado_em', 'atualizado_em', 'prioridade_rank', 'seq', 'versao', 'posicao',
+              'concluido_em')
+    
     @staticmethod
-    def create(data: Dict[str, Any]) -> int:
+    def create(data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Cria uma nova tarefa
+        Valida e cria uma nova tarefa (INSERT ... RETURNING)
         
         Args:
             data: Dicionário com dados da tarefa
             
         Returns:
-            ID da tarefa criada
+            Tarefa criada
+            
+        Raises:
+            ValidationError: Se os dados forem inválidos
         """
         try:
-            query = '''
-                INSERT INTO tarefas (
-                    titulo, descricao, categoria, palavra_chave, prioridade,
-                    status, data_limite, responsaveis, observacoes, checklist
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
+            is_valid, errors = validate_task_data(data)
+            if not is_valid:
+                raise ValidationError(errors)
+            
+            query = f'{Task._INSERT_QUERY} RETURNING *'
+            params = Task._insert_params(data)
             
-            checklist_json = json.dumps(data.get('checklist', [])) if data.get('checklist') else None
-            
-            # Garantir valores padrão válidos
-            priority = data.get('prioridade', TaskPriority.MEDIA.value).lower()
-            status = data.get('status', TaskStatus.PENDENTE.value).lower()
-            
-            params = (
-                sanitize_string(data['titulo']),
-                sanitize_string(data.get('descricao', '')),
-                sanitize_string(data['categoria']),
-                sanitize_string(data.get('palavra_chave', '')),
-                priority,
-                status,
-                data.get('data_limite'),
-                sanitize_string(data.get('responsaveis', '')),
-                sanitize_string(data.get('observacoes', '')),
-                checklist_json
-            )
-            
-            task_id = execute_update(query, params)
-            logger.info(f"Tarefa criada com ID: {task_id}")
-            return task_id
+            def _insert(conn: sqlite3.Connection) -> Dict[str, Any]:
+                placed = Task._place_at_end(conn, [params])[0]
+                return _stamped(conn, 'tarefas', conn.execute(query, placed).fetchone(), Task._row_to_dict)
+            
+            task = execute_write(_insert)
+            logger.info(f"Tarefa criada com ID: {task['id']}")
+            return task
         except Exception as e:
             logger.error(f"Erro ao criar tarefa: {e}")
             raise
     
     @staticmethod
-    def get_all(filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def get_all(filters: Optional[Dict[str, Any]] = None,
+                fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Retorna todas as tarefas com filtros opcionais
         
         Args:
-            filters: Dicionário com filtros (status, prioridade, categoria, palavra_chave)
+            filters: Dicionário com filtros (status, prioridade, categoria, palavra_chave,
+                     data_limite_inicio, data_limite_fim)
+            fields: Campos a retornar (de Task.FIELDS; padrão todos)
             
         Returns:
             Lista de tarefas
+            
+        Raises:
+            ValueError: Se algum campo for inválido
         """
-        try:
-            query = 'SELECT * FROM tarefas WHERE 1=1'
-            params = []
-            
-            if filters:
-                if filters.get('status'):
-                    query += ' AND status = ?'
-                    params.append(filters['status'].lower())
-                if filters.get('prioridade'):
-                    query += ' AND prioridade = ?'
-                    params.append(filters['prioridade'].lower())
-                if filters.get('categoria'):
-                    query += ' AND categoria LIKE ?'
-                    # Sanitiza para busca literal (evita que usuário injete %)
-                    safe_cat = sanitize_for_search(filters['categoria'])
-                    params.append(f"%{safe_cat}%")
-                if filters.get('palavra_chave'):
-                    query += ' AND palavra_chave LIKE ?'
-                    safe_kw = sanitize_for_search(filters['palavra_chave'])
-                    params.append(f"%{safe_kw}%")
-            
-            # Ordenação personalizada
-            query += ''' ORDER BY 
-                CASE prioridade 
-                    WHEN 'urgente' THEN 1 
-                    WHEN 'alta' THEN 2 
-                    WHEN 'media' THEN 3 
-                    ELSE 4 
-                END, 
-                data_limite ASC
-            '''
+        return list(Task.iter_all(filters, fields))
+    
+    @staticmethod
+    def iter_all(filters: Optional[Dict[str, Any]] = None,
+                 fields: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre as tarefas filtradas sem montar a lista inteira
+        
+        Os filtros e campos são validados na chamada; as tarefas são lidas
+        em páginas de STREAM_BATCH_SIZE conforme o iterador avança, sem
+        reservar uma conexão do pool entre uma página e outra.
+        
+        Args:
+            filters: Mesmos filtros de get_all
+            fields: Campos a retornar (de Task.FIELDS; padrão todos)
+            
+        Returns:
+            Iterador de tarefas, na ordem de get_all
             
-            rows = execute_query(query, params if params else None)
-            return [Task._row_to_dict(row) for row in rows]
+        Raises:
+            ValueError: Se algum campo for inválido
+        """
+        try:
+            _projection(fields, Task.FIELDS)
         except Exception as e:
             logger.error(f"Erro ao buscar tarefas: {e}")
             raise
+        return _iter_pages(lambda cursor: Task.get_page(filters, STREAM_BATCH_SIZE, cursor, fields=fields))
+    
+    @staticmethod
+    def get_page(filters: Optional[Dict[str, Any]] = None, limit: int = 100,
+                 cursor: Optional[str] = None, include_total: bool = False,
+                 fields: Optional[List[str]] = None, columnar: bool = False) -> Dict[str, Any]:
+        """
+        Retorna uma página de tarefas usando paginação por cursor (keyset)
+        
+        A ordem é a mesma de get_all (prioridade, data limite) com o ID como
+        desempate, então cada página é uma busca direta a partir da última
+        linha da página anterior.
+        
+        Args:
+            filters: Dicionário com filtros (status, prioridade, categoria, palavra_chave,
+                     data_limite_inicio, data_limite_fim)
+            limit: Quantidade máxima de tarefas na página
+            cursor: Cursor opaco retornado pela página anterior (opcional)
+            include_total: Se True, inclui a contagem total de tarefas filtradas
+            fields: Campos a retornar (de Task.FIELDS; padrão todos)
+            columnar: Se True, 'items' vem no formato {'columns', 'rows'}, montado
+                      direto das tuplas do SQLite
+            
+        Returns:
+            Dicionário com 'items', 'next_cursor' e 'total' (None se não solicitado)
+            
+        Raises:
+            ValueError: Se o cursor ou algum campo for inválido
+        """
+        try:
+            columns, output = _projection(fields, Task.FIELDS, ('prioridade_rank', 'data_limite'))
+            where, params = Task._filter_clause(filters)
+            total = _cached_count('tarefas', where, params) if include_total else None
+            
+            page_where = where
+            page_params = list(params)
+            if cursor:
+                rank, deadline, last_id = decode_cursor(cursor, 3)
+                # NULL vem antes de qualquer data na ordenação ascendente do SQLite,
+                # e não pode participar da comparação por row value
+                if deadline is None:
+                    page_where += (' AND (prioridade_rank > ? OR (prioridade_rank = ?'
+                                   ' AND (data_limite IS NOT NULL OR id > ?)))')
+                    page_params.extend([rank, rank, last_id])
+                else:
+                    page_where += ' AND (prioridade_rank, data_limite, id) > (?, ?, ?)'
+                    page_params.extend([rank, deadline, last_id])
+            
+            query = f'SELECT {columns} FROM tarefas WHERE {page_where} ORDER BY {Task._ORDER_BY} LIMIT ?'
+            page_params.append(limit + 1)
+            if columnar:
+                names, rows = execute_query_columnar(query, page_params)
+            else:
+                rows = execute_query(query, page_params)
+            
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = dict(zip(names, rows[-1])) if columnar else rows[-1]
+                next_cursor = encode_cursor([
+                    last['prioridade_rank'], last['data_limite'], last['id']
+                ])
+            
+            if columnar:
+                items = _columnar(names, rows, output, {'checklist': Task._decode_checklist})
+            else:
+                items = [_project(Task._row_to_dict(row), output) for row in rows]
+            
+            return {
+                'items': items,
+                'next_cursor': next_cursor,
+                'total': total
+            }
+        except Exception as e:
+            logger.error(f"Erro ao buscar página de tarefas: {e}")
+            raise
+    
+    @staticmethod
+    def get_board(limit: int = 50, fields: Optional[List[str]] = None,
+                  status: Optional[str] = None, cursor: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna o quadro kanban agrupado por status: o total de cada coluna e
+        os primeiros cartões na ordem de posicao
+        
+        Cada coluna é uma busca própria em idx_tarefas_status_posicao e os
+        totais vêm dos contadores materializados, então o custo depende do
+        limite e não do tamanho das colunas. Tudo é lido na mesma transação.
+        
+        Args:
+            limit: Quantidade máxima de cartões por coluna
+            fields: Campos a retornar (de Task.FIELDS; padrão todos)
+            status: Retorna apenas esta coluna ("carregar mais")
+            cursor: Cursor da coluna retornado pela chamada anterior (exige status)
+            
+        Returns:
+            Dicionário status -> {'total', 'items', 'next_cursor'}
+            
+        Raises:
+            ValueError: Se o status, o cursor ou algum campo for inválido
+        """
+        statuses = [s.value for s in TaskStatus]
+        if status is not None and status not in statuses:
+            raise ValueError(f"Status inválido. Use: {', '.join(statuses)}")
+        if cursor and status is None:
+            raise ValueError("cursor exige o parâmetro status")
+        columns, output = _projection(fields, Task.FIELDS, ('posicao',))
+        
+        after = None
+        if cursor:
+            after = decode_cursor(cursor, 2)
+        
+        def _read(conn: sqlite3.Connection) -> Dict[str, Dict[str, Any]]:
+            totals = dict(conn.execute(
+                "SELECT chave, total FROM estatisticas_contadores WHERE escopo = 'tarefas_status'"
+            ).fetchall())
+            board = {}
+            for column in ([status] if status else statuses):
+                where = 'status = ?'
+                params: List[Any] = [column]
+                if after is not None:
+                    # NULL (tarefas ainda sem posição) vem antes de qualquer chave
+                    if after[0] is None:
+                        where += ' AND (posicao IS NOT NULL OR id > ?)'
+                        params.append(after[1])
+                    else:
+                        where += ' AND (posicao, id) > (?, ?)'
+                        params.extend(after)
+                rows = conn.execute(
+                    f'SELECT {columns} FROM tarefas WHERE {where} ORDER BY {Task._BOARD_ORDER} LIMIT ?',
+                    (*params, limit + 1)
+                ).fetchall()
+                
+                next_cursor = None
+                if len(rows) > limit:
+                    rows = rows[:limit]
+                    next_cursor = encode_cursor([rows[-1]['posicao'], rows[-1]['id']])
+                board[column] = {
+                    'total': totals.get(column, 0),
+                    'items': [_project(Task._row_to_dict(row), output) for row in rows],
+                    'next_cursor': next_cursor
+                }
+            return board
+        
+        try:
+            return execute_read(_read)
+        except Exception as e:
+            logger.error(f"Erro ao buscar quadro de tarefas: {e}")
+            raise
     
     @staticmethod
     def get_by_id(task_id: int) -> Optional[Dict[str, Any]]:
@@ -128,66 +649,67 @@ class Task:
             raise
     
     @staticmethod
-    def update(task_id: int, data: Dict[str, Any]) -> int:
+    def update(task_id: int, data: Dict[str, Any],
+               expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """
-        Atualiza uma tarefa
+        Valida e atualiza uma tarefa em uma única instrução (UPDATE ... RETURNING)
+        
+        Apenas os campos enviados são validados; a versão da linha é
+        incrementada a cada atualização. Uma tarefa que muda de status vai
+        para o fim da coluna do novo status.
         
         Args:
             task_id: ID da tarefa
             data: Dicionário com dados para atualizar
+            expected_version: Versão que o cliente editou (If-Match), ou None
             
         Returns:
-            Número de linhas afetadas
+            Tarefa atualizada ou None se não existir
+            
+        Raises:
+            ValidationError: Se algum campo enviado for inválido
+            VersionConflictError: Se a tarefa tiver sido alterada desde expected_version
         """
         try:
-            fields = []
-            params = []
-            
-            allowed_fields = ['titulo', 'descricao', 'categoria', 'palavra_chave', 
-                            'prioridade', 'status', 'data_limite', 'responsaveis', 
-                            'observacoes', 'checklist']
-            
-            for field in allowed_fields:
-                if field in data:
-                    fields.append(f'{field} = ?')
-                    if field == 'checklist':
-                        params.append(json.dumps(data[field]) if data[field] else None)
-                    elif field in ['prioridade', 'status']:
-                        params.append(data[field].lower())
-                    else:
-                        val = data[field]
-                        params.append(sanitize_string(val) if isinstance(val, str) else val)
+            is_valid, errors = validate_task_data(data, partial=True)
+            if not is_valid:
+                raise ValidationError(errors)
             
-            if not fields:
-                return 0
-            
-            fields.append('atualizado_em = CURRENT_TIMESTAMP')
-            params.append(task_id)
-            
-            query = f"UPDATE tarefas SET {', '.join(fields)} WHERE id = ?"
-            result = execute_update(query, params)
-            logger.info(f"Tarefa {task_id} atualizada")
-            return result
+            fields, params = Task._update_assignments(data)
+            task = _update_returning('tarefas', task_id, fields, params, expected_version,
+                                     Task._row_to_dict, prepare=Task._place_updated)
+            if task and fields:
+                logger.info(f"Tarefa {task_id} atualizada (versão {task['versao']})")
+            return task
+        except VersionConflictError as e:
+            logger.warning(f"Conflito de versão na tarefa {task_id}: {e}")
+            raise
         except Exception as e:
             logger.error(f"Erro ao atualizar tarefa {task_id}: {e}")
             raise
     
     @staticmethod
-    def delete(task_id: int) -> int:
+    def delete(task_id: int, expected_version: Optional[int] = None) -> int:
         """
         Deleta uma tarefa
         
         Args:
             task_id: ID da tarefa
+            expected_version: Versão exigida (If-Match), ou None
             
         Returns:
             Número de linhas afetadas
+            
+        Raises:
+            VersionConflictError: Se a tarefa tiver sido alterada desde expected_version
         """
         try:
-            query = 'DELETE FROM tarefas WHERE id = ?'
-            result = execute_update(query, (task_id,))
+            result = _delete_versioned('tarefas', task_id, expected_version, Task._row_to_dict)
             logger.info(f"Tarefa {task_id} deletada")
             return result
+        except VersionConflictError as e:
+            logger.warning(f"Conflito de versão na tarefa {task_id}: {e}")
+            raise
         except Exception as e:
             logger.error(f"Erro ao deletar tarefa {task_id}: {e}")
             raise
@@ -200,120 +722,763 @@ class Task:
         Returns:
             Lista de tarefas concluídas
         """
+        return list(Task.iter_completed())
+    
+    @staticmethod
+    def iter_completed() -> Iterator[Dict[str, Any]]:
+        """
+        Percorre o histórico de tarefas concluídas em lotes, sem montar a lista
+        
+        Inclui as tarefas arquivadas. Cada lote é uma página de get_history
+        (STREAM_BATCH_SIZE tarefas) lida em uma consulta própria.
+        
+        Returns:
+            Iterador de tarefas concluídas, das mais recentes para as mais antigas
+        """
+        return _iter_pages(lambda cursor: Task.get_history(None, STREAM_BATCH_SIZE, cursor))
+    
+    @staticmethod
+    def _history_columns(names: List[str]) -> Tuple[str, str]:
+        """
+        Colunas do SELECT do histórico na tabela ativa e no arquivo, com a
+        coluna 'arquivada' (tarefas arquivadas não têm seq)
+        """
+        hot = ', '.join([*names, '0 AS arquivada'])
+        cold = ', '.join(['NULL AS seq' if name == 'seq' else name for name in names] + ['1 AS arquivada'])
+        return hot, cold
+    
+    @staticmethod
+    def _history_row(row: sqlite3.Row, output: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Converte uma linha do histórico, mantendo o indicador 'arquivada'"""
+        data = Task._row_to_dict(row)
+        archived = bool(data.pop('arquivada'))
+        data = _project(data, output)
+        data['arquivada'] = archived
+        return data
+    
+    @staticmethod
+    def get_history(filters: Optional[Dict[str, Any]] = None, limit: int = 100,
+                    cursor: Optional[str] = None, include_total: bool = False,
+                    fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Retorna uma página do histórico de tarefas concluídas, das mais
+        recentes para as mais antigas (paginação por cursor)
+        
+        Inclui as tarefas arquivadas (com 'arquivada': True). A ordem é
+        (concluido_em, id) decrescente: cada tabela contribui com no máximo
+        uma página, lida direto do seu índice (idx_tarefas_status_concluido e
+        idx_tarefas_arquivo_concluido, que também cobrem o intervalo de datas
+        e o filtro de categoria), e as duas são intercaladas.
+        
+        Args:
+            filters: Dicionário com filtros (data_inicio e data_fim da conclusão,
+                     inclusivos em YYYY-MM-DD, categoria, palavra_chave)
+            limit: Quantidade máxima de tarefas na página
+            cursor: Cursor opaco retornado pela página anterior (opcional)
+            include_total: Se True, inclui a contagem total de tarefas filtradas
+            fields: Campos a retornar (de Task.FIELDS; padrão todos)
+            
+        Returns:
+            Dicionário com 'items', 'next_cursor' e 'total' (None se não solicitado)
+            
+        Raises:
+            ValueError: Se o cursor ou algum campo for inválido
+        """
+        try:
+            filters = filters or {}
+            columns, output = _projection(fields, Task.FIELDS, ('concluido_em',))
+            hot, cold = Task._history_columns(list(Task.FIELDS) if columns == '*' else columns.split(', '))
+            
+            # Filtros comuns às duas tabelas; no arquivo todas as tarefas estão concluídas
+            where, params = Task._filter_clause({
+                'categoria': filters.get('categoria'),
+                'palavra_chave': filters.get('palavra_chave')
+            })
+            if filters.get('data_inicio'):
+                where += ' AND concluido_em >= ?'
+                params.append(filters['data_inicio'])
+            if filters.get('data_fim'):
+                where += " AND concluido_em < date(?, '+1 day')"
+                params.append(filters['data_fim'])
+            hot_where = f'status = ? AND {where}'
+            hot_params = [TaskStatus.CONCLUIDA.value, *params]
+            
+            total = None
+            if include_total:
+                total = (_cached_count('tarefas', hot_where, hot_params)
+                         + _cached_count('tarefas_arquivo', where, params))
+            
+            if cursor:
+                where += ' AND (concluido_em, id) < (?, ?)'
+                hot_where += ' AND (concluido_em, id) < (?, ?)'
+                position = decode_cursor(cursor, 2)
+                params.extend(position)
+                hot_params.extend(position)
+            
+            rows = execute_query(f'''
+                SELECT * FROM (
+                    SELECT {hot} FROM tarefas WHERE {hot_where} ORDER BY {Task._HISTORY_ORDER} LIMIT ?
+                )
+                UNION ALL
+                SELECT * FROM (
+                    SELECT {cold} FROM tarefas_arquivo WHERE {where} ORDER BY {Task._HISTORY_ORDER} LIMIT ?
+                )
+                ORDER BY {Task._HISTORY_ORDER} LIMIT ?
+            ''', [*hot_params, limit + 1, *params, limit + 1, limit + 1])
+            
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = encode_cursor([rows[-1]['concluido_em'], rows[-1]['id']])
+            
+            return {
+                'items': [Task._history_row(row, output) for row in rows],
+                'next_cursor': next_cursor,
+                'total': total
+            }
+        except Exception as e:
+            logger.error(f"Erro ao buscar histórico de tarefas: {e}")
+            raise
+    
+    @staticmethod
+    def get_urgent(horizon_days: int = 3, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna tarefas abertas urgentes ou com prazo próximo (ou vencido)
+        
+        Cada ramo da consulta é servido por um índice parcial sobre as
+        tarefas não concluídas.
+        
+        Args:
+            horizon_days: Prazo máximo, em dias a partir de hoje, para considerar a tarefa urgente
+            fields: Campos a retornar (de Task.FIELDS; padrão todos)
+            
+        Returns:
+            Lista de tarefas na ordem padrão (prioridade, data limite)
+            
+        Raises:
+            ValueError: Se algum campo for inválido
+        """
+        try:
+            # O ORDER BY de um UNION só pode usar colunas do resultado
+            columns, output = _projection(fields, Task.FIELDS, ('prioridade_rank', 'data_limite'))
+            query = f'''
+                SELECT {columns} FROM tarefas
+                WHERE status != 'concluida' AND prioridade = 'urgente'
+                UNION
+                SELECT {columns} FROM tarefas
+                WHERE status != 'concluida' AND data_limite > ''
+                  AND data_limite < date('now', 'localtime', ?)
+                ORDER BY {Task._ORDER_BY}
+            '''
+            rows = execute_query(query, (f'+{int(horizon_days) + 1} days',))
+            return [_project(Task._row_to_dict(row), output) for row in rows]
+        except Exception as e:
+            logger.error(f"Erro ao buscar tarefas urgentes: {e}")
+            raise
+    
+    @staticmethod
+    def get_stats() -> Dict[str, Any]:
+        """
+        Retorna contagens de tarefas por status, prioridade e categoria
+        
+        As contagens vêm de estatisticas_contadores, mantida por triggers a
+        cada escrita, então o custo não depende da quantidade de tarefas.
+        Incluem as tarefas arquivadas, que continuam concluídas; 'arquivadas'
+        informa quantas estão no arquivo.
+        
+        Returns:
+            Dicionário com 'total', 'arquivadas', 'por_status', 'por_prioridade'
+            e 'por_categoria'
+        """
+        try:
+            scopes = ['', '_status', '_prioridade', '_categoria']
+            counters = get_stat_counters([f'tarefas{s}' for s in scopes] + [f'tarefas_arquivo{s}' for s in scopes])
+            
+            def merged(scope: str) -> Dict[str, int]:
+                totals = dict(counters[f'tarefas{scope}'])
+                for key, total in counters[f'tarefas_arquivo{scope}'].items():
+                    totals[key] = totals.get(key, 0) + total
+                return totals
+            
+            status_counts = {s.value: 0 for s in TaskStatus}
+            status_counts.update({k: v for k, v in merged('_status').items() if k in status_counts})
+            
+            priority_counts = {p.value: 0 for p in TaskPriority}
+            priority_counts.update({k: v for k, v in merged('_prioridade').items() if k in priority_counts})
+            
+            return {
+                'total': merged('').get('total', 0),
+                'arquivadas': counters['tarefas_arquivo'].get('total', 0),
+                'por_status': status_counts,
+                'por_prioridade': priority_counts,
+                'por_categoria': merged('_categoria')
+            }
+        except Exception as e:
+            logger.error(f"Erro ao calcular estatísticas de tarefas: {e}")
+            raise
+    
+    @staticmethod
+    def get_daily_counts(start_date: str, end_date: str) -> Dict[str, Dict[str, int]]:
+        """
+        Retorna a quantidade de tarefas por dia de prazo e prioridade
+        
+        Uma única consulta agrupada sobre o intervalo do índice de data_limite,
+        sem carregar as tarefas.
+        
+        Args:
+            start_date: Primeiro dia do intervalo (YYYY-MM-DD)
+            end_date: Último dia do intervalo, inclusive (YYYY-MM-DD)
+            
+        Returns:
+            Dicionário {dia: {prioridade: quantidade}} apenas com os dias que têm tarefas
+        """
+        try:
+            rows = execute_query('''
+                SELECT substr(data_limite, 1, 10) AS dia, prioridade, COUNT(*) AS total
+                FROM tarefas
+                WHERE data_limite >= ? AND data_limite < date(?, '+1 day')
+                GROUP BY dia, prioridade
+            ''', (start_date, end_date))
+            
+            counts: Dict[str, Dict[str, int]] = {}
+            for row in rows:
+                counts.setdefault(row['dia'], {})[row['prioridade'] or TaskPriority.MEDIA.value] = row['total']
+            return counts
+        except Exception as e:
+            logger.error(f"Erro ao contar tarefas por dia: {e}")
+            raise
+    
+    @staticmethod
+    def _filter_clause(filters: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        """Monta a cláusula WHERE e os parâmetros a partir dos filtros de listagem"""
+        where = '1=1'
+        params: List[Any] = []
+        
+        if filters:
+            if filters.get('status'):
+                where += ' AND status = ?'
+                params.append(filters['status'].lower())
+            if filters.get('prioridade'):
+                where += ' AND prioridade = ?'
+                params.append(filters['prioridade'].lower())
+            if filters.get('categoria'):
+                where += ' AND categoria LIKE ?'
+                # Sanitiza para busca literal (evita que usuário injete %)
+                safe_cat = sanitize_for_search(filters['categoria'])
+                params.append(f"%{safe_cat}%")
+            if filters.get('palavra_chave'):
+                where += ' AND palavra_chave LIKE ?'
+                safe_kw = sanitize_for_search(filters['palavra_chave'])
+                params.append(f"%{safe_kw}%")
+            # Intervalo de data limite (inclusivo, YYYY-MM-DD), servido por idx_tarefas_data_limite
+            if filters.get('data_limite_inicio'):
+                where += ' AND data_limite >= ?'
+                params.append(filters['data_limite_inicio'])
+            if filters.get('data_limite_fim'):
+                where += " AND data_limite < date(?, '+1 day')"
+                params.append(filters['data_limite_fim'])
+        
+        return where, params
+    
+    @staticmethod
+    def bulk_apply(operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Aplica operações de criação/atualização/exclusão em lote
+        
+        Args:
+            operations: Lista de operações ({'op', 'id', 'data'})
+            
+        Returns:
+            Resultado de cada operação, na mesma ordem recebida
+        """
+        try:
+            results = _apply_bulk('tarefas', operations, validate_task_data,
+                                  Task._INSERT_QUERY, Task._insert_params,
+                                  Task._update_assignments, Task._place_at_end,
+                                  Task._place_updated)
+            logger.info(f"Lote de {len(operations)} operações aplicado em tarefas")
+            return results
+        except Exception as e:
+            logger.error(f"Erro ao aplicar lote de tarefas: {e}")
+            raise
+    
+    @staticmethod
+    def move(moves: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Move cartões do quadro (status e posição na coluna) em uma transação
+        
+        Cada movimento é {'id', 'status', 'apos', 'versao'}: o cartão vai para
+        logo depois da tarefa 'apos' na coluna do status (None = início da
+        coluna; sem a chave = fim da coluna). Os movimentos são aplicados em
+        ordem, então um movimento pode se referir a um cartão já movido no
+        mesmo lote. Apenas as linhas movidas são gravadas, com um único UPDATE.
+        
+        Args:
+            moves: Lista de movimentos
+            
+        Returns:
+            Tarefas movidas, na ordem dos movimentos
+            
+        Raises:
+            ValueError: Se algum movimento for inválido
+            VersionConflictError: Se alguma tarefa tiver sido alterada desde 'versao'
+        """
+        valid_statuses = [s.value for s in TaskStatus]
+        ids: List[int] = []
+        for index, move in enumerate(moves):
+            if not isinstance(move, dict):
+                raise ValueError(f"Movimento {index}: deve ser um objeto")
+            for key in ('id', 'apos', 'versao'):
+                value = move.get(key)
+                if (value is not None or key == 'id') and (not isinstance(value, int) or isinstance(value, bool)):
+                    raise ValueError(f"Movimento {index}: campo '{key}' deve ser inteiro")
+            if move.get('status') not in valid_statuses:
+                raise ValueError(f"Movimento {index}: status inválido. Use: {', '.join(valid_statuses)}")
+            ids.append(move['id'])
+        if len(set(ids)) != len(ids):
+            raise ValueError("Cada tarefa pode aparecer em apenas um movimento")
+        
+        moved = set(ids)
+        
+        def _neighbor(conn: sqlite3.Connection, status: str, after: Optional[str], last: bool) -> Optional[str]:
+            """Primeira chave da coluna após ``after`` (ou a última, se last), ignorando os cartões do lote"""
+            if last:
+                cursor = conn.execute('SELECT id, posicao FROM tarefas WHERE status = ? '
+                                      'ORDER BY posicao DESC', (status,))
+            elif after is None:
+                cursor = conn.execute('SELECT id, posicao FROM tarefas WHERE status = ? '
+                                      'ORDER BY posicao', (status,))
+            else:
+                cursor = conn.execute('SELECT id, posicao FROM tarefas WHERE status = ? AND posicao > ? '
+                                      'ORDER BY posicao', (status, after))
+            for row_id, key in cursor:
+                if row_id not in moved:
+                    return key
+            return None
+        
+        def _apply(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+            anchors = {m['apos'] for m in moves if m.get('apos') is not None}
+            existing = _fetch_existing(conn, 'tarefas', sorted(moved | anchors))
+            
+            placed: Dict[int, Tuple[str, str]] = {}  # id -> (status, posicao) já calculados no lote
+            for index, move in enumerate(moves):
+                task_id, status = move['id'], move['status']
+                if task_id not in existing:
+                    raise ValueError(f"Movimento {index}: tarefa {task_id} não encontrada")
+                if move.get('versao') is not None and move['versao'] != existing[task_id]['versao']:
+                    raise VersionConflictError(Task._row_to_dict(existing[task_id]))
+                
+                column = [key for other_status, key in placed.values() if other_status == status]
+                if 'apos' not in move:
+                    before = max([_neighbor(conn, status, None, True), *column], key=lambda k: k or '')
+                    after = None
+                else:
+                    anchor = move['apos']
+                    if anchor is None:
+                        before = None
+                    elif anchor in placed:
+                        anchor_status, before = placed[anchor]
+                        if anchor_status != status:
+                            raise ValueError(f"Movimento {index}: tarefa {anchor} não está na coluna {status}")
+                    elif anchor in moved:
+                        raise ValueError(f"Movimento {index}: tarefa {anchor} é movida depois no lote")
+                    elif anchor not in existing or existing[anchor]['status'] != status:
+                        raise ValueError(f"Movimento {index}: tarefa {anchor} não está na coluna {status}")
+                    else:
+                        before = existing[anchor]['posicao']
+                    candidates = [key for key in [_neighbor(conn, status, before, False), *column]
+                                  if key is not None and (before is None or key > before)]
+                    after = min(candidates) if candidates else None
+                placed[task_id] = (status, key_between(before, after))
+            
+            payload = json.dumps([[task_id, *placed[task_id]] for task_id in ids])
+            rows = conn.execute('''
+                UPDATE tarefas
+                SET status = m.status, posicao = m.posicao,
+                    versao = tarefas.versao + 1, atualizado_em = CURRENT_TIMESTAMP
+                FROM (
+                    SELECT json_extract(value, '$[0]') AS id, json_extract(value, '$[1]') AS status,
+                           json_extract(value, '$[2]') AS posicao
+                    FROM json_each(?)
+                ) AS m
+                WHERE tarefas.id = m.id
+                RETURNING *
+            ''', (payload,)).fetchall()
+            
+            # RETURNING antecede os triggers (seq, concluido_em): relê os valores finais
+            stamped = {row['id']: row for row in conn.execute(
+                'SELECT id, seq, concluido_em FROM tarefas WHERE id IN (SELECT value FROM json_each(?))',
+                (json.dumps(ids),)
+            )}
+            by_id = {row['id']: {**Task._row_to_dict(row), 'seq': stamped[row['id']]['seq'],
+                                 'concluido_em': stamped[row['id']]['concluido_em']} for row in rows}
+            return [by_id[task_id] for task_id in ids]
+        
         try:
-            query = 'SELECT * FROM tarefas WHERE status = ? ORDER BY atualizado_em DESC'
-            rows = execute_query(query, (TaskStatus.CONCLUIDA.value,))
-            return [Task._row_to_dict(row) for row in rows]
+            result = execute_write(_apply)
+            logger.info(f"{len(moves)} tarefas movidas no quadro")
+            return result
+        except VersionConflictError as e:
+            logger.warning(f"Conflito de versão ao mover tarefas: {e}")
+            raise
         except Exception as e:
-            logger.error(f"Erro ao buscar tarefas concluídas: {e}")
+            logger.error(f"Erro ao mover tarefas: {e}")
             raise
     
+    @staticmethod
+    def _insert_params(data: Dict[str, Any]) -> Tuple:
+        """Monta os parâmetros do INSERT a partir dos dados da tarefa"""
+        checklist_json = json.dumps(data.get('checklist', [])) if data.get('checklist') else None
+        
+        # Garantir valores padrão válidos
+        priority = data.get('prioridade', TaskPriority.MEDIA.value).lower()
+        status = data.get('status', TaskStatus.PENDENTE.value).lower()
+        
+        return (
+            sanitize_string(data['titulo']),
+            sanitize_string(data.get('descricao', '')),
+            sanitize_string(data['categoria']),
+            sanitize_string(data.get('palavra_chave', '')),
+            priority,
+            status,
+            data.get('data_limite'),
+            sanitize_string(data.get('responsaveis', '')),
+            sanitize_string(data.get('observacoes', '')),
+            checklist_json,
+            None  # posicao, atribuída por _place_at_end dentro da transação
+        )
+    
+    @staticmethod
+    def _place_at_end(conn: sqlite3.Connection, rows: List[Tuple]) -> List[Tuple]:
+        """Completa os parâmetros do INSERT com posições no fim da coluna de cada status"""
+        keys = Task._end_positions(conn, [params[5] for params in rows])
+        return [(*params[:-1], key) for params, key in zip(rows, keys)]
+    
+    @staticmethod
+    def _place_updated(conn: sqlite3.Connection, fields: List[str],
+                       rows: List[List[Any]]) -> List[List[Any]]:
+        """
+        Completa os parâmetros do UPDATE com a posição no fim da coluna do
+        novo status (usada apenas se o status mudar; ver _update_assignments)
+        """
+        if not fields or fields[-1] != Task._STATUS_POSITION:
+            return rows
+        keys = Task._end_positions(conn, [params[-2] for params in rows])
+        return [[*params[:-1], key] for params, key in zip(rows, keys)]
+    
+    @staticmethod
+    def _end_positions(conn: sqlite3.Connection, statuses: List[str]) -> List[str]:
+        """Gera, em ordem, posições após o último cartão da coluna de cada status"""
+        last: Dict[str, Optional[str]] = {}
+        keys = []
+        for status in statuses:
+            if status not in last:
+                last[status] = conn.execute('SELECT MAX(posicao) FROM tarefas WHERE status = ?',
+                                            (status,)).fetchone()[0]
+            last[status] = key_between(last[status], None)
+            keys.append(last[status])
+        return keys
+    
+    @staticmethod
+    def _update_assignments(data: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        """Monta as atribuições do UPDATE (campos e parâmetros) a partir dos dados"""
+        fields = []
+        params = []
+        
+        for field in Task._UPDATABLE_FIELDS:
+            if field in data:
+                fields.append(f'{field} = ?')
+                if field == 'checklist':
+                    params.append(json.dumps(data[field]) if data[field] else None)
+                elif field in ['prioridade', 'status']:
+                    params.append(data[field].lower())
+                else:
+                    val = data[field]
+                    params.append(sanitize_string(val) if isinstance(val, str) else val)
+        
+        # Mudança de status leva o cartão ao fim da nova coluna; a posição é
+        # preenchida por _place_updated dentro da transação de escrita
+        if 'status' in data:
+            fields.append(Task._STATUS_POSITION)
+            params.extend([data['status'].lower(), None])
+        
+        return fields, params
+    
     @staticmethod
     def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
         """Converte uma row do SQLite para dicionário"""
         data = dict(row)
         if data.get('checklist'):
-            try:
-                data['checklist'] = json.loads(data['checklist'])
-            except:
-                data['checklist'] = []
+            data['checklist'] = Task._decode_checklist(data['checklist'])
         return data
+    
+    @staticmethod
+    def _decode_checklist(value: Optional[str]) -> Any:
+        """Decodifica o checklist armazenado em JSON (lista vazia se inválido)"""
+        if not value:
+            return value
+        try:
+            return json.loads(value)
+        except (TypeError, ValueError):
+            return []
+
+
+class TaskArchive:
+    """Arquivamento das tarefas concluídas antigas em tarefas_arquivo"""
+    
+    _COLUMNS = ', '.join(TASK_ARCHIVE_COLUMNS)
+    
+    @staticmethod
+    def archive(days: int, batch_size: int = 1000, max_batches: Optional[int] = None) -> int:
+        """
+        Move para o arquivo as tarefas concluídas há mais de ``days`` dias
+        
+        Cada lote é uma transação curta (cópia e exclusão das mesmas linhas),
+        então o arquivamento pode rodar com a aplicação no ar. Para a
+        sincronização e o feed de eventos, as tarefas arquivadas são excluídas.
+        
+        Args:
+            days: Idade mínima da conclusão, em dias
+            batch_size: Tarefas movidas por transação
+            max_batches: Limite de lotes nesta execução (None = até acabar)
+            
+        Returns:
+            Quantidade de tarefas arquivadas
+        """
+        if days < 0 or batch_size < 1:
+            raise ValueError("Prazo e tamanho do lote devem ser positivos")
+        
+        def _apply(conn: sqlite3.Connection) -> int:
+            # Lidas em ordem de conclusão pelo índice idx_tarefas_status_concluido
+            ids = [row[0] for row in conn.execute(f'''
+                INSERT INTO tarefas_arquivo ({TaskArchive._COLUMNS})
+                SELECT {TaskArchive._COLUMNS} FROM tarefas
+                WHERE status = ? AND concluido_em < datetime('now', ?)
+                ORDER BY concluido_em, id LIMIT ?
+                RETURNING id
+            ''', (TaskStatus.CONCLUIDA.value, f'-{int(days)} days', batch_size)).fetchall()]
+            if ids:
+                conn.execute('DELETE FROM tarefas WHERE id IN (SELECT value FROM json_each(?))',
+                             (json.dumps(ids),))
+            return len(ids)
+        
+        total = 0
+        batches = 0
+        try:
+            while max_batches is None or batches < max_batches:
+                moved = execute_write(_apply)
+                total += moved
+                batches += 1
+                if moved < batch_size:
+                    break
+            if total:
+                logger.info(f"{total} tarefas concluídas há mais de {days} dias arquivadas")
+            return total
+        except Exception as e:
+            logger.error(f"Erro ao arquivar tarefas (arquivadas até a falha: {total}): {e}")
+            raise
+    
+    @staticmethod
+    def unarchive(task_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Devolve uma tarefa arquivada à tabela ativa, no fim da coluna do seu status
+        
+        A tarefa mantém o id e a data de conclusão; a versão é incrementada.
+        
+        Args:
+            task_id: ID da tarefa arquivada
+            
+        Returns:
+            Tarefa restaurada ou None se não estiver no arquivo
+        """
+        columns = [name for name in TASK_ARCHIVE_COLUMNS if name not in ('versao', 'posicao', 'atualizado_em')]
+        
+        def _apply(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            archived = conn.execute('SELECT status FROM tarefas_arquivo WHERE id = ?', (task_id,)).fetchone()
+            if archived is None:
+                return None
+            last = conn.execute('SELECT MAX(posicao) FROM tarefas WHERE status = ?',
+                                (archived['status'],)).fetchone()[0]
+            row = conn.execute(f'''
+                INSERT INTO tarefas ({', '.join(columns)}, versao, posicao, atualizado_em)
+                SELECT {', '.join(columns)}, versao + 1, ?, CURRENT_TIMESTAMP
+                FROM tarefas_arquivo WHERE id = ?
+                RETURNING *
+            ''', (key_between(last, None), task_id)).fetchone()
+            conn.execute('DELETE FROM tarefas_arquivo WHERE id = ?', (task_id,))
+            return _stamped(conn, 'tarefas', row, Task._row_to_dict)
+        
+        try:
+            task = execute_write(_apply)
+            if task:
+                logger.info(f"Tarefa {task_id} desarquivada")
+            return task
+        except Exception as e:
+            logger.error(f"Erro ao desarquivar tarefa {task_id}: {e}")
+            raise
 
 
 class Appointment:
     """Modelo para Compromissos"""
     
+    _INSERT_QUERY = '''
+        INSERT INTO compromissos (
+            titulo, participantes, assunto_principal, palavra_chave,
+            local_link, data, horario_inicio, horario_fim, objetivo,
+            lembretes, notas_reuniao, proximos_passos
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    _UPDATABLE_FIELDS = ['titulo', 'participantes', 'assunto_principal', 'palavra_chave',
+                         'local_link', 'data', 'horario_inicio', 'horario_fim', 'objetivo',
+                         'lembretes', 'notas_reuniao', 'proximos_passos']
+    
+    # Ordenação cronológica com o ID como desempate (casa com idx_compromissos_data_horario)
+    _ORDER_BY = 'data ASC, horario_inicio ASC, id ASC'
+    
+    # Campos que podem ser selecionados com fields=
+    FIELDS = ('id', 'titulo', 'participantes', 'assunto_principal', 'palavra_chave',
+              'local_link', 'data', 'horario_inicio', 'horario_fim', 'objetivo',
+              'lembretes', 'notas_reuniao', 'proximos_passos', 'criado_em',
+              'atualizado_em', 'seq', 'versao')
+    
     @staticmethod
-    def create(data: Dict[str, Any]) -> int:
+    def create(data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Cria um novo compromisso
+        Valida e cria um novo compromisso (INSERT ... RETURNING)
         
         Args:
             data: Dicionário com dados do compromisso
             
         Returns:
-            ID do compromisso criado
+            Compromisso criado
+            
+        Raises:
+            ValidationError: Se os dados forem inválidos
         """
         try:
-            query = '''
-                INSERT INTO compromissos (
-                    titulo, participantes, assunto_principal, palavra_chave,
-                    local_link, data, horario_inicio, horario_fim, objetivo,
-                    lembretes, notas_reuniao, proximos_passos
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            '''
+            is_valid, errors = validate_appointment_data(data)
+            if not is_valid:
+                raise ValidationError(errors)
             
-            params = (
-                sanitize_string(data['titulo']),
-                sanitize_string(data.get('participantes', '')),
-                sanitize_string(data.get('assunto_principal', '')),
-                sanitize_string(data.get('palavra_chave', '')),
-                sanitize_string(data.get('local_link', '')),
-                data['data'],
-                data['horario_inicio'],
-                data['horario_fim'],
-                sanitize_string(data.get('objetivo', '')),
-                sanitize_string(data.get('lembretes', '')),
-                sanitize_string(data.get('notas_reuniao', '')),
-                sanitize_string(data.get('proximos_passos', ''))
-            )
-            
-            appointment_id = execute_update(query, params)
-            logger.info(f"Compromisso criado com ID: {appointment_id}")
-            return appointment_id
+            query = f'{Appointment._INSERT_QUERY} RETURNING *'
+            params = Appointment._insert_params(data)
+            appointment = execute_write(lambda conn: _stamped(conn, 'compromissos', conn.execute(query, params).fetchone(), dict))
+            logger.info(f"Compromisso criado com ID: {appointment['id']}")
+            return appointment
         except Exception as e:
             logger.error(f"Erro ao criar compromisso: {e}")
             raise
     
     @staticmethod
-    def get_all(filters: Optional[Dict[str, Any]] = None, page: Optional[int] = None, per_page: Optional[int] = None) -> List[Dict[str, Any]]:
+    def get_all(filters: Optional[Dict[str, Any]] = None,
+                fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
-        Retorna todos os compromissos com filtros opcionais e paginação
+        Retorna todos os compromissos com filtros opcionais
         
         Args:
             filters: Dicionário com filtros (data_inicio, data_fim, palavra_chave)
-            page: Número da página (opcional)
-            per_page: Itens por página (opcional)
+            fields: Campos a retornar (de Appointment.FIELDS; padrão todos)
             
         Returns:
             Lista de compromissos
+            
+        Raises:
+            ValueError: Se algum campo for inválido
+        """
+        return list(Appointment.iter_all(filters, fields))
+    
+    @staticmethod
+    def iter_all(filters: Optional[Dict[str, Any]] = None,
+                 fields: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Percorre os compromissos filtrados sem montar a lista inteira
+        
+        Os compromissos são lidos em páginas de STREAM_BATCH_SIZE conforme o
+        iterador avança, sem reservar uma conexão do pool entre elas.
+        
+        Args:
+            filters: Mesmos filtros de get_all
+            fields: Campos a retornar (de Appointment.FIELDS; padrão todos)
+            
+        Returns:
+            Iterador de compromissos, na ordem de get_all
+            
+        Raises:
+            ValueError: Se algum campo for inválido
         """
         try:
-            query = 'SELECT * FROM compromissos WHERE 1=1'
-            params = []
-            
-            if filters:
-                if filters.get('data_inicio'):
-                    query += ' AND data >= ?'
-                    params.append(filters['data_inicio'])
-                if filters.get('data_fim'):
-                    query += ' AND data <= ?'
-                    params.append(filters['data_fim'])
-                if filters.get('palavra_chave'):
-                    safe_kw = sanitize_for_search(filters['palavra_chave'])
-                    query += ' AND (palavra_chave LIKE ? OR titulo LIKE ?)'
-                    params.append(f"%{safe_kw}%")
-                    params.append(f"%{safe_kw}%")
-            
-            query += ' ORDER BY data ASC, horario_inicio ASC'
-            
-            # Paginação
-            if page is not None and per_page is not None:
-                try:
-                    page = int(page)
-                    per_page = int(per_page)
-                    offset = (page - 1) * per_page
-                    query += ' LIMIT ? OFFSET ?'
-                    params.append(per_page)
-                    params.append(offset)
-                except ValueError:
-                    pass
-            
-            rows = execute_query(query, params if params else None)
-            return [dict(row) for row in rows]
+            _projection(fields, Appointment.FIELDS)
         except Exception as e:
             logger.error(f"Erro ao buscar compromissos: {e}")
             raise
+        return _iter_pages(lambda cursor: Appointment.get_page(filters, STREAM_BATCH_SIZE, cursor,
+                                                               fields=fields))
+    
+    @staticmethod
+    def get_page(filters: Optional[Dict[str, Any]] = None, limit: int = 100,
+                 cursor: Optional[str] = None, include_total: bool = False,
+                 fields: Optional[List[str]] = None, columnar: bool = False) -> Dict[str, Any]:
+        """
+        Retorna uma página de compromissos usando paginação por cursor (keyset)
+        
+        A página continua a partir de (data, horario_inicio, id) da última
+        linha anterior, usando idx_compromissos_data_horario, então páginas
+        profundas custam o mesmo que a primeira.
+        
+        Args:
+            filters: Dicionário com filtros (data_inicio, data_fim, palavra_chave)
+            limit: Quantidade máxima de compromissos na página
+            cursor: Cursor opaco retornado pela página anterior (opcional)
+            include_total: Se True, inclui a contagem total (em cache por versão da tabela)
+            fields: Campos a retornar (de Appointment.FIELDS; padrão todos)
+            columnar: Se True, 'items' vem no formato {'columns', 'rows'}, montado
+                      direto das tuplas do SQLite
+            
+        Returns:
+            Dicionário com 'items', 'next_cursor' e 'total' (None se não solicitado)
+            
+        Raises:
+            ValueError: Se o cursor ou algum campo for inválido
+        """
+        try:
+            columns, output = _projection(fields, Appointment.FIELDS, ('data', 'horario_inicio'))
+            where, params = Appointment._filter_clause(filters)
+            total = _cached_count('compromissos', where, params) if include_total else None
+            
+            page_where = where
+            page_params = list(params)
+            if cursor:
+                last_date, last_start, last_id = decode_cursor(cursor, 3)
+                page_where += ' AND (data, horario_inicio, id) > (?, ?, ?)'
+                page_params.extend([last_date, last_start, last_id])
+            
+            query = f'SELECT {columns} FROM compromissos WHERE {page_where} ORDER BY {Appointment._ORDER_BY} LIMIT ?'
+            page_params.append(limit + 1)
+            if columnar:
+                names, rows = execute_query_columnar(query, page_params)
+            else:
+                rows = execute_query(query, page_params)
+            
+            next_cursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                last = dict(zip(names, rows[-1])) if columnar else rows[-1]
+                next_cursor = encode_cursor([last['data'], last['horario_inicio'], last['id']])
+            
+            if columnar:
+                items = _columnar(names, rows, output)
+            else:
+                items = [_project(dict(row), output) for row in rows]
+            
+            return {
+                'items': items,
+                'next_cursor': next_cursor,
+                'total': total
+            }
+        except Exception as e:
+            logger.error(f"Erro ao buscar página de compromissos: {e}")
+            raise
     
     @staticmethod
     def get_by_id(appointment_id: int) -> Optional[Dict[str, Any]]:
@@ -335,65 +1500,244 @@ class Appointment:
             raise
     
     @staticmethod
-    def update(appointment_id: int, data: Dict[str, Any]) -> int:
+    def update(appointment_id: int, data: Dict[str, Any],
+               expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """
-        Atualiza um compromisso
+        Valida e atualiza um compromisso em uma única instrução (UPDATE ... RETURNING)
+        
+        Os campos enviados são validados antes da escrita; se um dos horários
+        mudar, a linha resultante é validada por inteiro (fim depois do início)
+        e a escrita é desfeita se for inválida.
         
         Args:
             appointment_id: ID do compromisso
             data: Dicionário com dados para atualizar
+            expected_version: Versão que o cliente editou (If-Match), ou None
             
         Returns:
-            Número de linhas afetadas
+            Compromisso atualizado ou None se não existir
+            
+        Raises:
+            ValidationError: Se os dados resultantes forem inválidos
+            VersionConflictError: Se o compromisso tiver sido alterado desde expected_version
         """
         try:
-            fields = []
-            params = []
-            
-            allowed_fields = ['titulo', 'participantes', 'assunto_principal', 'palavra_chave',
-                            'local_link', 'data', 'horario_inicio', 'horario_fim', 'objetivo',
-                            'lembretes', 'notas_reuniao', 'proximos_passos']
-            
-            for field in allowed_fields:
-                if field in data:
-                    fields.append(f'{field} = ?')
-                    val = data[field]
-                    params.append(sanitize_string(val) if isinstance(val, str) else val)
-            
-            if not fields:
-                return 0
+            is_valid, errors = validate_appointment_data(data, partial=True)
+            if not is_valid:
+                raise ValidationError(errors)
             
-            fields.append('atualizado_em = CURRENT_TIMESTAMP')
-            params.append(appointment_id)
-            
-            query = f"UPDATE compromissos SET {', '.join(fields)} WHERE id = ?"
-            result = execute_update(query, params)
-            logger.info(f"Compromisso {appointment_id} atualizado")
-            return result
+            fields, params = Appointment._update_assignments(data)
+            check = None
+            if 'horario_inicio' in data or 'horario_fim' in data:
+                check = Appointment._check_row
+            appointment = _update_returning('compromissos', appointment_id, fields, params,
+                                            expected_version, dict, check)
+            if appointment and fields:
+                logger.info(f"Compromisso {appointment_id} atualizado (versão {appointment['versao']})")
+            return appointment
+        except VersionConflictError as e:
+            logger.warning(f"Conflito de versão no compromisso {appointment_id}: {e}")
+            raise
         except Exception as e:
             logger.error(f"Erro ao atualizar compromisso {appointment_id}: {e}")
             raise
     
     @staticmethod
-    def delete(appointment_id: int) -> int:
+    def _check_row(data: Dict[str, Any]) -> None:
+        """Valida o compromisso completo resultante de uma atualização"""
+        is_valid, errors = validate_appointment_data(data)
+        if not is_valid:
+            raise ValidationError(errors)
+    
+    @staticmethod
+    def delete(appointment_id: int, expected_version: Optional[int] = None) -> int:
         """
         Deleta um compromisso
         
         Args:
             appointment_id: ID do compromisso
+            expected_version: Versão exigida (If-Match), ou None
             
         Returns:
             Número de linhas afetadas
+            
+        Raises:
+            VersionConflictError: Se o compromisso tiver sido alterado desde expected_version
         """
         try:
-            query = 'DELETE FROM compromissos WHERE id = ?'
-            result = execute_update(query, (appointment_id,))
+            result = _delete_versioned('compromissos', appointment_id, expected_version, dict)
             logger.info(f"Compromisso {appointment_id} deletado. Linhas afetadas: {result}")
             return result
+        except VersionConflictError as e:
+            logger.warning(f"Conflito de versão no compromisso {appointment_id}: {e}")
+            raise
         except Exception as e:
             logger.error(f"Erro ao deletar compromisso {appointment_id}: {e}")
             raise
     
+    @staticmethod
+    def get_upcoming(days: int = 2, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna os compromissos de hoje em diante dentro de uma janela de dias
+        
+        Args:
+            days: Quantidade de dias da janela, contando hoje (2 = hoje e amanhã)
+            fields: Campos a retornar (de Appointment.FIELDS; padrão todos)
+            
+        Returns:
+            Lista de compromissos em ordem cronológica
+            
+        Raises:
+            ValueError: Se algum campo for inválido
+        """
+        try:
+            columns, _ = _projection(fields, Appointment.FIELDS)
+            query = f'''
+                SELECT {columns} FROM compromissos
+                WHERE data >= date('now', 'localtime') AND data < date('now', 'localtime', ?)
+                ORDER BY {Appointment._ORDER_BY}
+            '''
+            rows = execute_query(query, (f'+{int(days)} days',))
+            return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Erro ao buscar próximos compromissos: {e}")
+            raise
+    
+    @staticmethod
+    def get_stats(days_ahead: int = 7) -> Dict[str, Any]:
+        """
+        Retorna contagens de compromissos (total, hoje e próximos dias)
+        
+        As contagens vêm dos contadores por dia de estatisticas_contadores;
+        as janelas de data são calculadas pelo SQLite (horário local).
+        
+        Args:
+            days_ahead: Tamanho da janela de próximos compromissos, em dias
+            
+        Returns:
+            Dicionário com 'total', 'hoje' e 'proximos_7_dias'
+        """
+        try:
+            row = execute_query('''
+                SELECT
+                    (SELECT total FROM estatisticas_contadores
+                     WHERE escopo = 'compromissos' AND chave = 'total') AS total,
+                    (SELECT total FROM estatisticas_contadores
+                     WHERE escopo = 'compromissos_dia' AND chave = date('now', 'localtime')) AS hoje,
+                    (SELECT SUM(total) FROM estatisticas_contadores
+                     WHERE escopo = 'compromissos_dia'
+                       AND chave BETWEEN date('now', 'localtime')
+                                     AND date('now', 'localtime', '+' || ? || ' days')) AS proximos
+            ''', (int(days_ahead),))[0]
+            
+            return {
+                'total': row['total'] or 0,
+                'hoje': row['hoje'] or 0,
+                'proximos_7_dias': row['proximos'] or 0
+            }
+        except Exception as e:
+            logger.error(f"Erro ao calcular estatísticas de compromissos: {e}")
+            raise
+    
+    @staticmethod
+    def get_daily_counts(start_date: str, end_date: str) -> Dict[str, int]:
+        """
+        Retorna a quantidade de compromissos por dia no intervalo
+        
+        Lê os contadores por dia de estatisticas_contadores, sem tocar na
+        tabela de compromissos.
+        
+        Args:
+            start_date: Primeiro dia do intervalo (YYYY-MM-DD)
+            end_date: Último dia do intervalo, inclusive (YYYY-MM-DD)
+            
+        Returns:
+            Dicionário {dia: quantidade} apenas com os dias que têm compromissos
+        """
+        try:
+            rows = execute_query('''
+                SELECT chave, total FROM estatisticas_contadores
+                WHERE escopo = 'compromissos_dia' AND chave BETWEEN ? AND ?
+            ''', (start_date, end_date))
+            return {row['chave']: row['total'] for row in rows}
+        except Exception as e:
+            logger.error(f"Erro ao contar compromissos por dia: {e}")
+            raise
+    
+    @staticmethod
+    def _filter_clause(filters: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        """Monta a cláusula WHERE e os parâmetros a partir dos filtros de listagem"""
+        where = '1=1'
+        params: List[Any] = []
+        
+        if filters:
+            if filters.get('data_inicio'):
+                where += ' AND data >= ?'
+                params.append(filters['data_inicio'])
+            if filters.get('data_fim'):
+                where += ' AND data <= ?'
+                params.append(filters['data_fim'])
+            if filters.get('palavra_chave'):
+                safe_kw = sanitize_for_search(filters['palavra_chave'])
+                where += ' AND (palavra_chave LIKE ? OR titulo LIKE ?)'
+                params.append(f"%{safe_kw}%")
+                params.append(f"%{safe_kw}%")
+        
+        return where, params
+    
+    @staticmethod
+    def bulk_apply(operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Aplica operações de criação/atualização/exclusão em lote
+        
+        Args:
+            operations: Lista de operações ({'op', 'id', 'data'})
+            
+        Returns:
+            Resultado de cada operação, na mesma ordem recebida
+        """
+        try:
+            results = _apply_bulk('compromissos', operations, validate_appointment_data,
+                                  Appointment._INSERT_QUERY, Appointment._insert_params,
+                                  Appointment._update_assignments)
+            logger.info(f"Lote de {len(operations)} operações aplicado em compromissos")
+            return results
+        except Exception as e:
+            logger.error(f"Erro ao aplicar lote de compromissos: {e}")
+            raise
+    
+    @staticmethod
+    def _insert_params(data: Dict[str, Any]) -> Tuple:
+        """Monta os parâmetros do INSERT a partir dos dados do compromisso"""
+        return (
+            sanitize_string(data['titulo']),
+            sanitize_string(data.get('participantes', '')),
+            sanitize_string(data.get('assunto_principal', '')),
+            sanitize_string(data.get('palavra_chave', '')),
+            sanitize_string(data.get('local_link', '')),
+            data['data'],
+            data['horario_inicio'],
+            data['horario_fim'],
+            sanitize_string(data.get('objetivo', '')),
+            sanitize_string(data.get('lembretes', '')),
+            sanitize_string(data.get('notas_reuniao', '')),
+            sanitize_string(data.get('proximos_passos', ''))
+        )
+    
+    @staticmethod
+    def _update_assignments(data: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+        """Monta as atribuições do UPDATE (campos e parâmetros) a partir dos dados"""
+        fields = []
+        params = []
+        
+        for field in Appointment._UPDATABLE_FIELDS:
+            if field in data:
+                fields.append(f'{field} = ?')
+                val = data[field]
+                params.append(sanitize_string(val) if isinstance(val, str) else val)
+        
+        return fields, params
+    
     @staticmethod
     def generate_next_steps(appointment_id: int, notes: str) -> str:
         """
@@ -443,3 +1787,179 @@ class Appointment:
         except Exception as e:
             logger.error(f"Erro ao gerar próximos passos: {e}")
             raise
+
+
+class Search:
+    """Busca textual (FTS5) em tarefas (ativas e arquivadas) e compromissos"""
+    
+    # Consultas de cada tipo, uma por tabela FTS: colunas comuns para permitir
+    # um único ranking (bm25, menor é melhor)
+    _QUERIES = {
+        'tarefas': {
+            'tarefas_fts': '''
+                SELECT 'tarefa' AS tipo, t.id, t.titulo, t.status, t.prioridade,
+                       t.data_limite AS data, 0 AS arquivada,
+                       snippet(tarefas_fts, -1, '<mark>', '</mark>', '…', 12) AS trecho,
+                       bm25(tarefas_fts, 10.0, 2.0, 3.0, 5.0, 1.0) AS score
+                FROM tarefas_fts
+                JOIN tarefas t ON t.id = tarefas_fts.rowid
+                WHERE tarefas_fts MATCH ?
+            ''',
+            'tarefas_arquivo_fts': '''
+                SELECT 'tarefa' AS tipo, t.id, t.titulo, t.status, t.prioridade,
+                       t.data_limite AS data, 1 AS arquivada,
+                       snippet(tarefas_arquivo_fts, -1, '<mark>', '</mark>', '…', 12) AS trecho,
+                       bm25(tarefas_arquivo_fts, 10.0, 2.0, 3.0, 5.0, 1.0) AS score
+                FROM tarefas_arquivo_fts
+                JOIN tarefas_arquivo t ON t.id = tarefas_arquivo_fts.rowid
+                WHERE tarefas_arquivo_fts MATCH ?
+            '''
+        },
+        'compromissos': {
+            'compromissos_fts': '''
+                SELECT 'compromisso' AS tipo, c.id, c.titulo, NULL AS status, NULL AS prioridade,
+                       c.data AS data, 0 AS arquivada,
+                       snippet(compromissos_fts, -1, '<mark>', '</mark>', '…', 12) AS trecho,
+                       bm25(compromissos_fts, 10.0, 3.0, 5.0, 1.0) AS score
+                FROM compromissos_fts
+                JOIN compromissos c ON c.id = compromissos_fts.rowid
+                WHERE compromissos_fts MATCH ?
+            '''
+        },
+    }
+    
+    TYPES = tuple(_QUERIES.keys())
+    
+    @staticmethod
+    def query(term: str, types: Optional[List[str]] = None, limit: int = 20,
+              offset: int = 0, include_total: bool = False) -> Dict[str, Any]:
+        """
+        Busca tarefas e compromissos por relevância
+        
+        Args:
+            term: Texto de busca
+            types: Tipos a buscar ('tarefas', 'compromissos'); todos se None
+            limit: Quantidade máxima de resultados
+            offset: Quantidade de resultados a pular
+            include_total: Se True, inclui a contagem total de resultados
+            
+        Returns:
+            Dicionário com 'items' (ordenados por relevância) e 'total'
+            
+        Raises:
+            ValueError: Se a busca não tiver termos ou o tipo for inválido
+        """
+        fts_query = build_fts_query(term)
+        if not fts_query:
+            raise ValueError("Informe ao menos uma palavra para buscar")
+        
+        types = types or list(Search.TYPES)
+        invalid = [t for t in types if t not in Search._QUERIES]
+        if invalid:
+            raise ValueError(f"Tipo inválido. Use: {', '.join(Search.TYPES)}")
+        
+        try:
+            queries = {fts: sql for t in types for fts, sql in Search._QUERIES[t].items()}
+            union = ' UNION ALL '.join(queries.values())
+            query = f'SELECT * FROM ({union}) ORDER BY score ASC, id ASC LIMIT ? OFFSET ?'
+            params: List[Any] = [fts_query] * len(queries) + [limit, offset]
+            rows = execute_query(query, params)
+            
+            total = None
+            if include_total:
+                total = sum(
+                    execute_query(f'SELECT COUNT(*) FROM {fts} WHERE {fts} MATCH ?', (fts_query,))[0][0]
+                    for fts in queries
+                )
+            
+            return {'items': [{**dict(row), 'arquivada': bool(row['arquivada'])} for row in rows],
+                    'total': total}
+        except Exception as e:
+            logger.error(f"Erro na busca textual: {e}")
+            raise
+
+
+class Sync:
+    """Alterações incrementais de tarefas e compromissos, ordenadas pela sequência global (seq)"""
+    
+    TYPES = ('tarefas', 'compromissos')
+    _FIELDS = {'tarefas': Task.FIELDS, 'compromissos': Appointment.FIELDS}
+    
+    @staticmethod
+    def changes(since: int, limit: int = 1000, types: Optional[List[str]] = None,
+                fields: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+        """
+        Retorna as linhas criadas, alteradas ou excluídas depois de um seq
+        
+        Todas as consultas rodam na mesma transação de leitura, então o seq
+        devolvido corresponde exatamente ao estado retornado.
+        
+        Args:
+            since: Último seq já aplicado pelo cliente (0 = carga completa, sem exclusões)
+            limit: Quantidade máxima de alterações na resposta
+            types: Tipos incluídos ('tarefas', 'compromissos'); padrão todos
+            fields: Campos a retornar por tipo (ex.: {'tarefas': ['titulo', 'status']});
+                    tipos ausentes retornam todos os campos
+            
+        Returns:
+            Dicionário com as linhas de cada tipo, 'excluidos' ([{'tipo', 'id', 'seq'}]),
+            'seq' (valor a enviar como since na próxima chamada), 'mais' (há mais
+            alterações além do limite) e 'reiniciar' (since anterior à poda do
+            registro de exclusões: o cliente deve sincronizar do zero)
+            
+        Raises:
+            ValueError: Se since for negativo ou algum tipo ou campo for inválido
+        """
+        types = list(types) if types else list(Sync.TYPES)
+        if since < 0:
+            raise ValueError("since deve ser maior ou igual a zero")
+        invalid = [t for t in types if t not in Sync.TYPES]
+        if invalid:
+            raise ValueError(f"Tipo inválido: {', '.join(invalid)}")
+        fields = fields or {}
+        projections = {t: _projection(fields.get(t), Sync._FIELDS[t], ('seq',)) for t in types}
+        
+        def _read(conn: sqlite3.Connection) -> Dict[str, Any]:
+            state = conn.execute('SELECT seq, exclusoes_podadas_ate FROM sincronizacao').fetchone()
+            result: Dict[str, Any] = {t: [] for t in types}
+            result.update({'excluidos': [], 'seq': state['seq'], 'mais': False, 'reiniciar': False})
+            if since and since < state['exclusoes_podadas_ate']:
+                result['reiniciar'] = True
+                return result
+            
+            # Até limit + 1 de cada fonte; a mesclagem por seq decide o que entra
+            entries = []
+            for table in types:
+                columns = projections[table][0]
+                rows = conn.execute(f'SELECT {columns} FROM {table} WHERE seq > ? ORDER BY seq LIMIT ?',
+                                    (since, limit + 1))
+                entries.extend((row['seq'], table, row) for row in rows)
+            if since:
+                placeholders = ', '.join('?' * len(types))
+                rows = conn.execute(f'''
+                    SELECT seq, tabela, registro_id FROM exclusoes
+                    WHERE seq > ? AND tabela IN ({placeholders})
+                    ORDER BY seq LIMIT ?
+                ''', (since, *types, limit + 1))
+                entries.extend((row['seq'], None, row) for row in rows)
+            
+            entries.sort(key=lambda entry: entry[0])
+            if len(entries) > limit:
+                entries = entries[:limit]
+                result['mais'] = True
+                result['seq'] = entries[-1][0]
+            
+            for _, table, row in entries:
+                if table is None:
+                    result['excluidos'].append({'tipo': row['tabela'], 'id': row['registro_id'], 'seq': row['seq']})
+                elif table == 'tarefas':
+                    result[table].append(_project(Task._row_to_dict(row), projections[table][1]))
+                else:
+                    result[table].append(_project(dict(row), projections[table][1]))
+            return result
+        
+        try:
+            return execute_read(_read)
+        except Exception as e:
+            logger.error(f"Erro ao buscar alterações desde {since}: {e}")
+            raise
@@ -2,16 +2,23 @@
 Rotas para gerenciamento de compromissos
 """
 from flask import Blueprint, request, jsonify
-from models import Appointment
+import config
+from models import Appointment, ValidationError, VersionConflictError
+from utils.cache import (cached_response, conditional_get, conflict_response, if_match_version,
+                         versioned_response)
 from utils.logger import setup_logger
-from utils.validators import validate_appointment_data
+from utils.pagination import parse_page_size
+from utils.serialization import api_response, stream_json_list, wants_columnar, wants_stream
+from utils.validators import parse_field_list
 
 logger = setup_logger(__name__)
 appointments_bp = Blueprint('appointments', __name__)
 
 @appointments_bp.route('/api/appointments', methods=['GET'])
+@conditional_get('compromissos')
+@cached_response('compromissos')
 def get_appointments():
-    """Lista todos os compromissos com filtros opcionais e paginação"""
+    """Lista compromissos com filtros opcionais e paginação por cursor"""
     try:
         filters = {
             'data_inicio': request.args.get('data_inicio'),
@@ -19,35 +26,49 @@ def get_appointments():
             'palavra_chave': request.args.get('palavra_chave')
         }
         
-        # Paginação
-        page = request.args.get('page')
-        per_page = request.args.get('per_page')
-        
         # Remove filtros vazios
         filters = {k: v for k, v in filters.items() if v}
+        fields = parse_field_list(request.args.get('fields'))
         
-        appointments = Appointment.get_all(filters if filters else None, page, per_page)
+        # Lista completa em streaming, sem paginação
+        if wants_stream():
+            if wants_columnar():
+                raise ValueError("format=columnar não é suportado com stream")
+            return stream_json_list(Appointment.iter_all(filters if filters else None, fields),
+                                    {'stream': True})
         
-        return jsonify({
+        # Paginação por cursor
+        per_page = parse_page_size(request.args.get('per_page'),
+                                   config.DEFAULT_PAGE_SIZE, config.MAX_PAGE_SIZE)
+        include_total = request.args.get('include_total', '').lower() in ('1', 'true')
+        
+        page = Appointment.get_page(filters if filters else None, per_page,
+                                    request.args.get('cursor'), include_total,
+                                    fields, wants_columnar())
+        
+        meta = {'per_page': per_page, 'next_cursor': page['next_cursor']}
+        if include_total:
+            meta['total'] = page['total']
+        
+        return api_response({
             'success': True, 
-            'data': appointments,
-            'meta': {
-                'page': int(page) if page else 1,
-                'per_page': int(per_page) if per_page else len(appointments)
-            }
-        }), 200
+            'data': page['items'],
+            'meta': meta
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Erro ao listar compromissos: {e}")
         return jsonify({'success': False, 'error': 'Erro interno ao listar compromissos'}), 500
 
 @appointments_bp.route('/api/appointments/<int:appointment_id>', methods=['GET'])
 def get_appointment(appointment_id):
-    """Retorna um compromisso específico"""
+    """Retorna um compromisso específico (ETag = versão do compromisso)"""
     try:
         appointment = Appointment.get_by_id(appointment_id)
         if not appointment:
             return jsonify({'success': False, 'error': 'Compromisso não encontrado'}), 404
-        return jsonify({'success': True, 'data': appointment}), 200
+        return versioned_response(appointment)
     except Exception as e:
         logger.error(f"Erro ao buscar compromisso {appointment_id}: {e}")
         return jsonify({'success': False, 'error': 'Erro interno ao buscar compromisso'}), 500
@@ -59,62 +80,46 @@ def create_appointment():
         if not request.is_json:
             return jsonify({'success': False, 'error': 'Content-Type deve ser application/json'}), 415
             
-        data = request.get_json()
-        
-        # Validar dados
-        is_valid, errors = validate_appointment_data(data)
-        if not is_valid:
-            return jsonify({'success': False, 'errors': errors}), 400
-        
-        appointment_id = Appointment.create(data)
-        appointment = Appointment.get_by_id(appointment_id)
-        
-        return jsonify({'success': True, 'data': appointment}), 201
+        appointment = Appointment.create(request.get_json())
+        return versioned_response(appointment, 201)
+    except ValidationError as e:
+        return jsonify({'success': False, 'errors': e.errors}), 400
     except Exception as e:
         logger.error(f"Erro ao criar compromisso: {e}")
         return jsonify({'success': False, 'error': 'Erro interno ao criar compromisso'}), 500
 
 @appointments_bp.route('/api/appointments/<int:appointment_id>', methods=['PUT'])
 def update_appointment(appointment_id):
-    """Atualiza um compromisso"""
+    """Atualiza um compromisso (com If-Match, apenas se a versão ainda for a mesma)"""
     try:
         if not request.is_json:
             return jsonify({'success': False, 'error': 'Content-Type deve ser application/json'}), 415
-            
-        data = request.get_json()
         
-        # Verificar se compromisso existe
-        existing = Appointment.get_by_id(appointment_id)
-        if not existing:
+        appointment = Appointment.update(appointment_id, request.get_json(), if_match_version())
+        if not appointment:
             return jsonify({'success': False, 'error': 'Compromisso não encontrado'}), 404
-        
-        # Mesclar dados existentes com novos para validação completa
-        merged_data = {**existing, **data}
-        
-        # Validar dados completos
-        is_valid, errors = validate_appointment_data(merged_data)
-        if not is_valid:
-            return jsonify({'success': False, 'errors': errors}), 400
-        
-        Appointment.update(appointment_id, data)
-        appointment = Appointment.get_by_id(appointment_id)
-        
-        return jsonify({'success': True, 'data': appointment}), 200
+        return versioned_response(appointment)
+    except ValidationError as e:
+        return jsonify({'success': False, 'errors': e.errors}), 400
+    except VersionConflictError as e:
+        return conflict_response(e.current)
     except Exception as e:
         logger.error(f"Erro ao atualizar compromisso {appointment_id}: {e}")
         return jsonify({'success': False, 'error': 'Erro interno ao atualizar compromisso'}), 500
 
 @appointments_bp.route('/api/appointments/<int:appointment_id>', methods=['DELETE'])
 def delete_appointment(appointment_id):
-    """Deleta um compromisso"""
+    """Deleta um compromisso (com If-Match, apenas se a versão ainda for a mesma)"""
     try:
         # Race condition fix: Tenta deletar diretamente e verifica linhas afetadas
-        rows_affected = Appointment.delete(appointment_id)
+        rows_affected = Appointment.delete(appointment_id, if_match_version())
         
         if rows_affected == 0:
             return jsonify({'success': False, 'error': 'Compromisso não encontrado'}), 404
         
         return jsonify({'success': True, 'message': 'Compromisso deletado com sucesso'}), 200
+    except VersionConflictError as e:
+        return conflict_response(e.current)
     except Exception as e:
         logger.error(f"Erro ao deletar compromisso {appointment_id}: {e}")
         return jsonify({'success': False, 'error': 'Erro interno ao deletar compromisso'}), 500
@@ -142,3 +147,35 @@ def generate_next_steps(appointment_id):
     except Exception as e:
         logger.error(f"Erro ao gerar próximos passos: {e}")
         return jsonify({'success': False, 'error': 'Erro interno ao gerar próximos passos'}), 500
+
+@appointments_bp.route('/api/appointments/bulk', methods=['POST'])
+def bulk_appointments():
+    """Cria, atualiza e deleta compromissos em lote, em uma única transação"""
+    try:
+        if not request.is_json:
+            return jsonify({'success': False, 'error': 'Content-Type deve ser application/json'}), 415
+        
+        data = request.get_json()
+        operations = data.get('operations') if isinstance(data, dict) else data
+        
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'success': False, 'error': "Envie uma lista não vazia em 'operations'"}), 400
+        
+        if len(operations) > config.BULK_MAX_OPERATIONS:
+            return jsonify({'success': False, 'error': f'Máximo de {config.BULK_MAX_OPERATIONS} operações por requisição'}), 413
+        
+        results = Appointment.bulk_apply(operations)
+        failed = sum(1 for r in results if not r['success'])
+        
+        return jsonify({
+            'success': failed == 0,
+            'data': results,
+            'meta': {
+                'total': len(results),
+                'succeeded': len(results) - failed,
+                'failed': failed
+            }
+        }), 200 if failed == 0 else 207
+    except Exception as e:
+        logger.error(f"Erro ao aplicar lote de compromissos: {e}")
+        return jsonify({'success': False, 'error': 'Erro interno ao aplicar lote de compromissos'}), 500
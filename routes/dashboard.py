@@ -3,77 +3,25 @@ Rotas para dashboard e estatísticas
 """
 from flask import Blueprint, request, jsonify
 from datetime import datetime, timedelta
+from typing import Tuple
+import config
 from models import Task, Appointment
+from utils.cache import cached_response, conditional_get
 from utils.logger import setup_logger
+from utils.validators import parse_date, parse_field_list
 
 logger = setup_logger(__name__)
 dashboard_bp = Blueprint('dashboard', __name__)
 
 @dashboard_bp.route('/api/dashboard/stats', methods=['GET'])
+@conditional_get('tarefas', 'tarefas_arquivo', 'compromissos')
+@cached_response('tarefas', 'tarefas_arquivo', 'compromissos')
 def get_stats():
     """Retorna estatísticas gerais do sistema"""
     try:
-        # Buscar todas as tarefas
-        all_tasks = Task.get_all()
-        
-        # Contar por status
-        status_counts = {
-            'pendente': 0,
-            'em_andamento': 0,
-            'concluida': 0,
-            'adiada': 0
-        }
-        
-        for task in all_tasks:
-            status = task.get('status', 'pendente')
-            if status in status_counts:
-                status_counts[status] += 1
-        
-        # Contar por prioridade
-        priority_counts = {
-            'urgente': 0,
-            'alta': 0,
-            'media': 0,
-            'baixa': 0
-        }
-        
-        for task in all_tasks:
-            priority = task.get('prioridade', 'media')
-            if priority in priority_counts:
-                priority_counts[priority] += 1
-        
-        # Contar por categoria
-        category_counts = {}
-        for task in all_tasks:
-            category = task.get('categoria', 'Sem categoria')
-            category_counts[category] = category_counts.get(category, 0) + 1
-        
-        # Buscar compromissos
-        all_appointments = Appointment.get_all()
-        
-        # Compromissos hoje
-        today = datetime.now().strftime('%Y-%m-%d')
-        today_appointments = [a for a in all_appointments if a.get('data', '').strip() == today]
-        
-        # Compromissos próximos 7 dias
-        week_later = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
-        upcoming_appointments = [
-            a for a in all_appointments 
-            if today <= a.get('data', '') <= week_later
-        ]
-        
         stats = {
-            'tarefas': {
-                'total': len(all_tasks),
-                'por_status': status_counts,
-                'por_prioridade': priority_counts,
-                'por_categoria': category_counts
-            },
-            'compromissos': {
-                'total': len(all_appointments),
-                'hoje': len(today_appointments),
-                'proximos_7_dias': len(upcoming_appointments)
-            }
+            'tarefas': Task.get_stats(),
+            'compromissos': Appointment.get_stats(days_ahead=7)
         }
         
         return jsonify({'success': True, 'data': stats}), 200
@@ -82,92 +30,101 @@ def get_stats():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @dashboard_bp.route('/api/dashboard/urgent', methods=['GET'])
+@conditional_get('tarefas', 'compromissos')
+@cached_response('tarefas', 'compromissos')
 def get_urgent_items():
     """Retorna itens urgentes (tarefas urgentes e compromissos próximos)"""
     try:
-        # Tarefas urgentes ou com prazo próximo
-        all_tasks = Task.get_all()
-        urgent_tasks = []
-        
-        today = datetime.now()
-        
-        for task in all_tasks:
-            if task.get('status') == 'concluida':
-                continue
-                
-            is_urgent = False
-            
-            # Prioridade urgente
-            if task.get('prioridade') == 'urgente':
-                is_urgent = True
-            
-            # Data limite próxima (3 dias)
-            if task.get('data_limite'):
-                try:
-                    deadline = datetime.fromisoformat(task['data_limite'].replace('Z', '+00:00'))
-                    days_until = (deadline - today).days
-                    if days_until <= 3:
-                        is_urgent = True
-                except:
-                    pass
-            
-            if is_urgent:
-                urgent_tasks.append(task)
-        
-        # Compromissos próximos (hoje e amanhã)
-        tomorrow = (today + timedelta(days=1)).strftime('%Y-%m-%d')
-        today_str = today.strftime('%Y-%m-%d')
-        
-        all_appointments = Appointment.get_all()
-        upcoming_appointments = [
-            a for a in all_appointments 
-            if a.get('data') in [today_str, tomorrow]
-        ]
+        # Horizontes configuráveis por parâmetro (em dias)
+        deadline_days = request.args.get('dias', config.URGENT_DEADLINE_DAYS, type=int)
+        appointment_days = request.args.get('dias_compromissos', config.UPCOMING_APPOINTMENT_DAYS, type=int)
+        if not (0 <= deadline_days <= 365 and 1 <= appointment_days <= 365):
+            return jsonify({'success': False, 'error': 'Horizonte inválido (use de 0 a 365 dias)'}), 400
         
         return jsonify({
             'success': True, 
             'data': {
-                'tarefas_urgentes': urgent_tasks,
-                'compromissos_proximos': upcoming_appointments
+                'tarefas_urgentes': Task.get_urgent(deadline_days, parse_field_list(request.args.get('fields_tarefas'))),
+                'compromissos_proximos': Appointment.get_upcoming(appointment_days,
+                                                                  parse_field_list(request.args.get('fields_compromissos')))
             }
         }), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Erro ao buscar itens urgentes: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@dashboard_bp.route('/api/dashboard/calendar', methods=['GET'])
-def get_calendar_data():
-    """Retorna dados para visualização de calendário mensal"""
-    try:
+def _parse_calendar_range() -> Tuple[str, str]:
+    """
+    Lê o intervalo do calendário dos parâmetros da requisição
+    
+    Aceita data_inicio/data_fim (YYYY-MM-DD) ou year/month com o número
+    opcional de meses (meses, padrão 1). Sem parâmetros, usa o mês atual.
+    
+    Returns:
+        tuple: (primeiro_dia, ultimo_dia) no formato YYYY-MM-DD
+        
+    Raises:
+        ValueError: Se as datas forem inválidas ou o intervalo exceder o limite
+    """
+    start_arg = request.args.get('data_inicio')
+    end_arg = request.args.get('data_fim')
+    
+    if start_arg or end_arg:
+        if not (start_arg and end_arg):
+            raise ValueError("Informe data_inicio e data_fim")
+        start = parse_date(start_arg)
+        end = parse_date(end_arg)
+    else:
         # Parâmetros de data (mês/ano)
         year = request.args.get('year', datetime.now().year, type=int)
         month = request.args.get('month', datetime.now().month, type=int)
+        months = request.args.get('meses', 1, type=int)
+        if not (1 <= month <= 12 and 1 <= year <= 9999 and months >= 1):
+            raise ValueError("Mês, ano ou quantidade de meses inválidos")
+        
+        # Primeiro dia do mês inicial e último dia do mês final
+        start = datetime(year, month, 1)
+        end_index = year * 12 + (month - 1) + months
+        if end_index // 12 > 9999:
+            raise ValueError("Mês, ano ou quantidade de meses inválidos")
+        end = datetime(end_index // 12, end_index % 12 + 1, 1) - timedelta(days=1)
+    
+    if end < start:
+        raise ValueError("data_fim deve ser posterior a data_inicio")
+    if (end - start).days + 1 > config.CALENDAR_MAX_RANGE_DAYS:
+        raise ValueError(f"Intervalo máximo de {config.CALENDAR_MAX_RANGE_DAYS} dias")
+    
+    return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+
+@dashboard_bp.route('/api/dashboard/calendar', methods=['GET'])
+@conditional_get('tarefas', 'compromissos')
+@cached_response('tarefas', 'compromissos')
+def get_calendar_data():
+    """Retorna dados para o calendário (mês, semana ou intervalo de vários meses)"""
+    try:
+        first_day, last_day = _parse_calendar_range()
         
-        # Primeiro e último dia do mês
-        first_day = datetime(year, month, 1).strftime('%Y-%m-%d')
-        if month == 12:
-            last_day = datetime(year, 12, 31).strftime('%Y-%m-%d')
-        else:
-            last_day = (datetime(year, month + 1, 1) - timedelta(days=1)).strftime('%Y-%m-%d')
+        # Campos opcionais; as colunas de data são sempre incluídas para o agrupamento por dia
+        appointment_fields = parse_field_list(request.args.get('fields_compromissos'))
+        if appointment_fields and 'data' not in appointment_fields:
+            appointment_fields.append('data')
+        task_fields = parse_field_list(request.args.get('fields_tarefas'))
+        if task_fields and 'data_limite' not in task_fields:
+            task_fields.append('data_limite')
         
-        # Buscar compromissos do mês
+        # Buscar compromissos do intervalo
         appointments = Appointment.get_all({
             'data_inicio': first_day,
             'data_fim': last_day
-        })
-        
-        # Buscar tarefas com prazo no mês
-        all_tasks = Task.get_all()
-        month_tasks = []
+        }, appointment_fields)
         
-        for task in all_tasks:
-            if task.get('data_limite'):
-                try:
-                    deadline_date = datetime.fromisoformat(task['data_limite'].replace('Z', '+00:00')).strftime('%Y-%m-%d')
-                    if first_day <= deadline_date <= last_day:
-                        month_tasks.append(task)
-                except:
-                    pass
+        # Buscar tarefas com prazo no intervalo
+        tasks = Task.get_all({
+            'data_limite_inicio': first_day,
+            'data_limite_fim': last_day
+        }, task_fields)
         
         # Organizar por dia
         calendar_data = {}
@@ -178,16 +135,47 @@ def get_calendar_data():
                 calendar_data[date] = {'compromissos': [], 'tarefas': []}
             calendar_data[date]['compromissos'].append(appointment)
         
-        for task in month_tasks:
-            try:
-                date = datetime.fromisoformat(task['data_limite'].replace('Z', '+00:00')).strftime('%Y-%m-%d')
-                if date not in calendar_data:
-                    calendar_data[date] = {'compromissos': [], 'tarefas': []}
-                calendar_data[date]['tarefas'].append(task)
-            except:
-                pass
+        for task in tasks:
+            date = task['data_limite'][:10]
+            if date not in calendar_data:
+                calendar_data[date] = {'compromissos': [], 'tarefas': []}
+            calendar_data[date]['tarefas'].append(task)
         
         return jsonify({'success': True, 'data': calendar_data}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Erro ao buscar dados do calendário: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
+
+@dashboard_bp.route('/api/dashboard/calendar/summary', methods=['GET'])
+@conditional_get('tarefas', 'compromissos')
+@cached_response('tarefas', 'compromissos')
+def get_calendar_summary():
+    """Retorna contagens por dia (tarefas por prioridade e compromissos) para o intervalo do calendário"""
+    try:
+        first_day, last_day = _parse_calendar_range()
+        
+        task_counts = Task.get_daily_counts(first_day, last_day)
+        appointment_counts = Appointment.get_daily_counts(first_day, last_day)
+        
+        # Organizar por dia (apenas dias com itens)
+        summary = {}
+        for date in sorted(set(task_counts) | set(appointment_counts)):
+            by_priority = task_counts.get(date, {})
+            summary[date] = {
+                'compromissos': appointment_counts.get(date, 0),
+                'tarefas': sum(by_priority.values()),
+                'tarefas_por_prioridade': by_priority
+            }
+        
+        return jsonify({
+            'success': True,
+            'data': summary,
+            'meta': {'data_inicio': first_day, 'data_fim': last_day}
+        }), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erro ao buscar resumo do calendário: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,37 @@
+"""
+Rotas do feed de alterações em tempo real (Server-Sent Events)
+"""
+from flask import Blueprint, Response, request, jsonify
+from utils.events import SubscriberLimitError, event_stream
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+events_bp = Blueprint('events', __name__)
+
+@events_bp.route('/api/events', methods=['GET'])
+def stream_events():
+    """Transmite eventos de criação, alteração e exclusão de tarefas e compromissos"""
+    # O navegador reenvia Last-Event-ID ao reconectar; o parâmetro cobre a primeira conexão
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('ultimo_evento')
+    if last_event_id is not None:
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Last-Event-ID inválido'}), 400
+        if last_event_id < 0:
+            return jsonify({'success': False, 'error': 'Last-Event-ID inválido'}), 400
+    
+    try:
+        messages = event_stream(last_event_id)
+    except SubscriberLimitError as e:
+        # Cada assinante ocupa uma thread do servidor; acima do limite o cliente tenta depois
+        logger.warning(str(e))
+        response = jsonify({'success': False, 'error': str(e)})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    
+    return Response(
+        messages,
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
@@ -0,0 +1,35 @@
+"""
+Rotas de busca textual
+"""
+from flask import Blueprint, request, jsonify
+from models import Search
+from utils.logger import setup_logger
+from utils.pagination import parse_page_size
+
+logger = setup_logger(__name__)
+search_bp = Blueprint('search', __name__)
+
+@search_bp.route('/api/search', methods=['GET'])
+def search():
+    """Busca tarefas e compromissos por relevância, com trechos destacados"""
+    try:
+        term = request.args.get('q', '')
+        types = [t for t in request.args.get('tipo', '').split(',') if t] or None
+        per_page = parse_page_size(request.args.get('per_page'), 20, 100)
+        page = request.args.get('page', 1, type=int)
+        if page < 1:
+            return jsonify({'success': False, 'error': 'Página inválida'}), 400
+        include_total = request.args.get('include_total', '').lower() in ('1', 'true')
+        
+        result = Search.query(term, types, per_page, (page - 1) * per_page, include_total)
+        
+        meta = {'page': page, 'per_page': per_page}
+        if include_total:
+            meta['total'] = result['total']
+        
+        return jsonify({'success': True, 'data': result['items'], 'meta': meta}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erro ao buscar: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,43 @@
+"""
+Rotas de sincronização incremental
+"""
+from flask import Blueprint, request, jsonify
+import config
+from models import Sync
+from utils.logger import setup_logger
+from utils.pagination import parse_page_size
+from utils.validators import parse_field_list
+
+logger = setup_logger(__name__)
+sync_bp = Blueprint('sync', __name__)
+
+@sync_bp.route('/api/sync', methods=['GET'])
+def get_changes():
+    """Retorna tarefas e compromissos criados, alterados ou excluídos desde um seq"""
+    try:
+        try:
+            since = int(request.args.get('since', 0))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Parâmetro since inválido'}), 400
+        types = [t for t in request.args.get('tipo', '').split(',') if t] or None
+        limit = parse_page_size(request.args.get('limit'), config.MAX_PAGE_SIZE, config.MAX_PAGE_SIZE)
+        
+        fields = {t: parse_field_list(request.args.get(f'fields_{t}')) for t in Sync.TYPES}
+        
+        changes = Sync.changes(since, limit, types, fields)
+        meta = {'since': since, 'seq': changes.pop('seq'), 'mais': changes.pop('mais')}
+        
+        # Exclusões anteriores a since já foram podadas: o cliente precisa recomeçar do zero
+        if changes.pop('reiniciar'):
+            return jsonify({
+                'success': False,
+                'error': 'Histórico de alterações indisponível para este since; sincronize novamente com since=0',
+                'meta': meta
+            }), 410
+        
+        return jsonify({'success': True, 'data': changes, 'meta': meta}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erro ao buscar alterações: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
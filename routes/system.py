@@ -0,0 +1,28 @@
+"""
+Rotas de diagnóstico e métricas do sistema
+"""
+from flask import Blueprint, jsonify
+from database import get_pool_stats, get_writer_stats
+from utils.cache import response_cache
+from utils.events import get_broker
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+system_bp = Blueprint('system', __name__)
+
+@system_bp.route('/api/system/metrics', methods=['GET'])
+def get_metrics():
+    """Retorna métricas internas (pool de conexões, escritor do banco, cache de respostas e feed de eventos)"""
+    try:
+        metrics = {
+            'banco': {
+                'pool': get_pool_stats(),
+                'escritor': get_writer_stats()
+            },
+            'cache': response_cache.stats(),
+            'eventos': get_broker().stats()
+        }
+        return jsonify({'success': True, 'data': metrics}), 200
+    except Exception as e:
+        logger.error(f"Erro ao buscar métricas: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
@@ -2,41 +2,72 @@
 Rotas para gerenciamento de tarefas
 """
 from flask import Blueprint, request, jsonify
-from models import Task
+import config
+from models import Task, TaskArchive, ValidationError, VersionConflictError
+from utils.cache import (cached_response, conditional_get, conflict_response, if_match_version,
+                         versioned_response)
 from utils.logger import setup_logger
-from utils.validators import validate_task_data
+from utils.pagination import parse_page_size
+from utils.serialization import api_response, stream_json_list, wants_columnar, wants_stream
+from utils.validators import parse_date, parse_field_list
 
 logger = setup_logger(__name__)
 tasks_bp = Blueprint('tasks', __name__)
 
 @tasks_bp.route('/api/tasks', methods=['GET'])
+@conditional_get('tarefas')
+@cached_response('tarefas')
 def get_tasks():
-    """Lista todas as tarefas com filtros opcionais"""
+    """Lista tarefas com filtros opcionais e paginação por cursor"""
     try:
         filters = {
             'status': request.args.get('status'),
             'prioridade': request.args.get('prioridade'),
             'categoria': request.args.get('categoria'),
-            'palavra_chave': request.args.get('palavra_chave')
+            'palavra_chave': request.args.get('palavra_chave'),
+            'data_limite_inicio': request.args.get('data_limite_inicio'),
+            'data_limite_fim': request.args.get('data_limite_fim')
         }
         
         # Remove filtros vazios
         filters = {k: v for k, v in filters.items() if v}
+        fields = parse_field_list(request.args.get('fields'))
+        
+        # Lista completa em streaming, sem paginação
+        if wants_stream():
+            if wants_columnar():
+                raise ValueError("format=columnar não é suportado com stream")
+            return stream_json_list(Task.iter_all(filters if filters else None, fields),
+                                    {'stream': True})
+        
+        # Paginação por cursor
+        per_page = parse_page_size(request.args.get('per_page'),
+                                   config.DEFAULT_PAGE_SIZE, config.MAX_PAGE_SIZE)
+        include_total = request.args.get('include_total', '').lower() in ('1', 'true')
+        
+        page = Task.get_page(filters if filters else None, per_page,
+                             request.args.get('cursor'), include_total,
+                             fields, wants_columnar())
+        
+        meta = {'per_page': per_page, 'next_cursor': page['next_cursor']}
+        if include_total:
+            meta['total'] = page['total']
         
-        tasks = Task.get_all(filters if filters else None)
-        return jsonify({'success': True, 'data': tasks}), 200
+        return api_response({'success': True, 'data': page['items'], 'meta': meta})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Erro ao listar tarefas: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @tasks_bp.route('/api/tasks/<int:task_id>', methods=['GET'])
 def get_task(task_id):
-    """Retorna uma tarefa específica"""
+    """Retorna uma tarefa específica (ETag = versão da tarefa)"""
     try:
         task = Task.get_by_id(task_id)
         if not task:
             return jsonify({'success': False, 'error': 'Tarefa não encontrada'}), 404
-        return jsonify({'success': True, 'data': task}), 200
+        return versioned_response(task)
     except Exception as e:
         logger.error(f"Erro ao buscar tarefa {task_id}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -45,90 +76,202 @@ def get_task(task_id):
 def create_task():
     """Cria uma nova tarefa"""
     try:
-        data = request.get_json()
-        
-        # Validar dados
-        is_valid, errors = validate_task_data(data)
-        if not is_valid:
-            return jsonify({'success': False, 'errors': errors}), 400
-        
-        task_id = Task.create(data)
-        task = Task.get_by_id(task_id)
-        
-        return jsonify({'success': True, 'data': task}), 201
+        task = Task.create(request.get_json())
+        return versioned_response(task, 201)
+    except ValidationError as e:
+        return jsonify({'success': False, 'errors': e.errors}), 400
     except Exception as e:
         logger.error(f"Erro ao criar tarefa: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @tasks_bp.route('/api/tasks/<int:task_id>', methods=['PUT'])
 def update_task(task_id):
-    """Atualiza uma tarefa"""
+    """Atualiza uma tarefa (com If-Match, apenas se a versão ainda for a mesma)"""
     try:
-        data = request.get_json()
-        
-        # Verificar se tarefa existe
-        if not Task.get_by_id(task_id):
+        task = Task.update(task_id, request.get_json(), if_match_version())
+        if not task:
             return jsonify({'success': False, 'error': 'Tarefa não encontrada'}), 404
-        
-        # Validar dados se campos obrigatórios estiverem presentes
-        if any(k in data for k in ['titulo', 'categoria', 'prioridade', 'status']):
-            existing = Task.get_by_id(task_id)
-            merged_data = {**existing, **data}
-            is_valid, errors = validate_task_data(merged_data)
-            if not is_valid:
-                return jsonify({'success': False, 'errors': errors}), 400
-        
-        Task.update(task_id, data)
-        task = Task.get_by_id(task_id)
-        
-        return jsonify({'success': True, 'data': task}), 200
+        return versioned_response(task)
+    except ValidationError as e:
+        return jsonify({'success': False, 'errors': e.errors}), 400
+    except VersionConflictError as e:
+        return conflict_response(e.current)
     except Exception as e:
         logger.error(f"Erro ao atualizar tarefa {task_id}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @tasks_bp.route('/api/tasks/<int:task_id>', methods=['DELETE'])
 def delete_task(task_id):
-    """Deleta uma tarefa"""
+    """Deleta uma tarefa (com If-Match, apenas se a versão ainda for a mesma)"""
     try:
-        if not Task.get_by_id(task_id):
+        if not Task.delete(task_id, if_match_version()):
             return jsonify({'success': False, 'error': 'Tarefa não encontrada'}), 404
-        
-        Task.delete(task_id)
         return jsonify({'success': True, 'message': 'Tarefa deletada com sucesso'}), 200
+    except VersionConflictError as e:
+        return conflict_response(e.current)
     except Exception as e:
         logger.error(f"Erro ao deletar tarefa {task_id}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @tasks_bp.route('/api/tasks/<int:task_id>/status', methods=['PATCH'])
 def update_task_status(task_id):
-    """Atualiza apenas o status de uma tarefa"""
+    """Atualiza apenas o status de uma tarefa (aceita If-Match)"""
     try:
         data = request.get_json()
         
         if 'status' not in data:
             return jsonify({'success': False, 'error': 'Status não fornecido'}), 400
         
-        if not Task.get_by_id(task_id):
-            return jsonify({'success': False, 'error': 'Tarefa não encontrada'}), 404
-        
         valid_statuses = ['pendente', 'em_andamento', 'concluida', 'adiada']
-        if data['status'].lower() not in valid_statuses:
+        if not isinstance(data['status'], str) or data['status'].lower() not in valid_statuses:
             return jsonify({'success': False, 'error': f'Status inválido. Use: {", ".join(valid_statuses)}'}), 400
         
-        Task.update(task_id, {'status': data['status']})
-        task = Task.get_by_id(task_id)
-        
-        return jsonify({'success': True, 'data': task}), 200
+        task = Task.update(task_id, {'status': data['status']}, if_match_version())
+        if not task:
+            return jsonify({'success': False, 'error': 'Tarefa não encontrada'}), 404
+        return versioned_response(task)
+    except VersionConflictError as e:
+        return conflict_response(e.current)
     except Exception as e:
         logger.error(f"Erro ao atualizar status da tarefa {task_id}: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@tasks_bp.route('/api/tasks/<int:task_id>/unarchive', methods=['POST'])
+def unarchive_task(task_id):
+    """Devolve uma tarefa arquivada à tabela ativa"""
+    try:
+        task = TaskArchive.unarchive(task_id)
+        if not task:
+            return jsonify({'success': False, 'error': 'Tarefa não encontrada no arquivo'}), 404
+        return versioned_response(task)
+    except Exception as e:
+        logger.error(f"Erro ao desarquivar tarefa {task_id}: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/board', methods=['GET'])
+@conditional_get('tarefas')
+@cached_response('tarefas')
+def get_task_board():
+    """
+    Retorna o quadro kanban: por status, o total e os primeiros cartões
+    
+    Com status e cursor (next_cursor da coluna), retorna a próxima página
+    apenas daquela coluna.
+    """
+    try:
+        limit = parse_page_size(request.args.get('limit'),
+                                config.BOARD_COLUMN_SIZE, config.MAX_PAGE_SIZE)
+        board = Task.get_board(limit, parse_field_list(request.args.get('fields')),
+                               request.args.get('status') or None,
+                               request.args.get('cursor') or None)
+        return api_response({'success': True, 'data': board, 'meta': {'limit': limit}})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erro ao buscar quadro de tarefas: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @tasks_bp.route('/api/tasks/completed', methods=['GET'])
+@conditional_get('tarefas', 'tarefas_arquivo')
 def get_completed_tasks():
-    """Retorna histórico de tarefas concluídas"""
+    """Retorna histórico de tarefas concluídas (em streaming)"""
     try:
-        tasks = Task.get_completed()
-        return jsonify({'success': True, 'data': tasks}), 200
+        return stream_json_list(Task.iter_completed())
     except Exception as e:
         logger.error(f"Erro ao buscar tarefas concluídas: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/history', methods=['GET'])
+@conditional_get('tarefas', 'tarefas_arquivo')
+@cached_response('tarefas', 'tarefas_arquivo')
+def get_task_history():
+    """Histórico de tarefas concluídas, filtrado por período de conclusão e paginado por cursor"""
+    try:
+        filters = {
+            'data_inicio': request.args.get('data_inicio'),
+            'data_fim': request.args.get('data_fim'),
+            'categoria': request.args.get('categoria'),
+            'palavra_chave': request.args.get('palavra_chave')
+        }
+        filters = {k: v for k, v in filters.items() if v}
+        
+        # Período de conclusão: mesmas regras de data do calendário, normalizado para a comparação de texto
+        period = {key: parse_date(filters[key]) for key in ('data_inicio', 'data_fim') if key in filters}
+        if len(period) == 2 and period['data_fim'] < period['data_inicio']:
+            raise ValueError("data_fim deve ser posterior a data_inicio")
+        filters.update({key: value.strftime('%Y-%m-%d') for key, value in period.items()})
+        
+        per_page = parse_page_size(request.args.get('per_page'),
+                                   config.DEFAULT_PAGE_SIZE, config.MAX_PAGE_SIZE)
+        include_total = request.args.get('include_total', '').lower() in ('1', 'true')
+        
+        page = Task.get_history(filters, per_page, request.args.get('cursor'), include_total,
+                                parse_field_list(request.args.get('fields')))
+        
+        meta = {'per_page': per_page, 'next_cursor': page['next_cursor']}
+        if include_total:
+            meta['total'] = page['total']
+        
+        return api_response({'success': True, 'data': page['items'], 'meta': meta})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erro ao buscar histórico de tarefas: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/moves', methods=['POST'])
+def move_tasks():
+    """Move cartões do quadro (status e posição) em lote, em uma única transação"""
+    try:
+        if not request.is_json:
+            return jsonify({'success': False, 'error': 'Content-Type deve ser application/json'}), 415
+        
+        data = request.get_json()
+        moves = data.get('moves') if isinstance(data, dict) else data
+        
+        if not isinstance(moves, list) or not moves:
+            return jsonify({'success': False, 'error': "Envie uma lista não vazia em 'moves'"}), 400
+        
+        if len(moves) > config.BULK_MAX_OPERATIONS:
+            return jsonify({'success': False, 'error': f'Máximo de {config.BULK_MAX_OPERATIONS} movimentos por requisição'}), 413
+        
+        return jsonify({'success': True, 'data': Task.move(moves)}), 200
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except VersionConflictError as e:
+        return conflict_response(e.current)
+    except Exception as e:
+        logger.error(f"Erro ao mover tarefas: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@tasks_bp.route('/api/tasks/bulk', methods=['POST'])
+def bulk_tasks():
+    """Cria, atualiza e deleta tarefas em lote, em uma única transação"""
+    try:
+        if not request.is_json:
+            return jsonify({'success': False, 'error': 'Content-Type deve ser application/json'}), 415
+        
+        data = request.get_json()
+        operations = data.get('operations') if isinstance(data, dict) else data
+        
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'success': False, 'error': "Envie uma lista não vazia em 'operations'"}), 400
+        
+        if len(operations) > config.BULK_MAX_OPERATIONS:
+            return jsonify({'success': False, 'error': f'Máximo de {config.BULK_MAX_OPERATIONS} operações por requisição'}), 413
+        
+        results = Task.bulk_apply(operations)
+        failed = sum(1 for r in results if not r['success'])
+        
+        return jsonify({
+            'success': failed == 0,
+            'data': results,
+            'meta': {
+                'total': len(results),
+                'succeeded': len(results) - failed,
+                'failed': failed
+            }
+        }), 200 if failed == 0 else 207
+    except Exception as e:
+        logger.error(f"Erro ao aplicar lote de tarefas: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
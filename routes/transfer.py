@@ -0,0 +1,70 @@
+"""
+Rotas de exportação e importação de tarefas e compromissos
+"""
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+import config
+from models import Task, Appointment
+from utils.logger import setup_logger
+from utils.transfer import MIMETYPES, export_rows, import_records, parse_format, read_records
+from utils.validators import parse_field_list
+
+logger = setup_logger(__name__)
+transfer_bp = Blueprint('transfer', __name__)
+
+# Modelo e filtros aceitos (os mesmos das listagens) por tipo
+_MODELS = {
+    'tarefas': (Task, ('status', 'prioridade', 'categoria', 'palavra_chave',
+                       'data_limite_inicio', 'data_limite_fim')),
+    'compromissos': (Appointment, ('data_inicio', 'data_fim', 'palavra_chave'))
+}
+
+def _model_for(tipo):
+    """Retorna o modelo e os filtros do tipo pedido"""
+    if tipo not in _MODELS:
+        raise ValueError(f"Tipo inválido. Use: {', '.join(_MODELS)}")
+    return _MODELS[tipo]
+
+@transfer_bp.route('/api/export', methods=['GET'])
+def export_data():
+    """Exporta tarefas ou compromissos filtrados em NDJSON ou CSV, em streaming"""
+    try:
+        tipo = request.args.get('tipo', '')
+        model, filter_names = _model_for(tipo)
+        fmt = parse_format(request.args.get('formato'))
+        fields = parse_field_list(request.args.get('fields'))
+
+        filters = {name: request.args.get(name) for name in filter_names}
+        filters = {k: v for k, v in filters.items() if v}
+
+        columns = list(dict.fromkeys(['id', *fields])) if fields else list(model.FIELDS)
+        chunks = export_rows(model.iter_all(filters if filters else None, fields), fmt, columns)
+
+        return Response(chunks, mimetype=MIMETYPES[fmt], headers={
+            'Content-Disposition': f'attachment; filename="{tipo}.{fmt}"'
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erro ao exportar dados: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@transfer_bp.route('/api/import', methods=['POST'])
+def import_data():
+    """
+    Importa tarefas ou compromissos de um corpo NDJSON ou CSV, em lotes
+
+    A resposta é NDJSON: uma linha de progresso por lote aplicado e uma
+    linha final com 'concluido'.
+    """
+    try:
+        model, _ = _model_for(request.args.get('tipo', ''))
+        fmt = parse_format(request.args.get('formato'))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    def generate():
+        for progress in import_records(read_records(request.stream, fmt), model.bulk_apply,
+                                       config.IMPORT_BATCH_SIZE):
+            yield current_app.json.dumps(progress) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=MIMETYPES['ndjson'])
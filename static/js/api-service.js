@@ -4,9 +4,14 @@
 
 import { CONFIG, MESSAGES } from './config.js';
 
+// Quantidade máxima de respostas GET guardadas para revalidação por ETag
+const MAX_CACHED_RESPONSES = 100;
+
 class ApiService {
     constructor() {
         this.baseUrl = CONFIG.API_BASE_URL;
+        // URL -> { etag, data } das últimas respostas GET
+        this.responseCache = new Map();
     }
 
     /**
@@ -21,20 +26,42 @@ class ApiService {
             'Content-Type': 'application/json'
         };
 
+        const isGet = (options.method || 'GET').toUpperCase() === 'GET';
+        const cached = isGet ? this.responseCache.get(url) : undefined;
+
         const config = {
             ...options,
             headers: {
                 ...defaultHeaders,
+                ...(cached ? { 'If-None-Match': cached.etag } : {}),
                 ...options.headers
             }
         };
 
         try {
             const response = await fetch(url, config);
+
+            // Nada mudou no servidor: reutiliza o corpo já recebido
+            if (response.status === 304 && cached) {
+                return cached.data;
+            }
+
             const data = await response.json();
 
             if (!response.ok) {
-                throw new Error(data.error || MESSAGES.ERROR.GENERIC);
+                const error = new Error(data.error || MESSAGES.ERROR.GENERIC);
+                // 412: o registro mudou desde a versão enviada em If-Match
+                error.status = response.status;
+                throw error;
+            }
+
+            const etag = response.headers.get('ETag');
+            if (isGet && etag) {
+                this.responseCache.delete(url);
+                this.responseCache.set(url, { etag, data });
+                if (this.responseCache.size > MAX_CACHED_RESPONSES) {
+                    this.responseCache.delete(this.responseCache.keys().next().value);
+                }
             }
 
             return data;
@@ -57,15 +84,34 @@ class ApiService {
         });
     }
 
-    async put(endpoint, data) {
+    async put(endpoint, data, headers = {}) {
         return this.request(endpoint, {
             method: 'PUT',
-            body: JSON.stringify(data)
+            body: JSON.stringify(data),
+            headers
         });
     }
 
-    async delete(endpoint) {
-        return this.request(endpoint, { method: 'DELETE' });
+    async patch(endpoint, data, headers = {}) {
+        return this.request(endpoint, {
+            method: 'PATCH',
+            body: JSON.stringify(data),
+            headers
+        });
+    }
+
+    async delete(endpoint, headers = {}) {
+        return this.request(endpoint, { method: 'DELETE', headers });
+    }
+
+    /**
+     * Cabeçalho If-Match para alterar um registro apenas se ele ainda estiver
+     * na versão informada (a API responde 412 caso contrário)
+     * @param {number|string|undefined} versao - Versão do registro
+     * @returns {Object}
+     */
+    ifMatch(versao) {
+        return versao ? { 'If-Match': `"${versao}"` } : {};
     }
 }
 
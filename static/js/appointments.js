@@ -16,6 +16,8 @@ export const AppointmentsState = {
         total: 0,
         totalPages: 0
     },
+    // Cursor de início de cada página já visitada (índice = página - 1)
+    cursors: [null],
     filters: {
         data_inicio: '',
         data_fim: '',
@@ -26,16 +28,30 @@ export const AppointmentsState = {
 export async function loadAppointments(page = 1) {
     showLoading('appointments-list');
     try {
+        // Paginação por cursor: só é possível ir para páginas cujo cursor já é conhecido
+        if (page === 1 || AppointmentsState.cursors[page - 1] === undefined) {
+            page = 1;
+            AppointmentsState.cursors = [null];
+        }
         AppointmentsState.pagination.page = page;
         const params = {
-            page: AppointmentsState.pagination.page,
             per_page: AppointmentsState.pagination.perPage,
+            include_total: 1,
+            fields: CONFIG.LIST_FIELDS.APPOINTMENT,
             ...AppointmentsState.filters
         };
+        const cursor = AppointmentsState.cursors[page - 1];
+        if (cursor) {
+            params.cursor = cursor;
+        }
 
         const response = await api.get('/appointments', params);
         AppointmentsState.items = response.data;
-        AppointmentsState.pagination = { ...AppointmentsState.pagination, ...response.meta };
+        AppointmentsState.cursors[page] = response.meta.next_cursor || undefined;
+
+        const total = response.meta.total || 0;
+        AppointmentsState.pagination.total = total;
+        AppointmentsState.pagination.totalPages = Math.max(1, Math.ceil(total / AppointmentsState.pagination.perPage));
 
         renderAppointmentsList();
     } catch (error) {
@@ -124,7 +140,9 @@ export async function saveAppointment(event) {
 
     try {
         if (id) {
-            await api.put(`/appointments/${id}`, data);
+            // Só grava se o compromisso não mudou desde que o formulário foi aberto
+            const versao = document.getElementById('appointment-id').dataset.versao;
+            await api.put(`/appointments/${id}`, data, api.ifMatch(versao));
             showNotification(MESSAGES.SUCCESS.UPDATED, 'success');
         } else {
             await api.post('/appointments', data);
@@ -152,6 +170,7 @@ export async function editAppointment(id) {
         const app = response.data;
 
         document.getElementById('appointment-id').value = app.id;
+        document.getElementById('appointment-id').dataset.versao = app.versao;
         document.getElementById('appointment-titulo').value = app.titulo;
         document.getElementById('appointment-participantes').value = app.participantes || '';
         document.getElementById('appointment-assunto').value = app.assunto_principal || '';
@@ -300,6 +319,7 @@ export async function generateNextSteps(id) {
 export function openNewAppointmentModal() {
     document.getElementById('appointment-form').reset();
     document.getElementById('appointment-id').value = '';
+    delete document.getElementById('appointment-id').dataset.versao;
 
     // Definir data de hoje
     const today = new Date().toISOString().split('T')[0];
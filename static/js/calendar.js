@@ -3,6 +3,7 @@
  */
 
 import { api } from './api-service.js';
+import { CONFIG } from './config.js';
 import { showNotification, showLoading, hideLoading, openModal, closeModal } from './ui.js';
 import { formatDate, sanitize } from './utils.js';
 import { menuManager } from './menu-actions.js';
@@ -20,7 +21,8 @@ const monthNames = [
 export async function loadCalendar() {
     showLoading('calendar-grid');
     try {
-        const response = await api.get('/dashboard/calendar', {
+        // Apenas contagens por dia; os itens são carregados ao abrir um dia
+        const response = await api.get('/dashboard/calendar/summary', {
             year: currentYear,
             month: currentMonth
         });
@@ -94,34 +96,28 @@ function renderCalendar(data) {
 
     for (let day = 1; day <= daysInMonth; day++) {
         const dateStr = `${currentYear}-${String(currentMonth).padStart(2, '0')}-${String(day).padStart(2, '0')}`;
-        const dayData = data[dateStr] || { compromissos: [], tarefas: [] };
+        const dayData = data[dateStr] || { compromissos: 0, tarefas: 0, tarefas_por_prioridade: {} };
         const isToday = isCurrentMonth && day === today.getDate();
         
-        html += `<div class="calendar-day ${isToday ? 'today' : ''} ${dayData.compromissos.length > 0 || dayData.tarefas.length > 0 ? 'has-events' : ''}" 
+        html += `<div class="calendar-day ${isToday ? 'today' : ''} ${dayData.compromissos > 0 || dayData.tarefas > 0 ? 'has-events' : ''}" 
                      data-date="${dateStr}"
                      onclick="window.showDayDetails('${dateStr}')">`;
         
         html += `<div class="calendar-day-number">${day}</div>`;
         
-        // Mostrar até 3 eventos
-        const allEvents = [...dayData.compromissos.slice(0, 2), ...dayData.tarefas.slice(0, 1)];
-        allEvents.forEach((event, idx) => {
-            const isAppointment = 'horario_inicio' in event;
-            const eventType = isAppointment ? 'appointment' : 'task';
-            const eventClass = isAppointment ? 'calendar-appointment' : 'calendar-task';
-            const eventTitle = sanitize(event.titulo || event.titulo || 'Sem título');
-            
-            html += `<div class="calendar-event ${eventClass}" 
-                          onclick="event.stopPropagation(); window.showEventDetails(${event.id}, '${eventType}')"
-                          title="${eventTitle}">
-                      ${eventTitle.length > 15 ? eventTitle.substring(0, 15) + '...' : eventTitle}
+        // Contadores do dia
+        if (dayData.compromissos > 0) {
+            html += `<div class="calendar-event calendar-appointment">
+                      📅 ${dayData.compromissos} ${dayData.compromissos === 1 ? 'compromisso' : 'compromissos'}
+                    </div>`;
+        }
+        if (dayData.tarefas > 0) {
+            const priorities = Object.entries(dayData.tarefas_por_prioridade)
+                .map(([priority, count]) => `${priority}: ${count}`)
+                .join(', ');
+            html += `<div class="calendar-event calendar-task" title="${sanitize(priorities)}">
+                      ✅ ${dayData.tarefas} ${dayData.tarefas === 1 ? 'tarefa' : 'tarefas'}
                     </div>`;
-        });
-        
-        // Indicador de mais eventos
-        const totalEvents = dayData.compromissos.length + dayData.tarefas.length;
-        if (totalEvents > 3) {
-            html += `<div class="calendar-more-events">+${totalEvents - 3} mais</div>`;
         }
         
         html += '</div>';
@@ -135,10 +131,12 @@ window.showDayDetails = function(dateStr) {
     // Fechar qualquer modal de detalhes de compromisso que esteja aberto
     closeModal('appointment-details-modal');
     
-    // Buscar dados do dia
+    // Buscar apenas os itens do dia
     api.get('/dashboard/calendar', {
-        year: parseInt(dateStr.split('-')[0]),
-        month: parseInt(dateStr.split('-')[1])
+        data_inicio: dateStr,
+        data_fim: dateStr,
+        fields_tarefas: CONFIG.LIST_FIELDS.TASK,
+        fields_compromissos: CONFIG.LIST_FIELDS.APPOINTMENT
     }).then(response => {
         const dayData = response.data[dateStr] || { compromissos: [], tarefas: [] };
         
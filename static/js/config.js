@@ -10,6 +10,8 @@ export const CONFIG = {
         DEFAULT_PAGE: 1,
         DEFAULT_PER_PAGE: 10
     },
+    // Cartões por coluna do quadro (carga inicial e cada "carregar mais")
+    KANBAN_COLUMN_SIZE: 50,
     STATUS: {
         PENDENTE: 'pendente',
         EM_ANDAMENTO: 'em_andamento',
@@ -21,6 +23,13 @@ export const CONFIG = {
         ALTA: 'alta',
         MEDIA: 'media',
         BAIXA: 'baixa'
+    },
+    // Campos pedidos às listagens (parâmetro fields); os formulários de
+    // edição buscam o registro completo
+    LIST_FIELDS: {
+        TASK: 'titulo,descricao,categoria,prioridade,status,data_limite',
+        TASK_BOARD: 'titulo,descricao,categoria,prioridade,status,data_limite,versao,posicao',
+        APPOINTMENT: 'titulo,data,horario_inicio,horario_fim,local_link'
     }
 };
 
@@ -30,7 +39,8 @@ export const MESSAGES = {
         GENERIC: 'Ocorreu um erro inesperado.',
         LOAD_DATA: 'Erro ao carregar dados.',
         SAVE_DATA: 'Erro ao salvar dados.',
-        DELETE_DATA: 'Erro ao excluir item.'
+        DELETE_DATA: 'Erro ao excluir item.',
+        CONFLICT: 'Este item foi alterado em outro lugar. Os dados foram recarregados.'
     },
     SUCCESS: {
         SAVED: 'Salvo com sucesso!',
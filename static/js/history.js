@@ -8,6 +8,7 @@ import * as TasksModule from './tasks.js';
 
 export const HistoryState = {
     items: [],
+    cursor: null,
     filters: {
         periodo: 30,
         categoria: '',
@@ -15,88 +16,33 @@ export const HistoryState = {
     }
 };
 
+// Tarefas por página do histórico
+const HISTORY_PAGE_SIZE = 50;
+
+// Parâmetros de /api/tasks/history a partir dos filtros da tela
+function historyParams() {
+    const { periodo, categoria, palavra_chave } = HistoryState.filters;
+    const params = { per_page: HISTORY_PAGE_SIZE, categoria, palavra_chave };
+    
+    if (periodo && periodo !== 'all') {
+        const cutoffDate = new Date();
+        cutoffDate.setDate(cutoffDate.getDate() - parseInt(periodo));
+        params.data_inicio = [
+            cutoffDate.getFullYear(),
+            String(cutoffDate.getMonth() + 1).padStart(2, '0'),
+            String(cutoffDate.getDate()).padStart(2, '0')
+        ].join('-');
+    }
+    return params;
+}
+
 export async function loadHistory() {
     showLoading('history-list');
     try {
-        // Buscar todas as tarefas
-        const response = await api.get('/tasks', { per_page: 1000 });
-        const allTasks = response.data || [];
-        
-        // Filtrar apenas tarefas concluídas
-        let completedTasks = allTasks.filter(task => task.status === 'concluida');
-        
-        // Aplicar filtro de período
-        if (HistoryState.filters.periodo && HistoryState.filters.periodo !== 'all') {
-            const days = parseInt(HistoryState.filters.periodo);
-            const cutoffDate = new Date();
-            cutoffDate.setDate(cutoffDate.getDate() - days);
-            cutoffDate.setHours(0, 0, 0, 0);
-            
-            completedTasks = completedTasks.filter(task => {
-                // Usar data_limite se disponível, senão usar atualizado_em ou criado_em
-                let taskDate = null;
-                if (task.data_limite) {
-                    try {
-                        taskDate = new Date(task.data_limite);
-                    } catch {
-                        // Ignorar se data inválida
-                    }
-                }
-                if (!taskDate && task.atualizado_em) {
-                    try {
-                        taskDate = new Date(task.atualizado_em);
-                    } catch {
-                        // Ignorar se data inválida
-                    }
-                }
-                if (!taskDate && task.criado_em) {
-                    try {
-                        taskDate = new Date(task.criado_em);
-                    } catch {
-                        // Ignorar se data inválida
-                    }
-                }
-                
-                if (!taskDate) return false;
-                taskDate.setHours(0, 0, 0, 0);
-                return taskDate >= cutoffDate;
-            });
-        }
-        
-        // Aplicar filtro de categoria
-        if (HistoryState.filters.categoria) {
-            const categoriaLower = HistoryState.filters.categoria.toLowerCase();
-            completedTasks = completedTasks.filter(task => 
-                task.categoria && task.categoria.toLowerCase().includes(categoriaLower)
-            );
-        }
-        
-        // Aplicar filtro de palavra-chave
-        if (HistoryState.filters.palavra_chave) {
-            const keywordLower = HistoryState.filters.palavra_chave.toLowerCase();
-            completedTasks = completedTasks.filter(task => {
-                const searchText = `${task.titulo} ${task.descricao || ''} ${task.palavra_chave || ''}`.toLowerCase();
-                return searchText.includes(keywordLower);
-            });
-        }
-        
-        // Ordenar por data de atualização (mais recentes primeiro)
-        completedTasks.sort((a, b) => {
-            const dateA = a.atualizado_em || a.criado_em || a.data_limite || '';
-            const dateB = b.atualizado_em || b.criado_em || b.data_limite || '';
-            
-            if (!dateA && !dateB) return 0;
-            if (!dateA) return 1;
-            if (!dateB) return -1;
-            
-            try {
-                return new Date(dateB) - new Date(dateA);
-            } catch {
-                return 0;
-            }
-        });
-        
-        HistoryState.items = completedTasks;
+        // Primeira página do histórico, já filtrada e ordenada pela data de conclusão
+        const response = await api.get('/tasks/history', historyParams());
+        HistoryState.items = response.data || [];
+        HistoryState.cursor = response.meta.next_cursor;
         renderHistoryList();
     } catch (error) {
         console.error('Erro ao carregar histórico:', error);
@@ -107,6 +53,20 @@ export async function loadHistory() {
     }
 }
 
+export async function loadMoreHistory() {
+    if (!HistoryState.cursor) return;
+    
+    try {
+        const response = await api.get('/tasks/history', { ...historyParams(), cursor: HistoryState.cursor });
+        HistoryState.items = HistoryState.items.concat(response.data || []);
+        HistoryState.cursor = response.meta.next_cursor;
+        renderHistoryList();
+    } catch (error) {
+        console.error('Erro ao carregar mais do histórico:', error);
+        showNotification('Erro ao carregar tarefas concluídas.', 'error');
+    }
+}
+
 function renderHistoryList() {
     const container = document.getElementById('history-list');
     if (!container) return;
@@ -121,28 +81,47 @@ function renderHistoryList() {
         html += renderHistoryTaskItem(task);
     });
     html += '</div>';
+    
+    if (HistoryState.cursor) {
+        html += '<div class="pagination"><button class="btn btn-secondary" onclick="window.loadMoreHistory()">Carregar mais</button></div>';
+    }
 
     container.innerHTML = html;
 }
 
 function renderHistoryTaskItem(task) {
     const priorityClass = `priority-${task.prioridade}`;
+    // Tarefas arquivadas não podem ser editadas: precisam voltar à tabela ativa antes
+    const onclick = task.arquivada ? '' : `onclick="window.editTask(${task.id})"`;
     
     return `
-        <div class="task-item ${priorityClass}" onclick="window.editTask(${task.id})">
+        <div class="task-item ${priorityClass}" ${onclick}>
             <div class="task-header">
                 <div class="task-title">[${sanitize(task.categoria)}] ${sanitize(task.titulo)}</div>
                 <div class="task-badges">
                     <span class="badge badge-status concluida">${formatStatus(task.status)}</span>
                     <span class="badge badge-priority">${sanitize(task.prioridade)}</span>
+                    ${task.arquivada ? `<span class="badge">Arquivada</span>
+                    <button class="btn btn-secondary" onclick="window.unarchiveTask(${task.id}); event.stopPropagation()">Desarquivar</button>` : ''}
                 </div>
             </div>
             ${task.descricao ? `<p style="color: var(--text-secondary); margin-bottom: 0.5rem;">${sanitize(task.descricao)}</p>` : ''}
-            ${task.atualizado_em ? `<p style="color: var(--text-muted); font-size: 0.9rem;">📅 Concluída em: ${formatDate(task.atualizado_em)}</p>` : task.data_limite ? `<p style="color: var(--text-muted); font-size: 0.9rem;">📅 Data limite: ${formatDate(task.data_limite)}</p>` : ''}
+            ${task.concluido_em ? `<p style="color: var(--text-muted); font-size: 0.9rem;">📅 Concluída em: ${formatDate(task.concluido_em)}</p>` : task.data_limite ? `<p style="color: var(--text-muted); font-size: 0.9rem;">📅 Data limite: ${formatDate(task.data_limite)}</p>` : ''}
         </div>
     `;
 }
 
+export async function unarchiveTask(id) {
+    try {
+        await api.post(`/tasks/${id}/unarchive`, {});
+        showNotification('Tarefa desarquivada!', 'success');
+        loadHistory();
+    } catch (error) {
+        console.error('Erro ao desarquivar tarefa:', error);
+        showNotification('Erro ao desarquivar tarefa.', 'error');
+    }
+}
+
 export function applyHistoryFilters() {
     HistoryState.filters = {
         periodo: document.getElementById('filter-periodo').value,
@@ -2,12 +2,91 @@
  * Módulo Kanban
  */
 import { api } from './api-service.js';
+import { CONFIG, MESSAGES } from './config.js';
 import { showNotification, showLoading, hideLoading, openModal } from './ui.js';
 import { sanitize, formatDate, formatStatus } from './utils.js';
 import { menuManager } from './menu-actions.js';
 
 let isLoadingKanban = false;
 
+const BOARD_STATUSES = ['pendente', 'em_andamento', 'concluida', 'adiada'];
+
+// Cartões carregados (id -> tarefa) e, por coluna, o total e o cursor de "carregar mais"
+const boardTasks = new Map();
+const boardColumns = {};
+
+/**
+ * Busca o quadro já agrupado por status, mantendo em cada coluna pelo
+ * menos a quantidade de cartões já carregada
+ */
+async function fetchBoard() {
+    const loaded = Math.max(0, ...BOARD_STATUSES.map(status => columnTasks(status).length));
+    const response = await api.get('/tasks/board', {
+        fields: CONFIG.LIST_FIELDS.TASK_BOARD,
+        limit: Math.max(CONFIG.KANBAN_COLUMN_SIZE, loaded)
+    });
+    boardTasks.clear();
+    applyColumns(response.data);
+}
+
+// Aplica as colunas retornadas por /api/tasks/board
+function applyColumns(columns) {
+    Object.entries(columns).forEach(([status, column]) => {
+        column.items.forEach(task => boardTasks.set(task.id, task));
+        boardColumns[status] = { total: column.total, cursor: column.next_cursor };
+    });
+}
+
+// Cartões carregados de uma coluna, na ordem do quadro
+function columnTasks(status) {
+    return Array.from(boardTasks.values())
+        .filter(task => task.status === status)
+        .sort(compareTasks);
+}
+
+// Ordem do quadro: posição na coluna (comparada como texto, igual ao SQLite) e id
+function compareTasks(a, b) {
+    const posA = a.posicao || '';
+    const posB = b.posicao || '';
+    return (posA < posB ? -1 : posA > posB ? 1 : 0) || (a.id - b.id);
+}
+
+// Cartão após o qual a tarefa foi solta (null = topo da coluna)
+function anchorTaskId(column, taskId, clientY) {
+    let anchor = null;
+    column.querySelectorAll('.kanban-task').forEach(card => {
+        if (card.dataset.taskId === taskId) return;
+        const rect = card.getBoundingClientRect();
+        if (rect.top + rect.height / 2 < clientY) {
+            anchor = Number(card.dataset.taskId);
+        }
+    });
+    return anchor;
+}
+
+/**
+ * Carrega a próxima página de uma coluna
+ */
+export async function loadMoreKanban(status) {
+    const column = boardColumns[status];
+    if (!column || !column.cursor) return;
+    
+    try {
+        const response = await api.get('/tasks/board', {
+            status,
+            cursor: column.cursor,
+            fields: CONFIG.LIST_FIELDS.TASK_BOARD,
+            limit: CONFIG.KANBAN_COLUMN_SIZE
+        });
+        applyColumns(response.data);
+        dragAndDropSetup = false;
+        renderKanban();
+    } catch (error) {
+        console.error('Erro ao carregar mais tarefas:', error);
+        showNotification('Erro ao carregar mais tarefas.', 'error');
+    }
+}
+
 export async function loadKanban() {
     // Prevenir múltiplas chamadas simultâneas
     if (isLoadingKanban) {
@@ -23,11 +102,8 @@ export async function loadKanban() {
     }
     
     try {
-        // Carregar todas as tarefas sem paginação para o Kanban
-        const response = await api.get('/tasks', { per_page: 1000 });
-        const tasks = response.data || [];
-        
-        renderKanban(tasks);
+        await fetchBoard();
+        renderKanban();
     } catch (error) {
         console.error('Erro ao carregar Kanban:', error);
         showNotification('Erro ao carregar quadro de tarefas.', 'error');
@@ -37,32 +113,21 @@ export async function loadKanban() {
     }
 }
 
-function renderKanban(tasks) {
+function renderKanban() {
     const container = document.getElementById('kanban-board');
     if (!container) return;
 
-    // Organizar tarefas por status
-    const tasksByStatus = {
-        pendente: [],
-        em_andamento: [],
-        concluida: [],
-        adiada: []
-    };
-
-    tasks.forEach(task => {
-        const status = task.status || 'pendente';
-        if (tasksByStatus[status]) {
-            tasksByStatus[status].push(task);
-        }
-    });
-
     // Renderizar cada coluna
-    Object.keys(tasksByStatus).forEach(status => {
+    BOARD_STATUSES.forEach(status => {
         const columnId = `kanban-${status}`;
         const column = document.getElementById(columnId);
         if (!column) return;
 
-        const statusTasks = tasksByStatus[status];
+        const statusTasks = columnTasks(status);
+        const { total = statusTasks.length, cursor = null } = boardColumns[status] || {};
+        
+        const count = document.getElementById(`kanban-count-${status}`);
+        if (count) count.textContent = total;
         
         if (statusTasks.length === 0) {
             column.innerHTML = '<p class="empty-column">Nenhuma tarefa</p>';
@@ -71,6 +136,11 @@ function renderKanban(tasks) {
             statusTasks.forEach(task => {
                 html += renderKanbanTask(task);
             });
+            if (cursor) {
+                html += `<button class="btn btn-secondary kanban-load-more" onclick="window.loadMoreKanban('${status}')">
+                    Carregar mais (${Math.max(0, total - statusTasks.length)})
+                </button>`;
+            }
             column.innerHTML = html;
         }
     });
@@ -126,6 +196,13 @@ function renderKanbanTask(task) {
     `;
 }
 
+// Id do cartão anterior à tarefa na sua coluna (null se for o primeiro)
+function previousTaskId(task) {
+    const column = columnTasks(task.status);
+    const index = column.findIndex(other => other.id === task.id);
+    return index > 0 ? column[index - 1].id : null;
+}
+
 let dragAndDropSetup = false;
 
 function setupDragAndDrop() {
@@ -189,22 +266,35 @@ function setupDragAndDrop() {
             
             if (!taskId || !newStatus) return;
             
-            // Atualizar status da tarefa
+            // Mover a tarefa para o ponto solto, apenas se ela não mudou desde a carga do quadro
+            const task = boardTasks.get(Number(taskId));
+            const apos = anchorTaskId(column, taskId, e.clientY);
+            if (task && task.status === newStatus && apos === previousTaskId(task)) return;
+            
+            dragAndDropSetup = false; // Resetar para permitir nova configuração
             try {
-                const task = await api.get(`/tasks/${taskId}`);
-                const taskData = task.data;
-                
-                await api.put(`/tasks/${taskId}`, {
-                    ...taskData,
-                    status: newStatus
+                const response = await api.post('/tasks/moves', {
+                    moves: [{ id: Number(taskId), status: newStatus, apos, versao: task?.versao }]
                 });
                 
-                showNotification('Status da tarefa atualizado!', 'success');
-                dragAndDropSetup = false; // Resetar para permitir nova configuração
-                await loadKanban(); // Recarregar o Kanban
+                // A resposta traz apenas as linhas alteradas: aplica e redesenha sem recarregar
+                response.data.forEach(row => {
+                    const previous = boardTasks.get(row.id);
+                    if (previous && previous.status !== row.status) {
+                        if (boardColumns[previous.status]) boardColumns[previous.status].total--;
+                        if (boardColumns[row.status]) boardColumns[row.status].total++;
+                    }
+                    boardTasks.set(row.id, { ...previous, ...row });
+                });
+                renderKanban();
+                if (task && task.status !== newStatus) {
+                    showNotification('Status da tarefa atualizado!', 'success');
+                }
             } catch (error) {
                 console.error('Erro ao atualizar tarefa:', error);
-                showNotification('Erro ao atualizar tarefa.', 'error');
+                showNotification(error.status === 412 ? MESSAGES.ERROR.CONFLICT : 'Erro ao atualizar tarefa.',
+                    error.status === 412 ? 'warning' : 'error');
+                await loadKanban(); // Ressincronizar o Kanban
             }
         });
     });
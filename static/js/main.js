@@ -33,10 +33,37 @@ async function initializeApp() {
     setupNavigation();
     setupGlobalExports();
     setupEventListeners();
+    setupLiveUpdates();
 
     await loadDashboard();
 }
 
+// Atualizações em tempo real: recarrega a view ativa quando tarefas ou
+// compromissos mudam (inclusive em outras abas ou por outros usuários)
+const LIVE_VIEWS = ['dashboard', 'kanban', 'calendar'];
+let liveRefreshTimer = null;
+
+function setupLiveUpdates() {
+    if (!window.EventSource) return;
+
+    const source = new EventSource(`${CONFIG.API_BASE_URL}/events`);
+    const scheduleRefresh = () => {
+        if (!LIVE_VIEWS.includes(AppState.currentView)) return;
+        // Agrupa rajadas de eventos em uma única recarga
+        clearTimeout(liveRefreshTimer);
+        liveRefreshTimer = setTimeout(() => loadViewData(AppState.currentView), 300);
+    };
+
+    source.addEventListener('alteracoes', scheduleRefresh);
+    source.addEventListener('reiniciar', scheduleRefresh);
+    source.addEventListener('error', () => {
+        // Recusas (ex.: 503 por limite de assinantes) fecham a conexão sem nova tentativa automática
+        if (source.readyState === EventSource.CLOSED) {
+            setTimeout(setupLiveUpdates, 30000);
+        }
+    });
+}
+
 // Configurar Navegação
 function setupNavigation() {
     const navButtons = document.querySelectorAll('.nav-btn');
@@ -113,7 +140,10 @@ async function loadViewData(view) {
 async function loadDashboard() {
     try {
         const statsData = await api.get('/dashboard/stats');
-        const urgentData = await api.get('/dashboard/urgent');
+        const urgentData = await api.get('/dashboard/urgent', {
+            fields_tarefas: CONFIG.LIST_FIELDS.TASK,
+            fields_compromissos: CONFIG.LIST_FIELDS.APPOINTMENT
+        });
 
         renderDashboardStats(statsData.data);
         renderUrgentItems(urgentData.data);
@@ -208,10 +238,15 @@ function setupGlobalExports() {
     window.changeAppointmentPage = AppointmentsModule.changeAppointmentPage;
     window.generateNextSteps = AppointmentsModule.generateNextSteps;
 
+    // Kanban
+    window.loadMoreKanban = KanbanModule.loadMoreKanban;
+
     // History
     window.applyHistoryFilters = HistoryModule.applyHistoryFilters;
     window.clearHistoryFilters = HistoryModule.clearHistoryFilters;
     window.exportHistory = HistoryModule.exportHistory;
+    window.loadMoreHistory = HistoryModule.loadMoreHistory;
+    window.unarchiveTask = HistoryModule.unarchiveTask;
 
     // Menu
     window.toggleActionMenu = (btn, id) => menuManager.toggle(btn, id);
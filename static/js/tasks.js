@@ -15,6 +15,8 @@ export const TasksState = {
         total: 0,
         totalPages: 0
     },
+    // Cursor de início de cada página já visitada (índice = página - 1)
+    cursors: [null],
     filters: {
         status: '',
         prioridade: '',
@@ -26,16 +28,30 @@ export const TasksState = {
 export async function loadTasks(page = 1) {
     showLoading('tasks-list');
     try {
+        // Paginação por cursor: só é possível ir para páginas cujo cursor já é conhecido
+        if (page === 1 || TasksState.cursors[page - 1] === undefined) {
+            page = 1;
+            TasksState.cursors = [null];
+        }
         TasksState.pagination.page = page;
         const params = {
-            page: TasksState.pagination.page,
             per_page: TasksState.pagination.perPage,
+            include_total: 1,
+            fields: CONFIG.LIST_FIELDS.TASK,
             ...TasksState.filters
         };
+        const cursor = TasksState.cursors[page - 1];
+        if (cursor) {
+            params.cursor = cursor;
+        }
 
         const response = await api.get('/tasks', params);
         TasksState.items = response.data;
-        TasksState.pagination = { ...TasksState.pagination, ...response.meta };
+        TasksState.cursors[page] = response.meta.next_cursor || undefined;
+
+        const total = response.meta.total || 0;
+        TasksState.pagination.total = total;
+        TasksState.pagination.totalPages = Math.max(1, Math.ceil(total / TasksState.pagination.perPage));
 
         renderTasksList();
     } catch (error) {
@@ -125,7 +141,9 @@ export async function saveTask(event) {
 
     try {
         if (id) {
-            await api.put(`/tasks/${id}`, data);
+            // Só grava se a tarefa não mudou desde que o formulário foi aberto
+            const versao = document.getElementById('task-id').dataset.versao;
+            await api.put(`/tasks/${id}`, data, api.ifMatch(versao));
             showNotification(MESSAGES.SUCCESS.UPDATED, 'success');
         } else {
             await api.post('/tasks', data);
@@ -156,6 +174,7 @@ export async function editTask(id) {
         const task = response.data;
 
         document.getElementById('task-id').value = task.id;
+        document.getElementById('task-id').dataset.versao = task.versao;
         document.getElementById('task-titulo').value = task.titulo;
         document.getElementById('task-descricao').value = task.descricao || '';
         document.getElementById('task-categoria').value = task.categoria;
@@ -201,6 +220,7 @@ export async function deleteTask(id) {
 export function openNewTaskModal() {
     document.getElementById('task-form').reset();
     document.getElementById('task-id').value = '';
+    delete document.getElementById('task-id').dataset.versao;
     document.getElementById('task-modal-title').textContent = 'Nova Tarefa';
     openModal('task-modal');
 }
@@ -0,0 +1,47 @@
+"""
+Arquivamento periódico de tarefas concluídas em segundo plano
+
+Uma thread por processo chama TaskArchive.archive a cada
+config.TASK_ARCHIVE_INTERVAL segundos. Cada lote é uma transação curta,
+então o arquivamento não bloqueia as requisições por muito tempo; com vários
+processos, execuções simultâneas apenas dividem os lotes entre si.
+"""
+import threading
+from typing import Optional
+import config
+from models import TaskArchive
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+_thread_lock = threading.Lock()
+
+def _run(interval: float) -> None:
+    """Laço da thread: arquiva, espera o intervalo e repete até ser parada"""
+    while not _stop.wait(interval):
+        try:
+            TaskArchive.archive(config.TASK_ARCHIVE_DAYS, config.TASK_ARCHIVE_BATCH_SIZE)
+        except Exception as e:
+            # A próxima execução tenta de novo; os lotes já gravados continuam arquivados
+            logger.error(f"Falha no arquivamento periódico: {e}")
+
+def start_archiver() -> bool:
+    """
+    Inicia o arquivamento periódico, se configurado (TASK_ARCHIVE_INTERVAL > 0)
+
+    Returns:
+        True se a thread estiver em execução
+    """
+    global _thread
+    if config.TASK_ARCHIVE_INTERVAL <= 0:
+        return False
+    with _thread_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_run, args=(config.TASK_ARCHIVE_INTERVAL,),
+                                       name='task-archiver', daemon=True)
+            _thread.start()
+            logger.info(f"Arquivamento periódico ativo (a cada {config.TASK_ARCHIVE_INTERVAL:g}s, "
+                        f"tarefas concluídas há mais de {config.TASK_ARCHIVE_DAYS} dias)")
+    return True
@@ -0,0 +1,199 @@
+"""
+Cache de respostas da API e GETs condicionais (ETag), ambos baseados nas
+versões das tabelas, e ETags por registro (versão da linha) para If-Match
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from flask import Response, g, jsonify, make_response, request
+import config
+from database import get_table_versions
+from utils.serialization import negotiated_mimetype
+
+class ResponseCache:
+    """
+    Cache LRU de tamanho limitado, seguro entre threads
+
+    As entradas não expiram por tempo: quem monta a chave inclui nela as
+    versões das tabelas consultadas, então qualquer escrita gera chaves novas
+    e as antigas saem pelo despejo LRU.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor da chave (marcando-a como usada) ou None"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Armazena o valor, despejando as entradas menos usadas se necessário"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Remove todas as entradas"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna contadores de acertos, falhas e ocupação do cache"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'max_size': self.max_size,
+                'entradas': len(self._entries),
+                'acertos': self._hits,
+                'falhas': self._misses,
+                'despejos': self._evictions,
+                'taxa_acerto': round(self._hits / lookups, 3) if lookups else 0.0
+            }
+
+response_cache = ResponseCache(config.RESPONSE_CACHE_SIZE)
+
+def _request_key(tables: Tuple[str, ...]) -> Tuple:
+    """
+    Monta a assinatura da requisição atual sem executar a consulta da rota
+
+    Combina caminho, parâmetros da query, formato negociado (Accept), a
+    versão de cada tabela (incrementada por triggers a cada escrita) e a data
+    atual, já que várias respostas dependem de janelas relativas a hoje. O resultado é guardado
+    na requisição para que cache e ETag leiam as versões uma única vez.
+    """
+    memo = g.setdefault('_request_keys', {})
+    if tables not in memo:
+        versions = get_table_versions(tables)
+        memo[tables] = (
+            request.path,
+            tuple(sorted(request.args.items(multi=True))),
+            negotiated_mimetype(),
+            tuple(versions[table] for table in tables),
+            date.today().isoformat()
+        )
+    return memo[tables]
+
+def cached_response(*tables: str) -> Callable:
+    """
+    Decorator que guarda o corpo das respostas 200 de uma rota GET
+
+    Args:
+        tables: Tabelas lidas pela rota
+    """
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if response_cache.max_size <= 0:
+                return view(*args, **kwargs)
+
+            key = _request_key(tables)
+            cached = response_cache.get(key)
+            if cached is not None:
+                body, mimetype, vary = cached
+                response = Response(body, status=200, mimetype=mimetype)
+                if vary:
+                    response.headers['Vary'] = vary
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            # Respostas em streaming não são guardadas: ler o corpo anularia o streaming
+            if response.status_code == 200 and not response.is_streamed:
+                response_cache.set(key, (response.get_data(), response.mimetype,
+                                         response.headers.get('Vary')))
+            return response
+        return wrapper
+    return decorator
+
+def conditional_get(*tables: str) -> Callable:
+    """
+    Decorator que adiciona ETag forte às respostas 200 de uma rota GET e
+    responde 304 quando o If-None-Match do cliente ainda é válido
+
+    A ETag é derivada da assinatura da requisição (versões das tabelas), então
+    a validação não executa a consulta nem serializa o corpo.
+
+    Args:
+        tables: Tabelas lidas pela rota
+    """
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = hashlib.blake2b(repr(_request_key(tables)).encode('utf-8'),
+                                   digest_size=16).hexdigest()
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            # O navegador pode guardar a resposta, mas deve sempre revalidá-la
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
+
+def versioned_response(data: Dict[str, Any], status: int = 200) -> Response:
+    """
+    Resposta de um único registro com ETag igual à versão da linha
+
+    O cliente reenvia a ETag em If-Match ao alterar ou excluir o registro.
+    Em GETs, um If-None-Match com a versão atual recebe 304.
+
+    Args:
+        data: Registro (com a coluna versao)
+        status: Código HTTP
+    """
+    response = jsonify({'success': True, 'data': data})
+    response.status_code = status
+    response.set_etag(str(data['versao']))
+    response.headers['Cache-Control'] = 'no-cache'
+    if request.method == 'GET':
+        response.make_conditional(request)
+    return response
+
+def if_match_version() -> Optional[int]:
+    """
+    Versão exigida pelo cabeçalho If-Match da requisição
+
+    Returns:
+        None sem If-Match (ou com '*'); caso contrário a versão pedida, ou 0
+        (versão que nenhum registro tem) se nenhuma etiqueta for uma versão
+    """
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    for tag in request.if_match.as_set():
+        if tag.isdigit():
+            return int(tag)
+    return 0
+
+def conflict_response(current: Dict[str, Any]) -> Response:
+    """Resposta 412 para If-Match desatualizado, com a versão atual do registro"""
+    response = jsonify({
+        'success': False,
+        'error': 'O registro foi alterado por outra requisição; recarregue e tente novamente',
+        'data': current
+    })
+    response.status_code = 412
+    response.set_etag(str(current['versao']))
+    return response
@@ -0,0 +1,269 @@
+"""
+Feed de alterações em tempo real (Server-Sent Events)
+
+Os eventos são gravados na tabela eventos por triggers, então qualquer
+processo que escreva no banco os produz. Cada processo mantém um único
+EventBroker que verifica o banco periodicamente (PRAGMA data_version, sem
+consulta quando nada mudou) e acorda todos os assinantes de uma vez.
+
+Cada assinante ocupa uma thread do servidor WSGI enquanto estiver
+conectado; por isso o número de assinantes por processo é limitado a
+config.EVENTS_MAX_SUBSCRIBERS.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import config
+from database import execute_query, open_connection
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+class SubscriberLimitError(Exception):
+    """O processo já atende o número máximo de assinantes do feed"""
+
+class EventBroker:
+    """
+    Distribui os eventos do banco aos assinantes do processo atual
+
+    Os eventos recentes ficam em um buffer circular compartilhado; cada
+    assinante guarda apenas o último id que recebeu, então assinantes ociosos
+    custam só uma espera na condição. Quem ficar para trás do buffer (ou
+    retomar com Last-Event-ID antigo) lê direto do banco.
+    """
+
+    def __init__(self, database_path: str, poll_interval: float, buffer_size: int,
+                 max_subscribers: int):
+        self.database_path = database_path
+        self.poll_interval = poll_interval
+        self.max_subscribers = max(1, max_subscribers)
+        self.pid = os.getpid()
+
+        self._cond = threading.Condition()
+        self._buffer: 'deque[Dict[str, Any]]' = deque(maxlen=max(1, buffer_size))
+        self._floor = 0     # Todos os eventos com id > floor estão no buffer
+        self._last_id = 0   # Último id publicado
+        self._subscribers = 0
+        self._thread: Optional[threading.Thread] = None
+        self._polls = 0
+        self._published = 0
+        self._rejected = 0
+
+    def subscribe(self) -> int:
+        """
+        Registra um assinante, iniciando a verificação do banco se necessário
+
+        Returns:
+            Último id de evento conhecido (ponto de partida sem Last-Event-ID)
+
+        Raises:
+            SubscriberLimitError: Se o limite de assinantes já tiver sido atingido
+        """
+        with self._cond:
+            if self._subscribers >= self.max_subscribers:
+                self._rejected += 1
+                raise SubscriberLimitError(
+                    f"Limite de {self.max_subscribers} assinantes do feed atingido; tente novamente mais tarde"
+                )
+            if self._subscribers == 0:
+                # Sem assinantes o buffer não é atualizado: recomeça do estado atual
+                self._last_id = self._floor = _max_event_id()
+                self._buffer.clear()
+            self._subscribers += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='event-broker', daemon=True)
+                self._thread.start()
+            return self._last_id
+
+    def unsubscribe(self) -> None:
+        """Remove um assinante"""
+        with self._cond:
+            self._subscribers -= 1
+
+    def wait(self, after: int, timeout: float) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """
+        Aguarda eventos com id maior que ``after``
+
+        Args:
+            after: Último id já entregue ao assinante
+            timeout: Tempo máximo de espera, em segundos
+
+        Returns:
+            tuple: (eventos, novo último id, reiniciar) — reiniciar indica que
+            eventos se perderam (poda do log ou banco recriado) e o cliente
+            deve recarregar tudo; fora disso o novo id nunca é menor que after
+        """
+        with self._cond:
+            ahead = after > self._last_id
+        if ahead:
+            # Um id vindo de outro processo pode estar à frente da última
+            # verificação deste; só há perda se ele passar do fim do log
+            newest = _max_event_id()
+            if after > newest:
+                return [], newest, True
+
+        with self._cond:
+            if after >= self._last_id:
+                self._cond.wait(timeout)
+            if after >= self._last_id:
+                return [], after, False
+            if after >= self._floor:
+                events = [event for event in self._buffer if event['id'] > after]
+                return events, events[-1]['id'], False
+            last_id = self._last_id
+
+        # Atrasado em relação ao buffer: lê do banco até o último id publicado.
+        # Atrasos maiores que o buffer também levam o cliente a recarregar tudo.
+        rows = execute_query(
+            'SELECT id, tabela, registro_id, operacao FROM eventos WHERE id > ? AND id <= ? ORDER BY id LIMIT ?',
+            (after, last_id, self._buffer.maxlen + 1)
+        )
+        if not rows or rows[0]['id'] != after + 1 or len(rows) > self._buffer.maxlen:
+            return [], last_id, True
+        return [dict(row) for row in rows], rows[-1]['id'], False
+
+    def _run(self) -> None:
+        """Laço da thread: publica os eventos novos sempre que o banco mudar"""
+        # Conexão própria (fora do pool), com o mesmo perfil de PRAGMAs
+        conn = open_connection(self.database_path)
+        data_version = None
+        while True:
+            try:
+                with self._cond:
+                    idle = self._subscribers == 0
+                    last_id = self._last_id
+                if idle:
+                    data_version = None
+                else:
+                    current = conn.execute('PRAGMA data_version').fetchone()[0]
+                    if current != data_version:
+                        data_version = current
+                        self._publish(conn.execute(
+                            'SELECT id, tabela, registro_id, operacao FROM eventos WHERE id > ? ORDER BY id',
+                            (last_id,)
+                        ).fetchall())
+                    self._polls += 1
+            except sqlite3.Error as e:
+                logger.error(f"Erro ao verificar eventos: {e}")
+            time.sleep(self.poll_interval)
+
+    def _publish(self, rows: List[sqlite3.Row]) -> None:
+        """Adiciona os eventos ao buffer e acorda os assinantes"""
+        if not rows:
+            return
+        with self._cond:
+            for row in rows:
+                if row['id'] <= self._last_id:
+                    continue
+                if len(self._buffer) == self._buffer.maxlen:
+                    self._floor = self._buffer[0]['id']
+                self._buffer.append(dict(row))
+                self._last_id = row['id']
+                self._published += 1
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna métricas do feed no processo atual"""
+        with self._cond:
+            return {
+                'assinantes': self._subscribers,
+                'max_assinantes': self.max_subscribers,
+                'recusados': self._rejected,
+                'ultimo_evento': self._last_id,
+                'em_buffer': len(self._buffer),
+                'verificacoes': self._polls,
+                'publicados': self._published
+            }
+
+def _max_event_id() -> int:
+    """Retorna o id do evento mais recente do banco"""
+    return execute_query('SELECT COALESCE(MAX(id), 0) FROM eventos')[0][0]
+
+_broker: Optional[EventBroker] = None
+_broker_lock = threading.Lock()
+
+def get_broker() -> EventBroker:
+    """Retorna o EventBroker do processo atual (recriado após um fork)"""
+    global _broker
+    with _broker_lock:
+        if _broker is None or _broker.pid != os.getpid() or _broker.database_path != config.DATABASE_PATH:
+            _broker = EventBroker(config.DATABASE_PATH, config.EVENTS_POLL_INTERVAL,
+                                  config.EVENTS_BUFFER_SIZE, config.EVENTS_MAX_SUBSCRIBERS)
+        return _broker
+
+def coalesce_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Reduz uma rajada de eventos a um por registro
+
+    Prevalece a última operação, exceto que uma criação seguida de
+    alterações continua sendo uma criação.
+    """
+    merged: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    for event in events:
+        key = (event['tabela'], event['registro_id'])
+        action = event['operacao']
+        previous = merged.pop(key, None)
+        if previous and previous['acao'] == 'criado' and action == 'atualizado':
+            action = 'criado'
+        merged[key] = {'tipo': event['tabela'], 'id': event['registro_id'], 'acao': action}
+    return list(merged.values())
+
+def event_stream(last_event_id: Optional[int]) -> '_Subscription':
+    """
+    Registra um assinante e retorna o iterador das suas mensagens SSE
+
+    O registro acontece na chamada, antes de a resposta começar, para que a
+    rota possa recusar a conexão quando o limite de assinantes for atingido.
+
+    Args:
+        last_event_id: Último id recebido pelo cliente (Last-Event-ID), ou None
+                       para receber apenas eventos novos
+
+    Raises:
+        SubscriberLimitError: Se o limite de assinantes já tiver sido atingido
+    """
+    broker = get_broker()
+    current = broker.subscribe()
+    return _Subscription(broker, current if last_event_id is None else last_event_id)
+
+class _Subscription:
+    """
+    Iterador das mensagens SSE de um assinante já registrado
+
+    close() (chamado pelo servidor WSGI ao fim da resposta) remove o
+    assinante mesmo que a transmissão nem tenha começado.
+    """
+
+    def __init__(self, broker: EventBroker, last: int):
+        self._broker = broker
+        self._messages = _messages(broker, last)
+        self._closed = False
+
+    def __iter__(self) -> '_Subscription':
+        return self
+
+    def __next__(self) -> str:
+        return next(self._messages)
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._messages.close()
+            self._broker.unsubscribe()
+
+def _messages(broker: EventBroker, last: int) -> Iterator[str]:
+    """Gera as mensagens SSE a partir do último id recebido pelo assinante"""
+    yield 'retry: 3000\n\n'
+    while True:
+        events, last, reset = broker.wait(last, config.EVENTS_HEARTBEAT)
+        if reset:
+            yield f'id: {last}\nevent: reiniciar\ndata: {{}}\n\n'
+        elif events:
+            payload = json.dumps({'eventos': coalesce_events(events)}, ensure_ascii=False)
+            yield f'id: {last}\nevent: alteracoes\ndata: {payload}\n\n'
+        else:
+            yield ': heartbeat\n\n'
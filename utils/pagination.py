@@ -0,0 +1,71 @@
+"""
+Utilitários para paginação por cursor (keyset)
+"""
+import base64
+import binascii
+import json
+from typing import Any, List, Optional
+
+# Faixa dos inteiros aceitos como parâmetro pelo SQLite (64 bits)
+_INT_MIN, _INT_MAX = -2 ** 63, 2 ** 63 - 1
+
+def _is_cursor_value(value: Any) -> bool:
+    """Indica se o valor pode compor um cursor (texto, número ou nulo)"""
+    if value is None or isinstance(value, (str, float)):
+        return True
+    return isinstance(value, int) and not isinstance(value, bool) and _INT_MIN <= value <= _INT_MAX
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Codifica os valores da chave de ordenação em um cursor opaco
+    
+    Args:
+        values: Valores da última linha retornada, na ordem do ORDER BY
+        
+    Returns:
+        Cursor em base64 url-safe
+    """
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    """
+    Decodifica um cursor gerado por encode_cursor
+    
+    Args:
+        token: Cursor recebido do cliente
+        size: Quantidade de valores esperada
+        
+    Returns:
+        Lista de valores da chave de ordenação
+        
+    Raises:
+        ValueError: Se o cursor for inválido (inclusive com valores que não
+                    sejam texto, número ou nulo, que não podem ir para a consulta)
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Cursor inválido")
+    
+    if not isinstance(values, list) or len(values) != size or not all(map(_is_cursor_value, values)):
+        raise ValueError("Cursor inválido")
+    return values
+
+def parse_page_size(value: Optional[str], default: int, maximum: int) -> int:
+    """
+    Converte o parâmetro per_page/limit em um tamanho de página válido
+    
+    Raises:
+        ValueError: Se o valor não for um inteiro positivo
+    """
+    if value in (None, ''):
+        return default
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("Tamanho de página inválido")
+    if size < 1:
+        raise ValueError("Tamanho de página inválido")
+    return min(size, maximum)
@@ -0,0 +1,158 @@
+"""
+Chaves de ordenação fracionárias (estilo lexorank) para a posição das
+tarefas no quadro
+
+Cada chave tem uma parte inteira, cujo primeiro caractere indica o tamanho
+(a0, a1, ..., az, b00, ...), e uma parte fracionária opcional, ambas em base
+62 com os dígitos 0-9A-Za-z. Os dígitos estão em ordem ASCII, então a
+comparação de texto do SQLite ordena as chaves corretamente.
+
+Sempre existe uma chave entre duas outras, então mover um cartão grava
+apenas a linha movida. Inserir no início ou no fim da coluna incrementa a
+parte inteira, o que mantém as chaves curtas.
+"""
+from typing import List, Optional
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+INTEGER_ZERO = 'a0'
+SMALLEST_INTEGER = 'A' + DIGITS[0] * 26
+
+def _integer_length(head: str) -> int:
+    """Tamanho da parte inteira indicado pelo primeiro caractere"""
+    if 'a' <= head <= 'z':
+        return ord(head) - ord('a') + 2
+    if 'A' <= head <= 'Z':
+        return ord('Z') - ord(head) + 2
+    raise ValueError(f"Posição inválida: {head!r}")
+
+def _integer_part(key: str) -> str:
+    """Parte inteira da chave"""
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Posição inválida: {key!r}")
+    return key[:length]
+
+def _validate(key: str) -> None:
+    """Verifica se a chave é válida (parte fracionária sem zero final)"""
+    if not key or key == SMALLEST_INTEGER or any(c not in DIGITS for c in key):
+        raise ValueError(f"Posição inválida: {key!r}")
+    if key[len(_integer_part(key)):].endswith(DIGITS[0]):
+        raise ValueError(f"Posição inválida: {key!r}")
+
+def _increment(integer: str) -> Optional[str]:
+    """Próximo inteiro (None se não houver inteiro maior)"""
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) + 1
+        if value < len(DIGITS):
+            digits[i] = DIGITS[value]
+            return head + ''.join(digits)
+        digits[i] = DIGITS[0]
+    # Estouro: o inteiro passa a ter um dígito a mais (ou a menos, se negativo)
+    if head == 'Z':
+        return INTEGER_ZERO
+    if head == 'z':
+        return None
+    head = chr(ord(head) + 1)
+    if head > 'a':
+        digits.append(DIGITS[0])
+    else:
+        digits.pop()
+    return head + ''.join(digits)
+
+def _decrement(integer: str) -> Optional[str]:
+    """Inteiro anterior (None se não houver inteiro menor)"""
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) - 1
+        if value >= 0:
+            digits[i] = DIGITS[value]
+            return head + ''.join(digits)
+        digits[i] = DIGITS[-1]
+    if head == 'a':
+        return 'Z' + DIGITS[-1]
+    if head == 'A':
+        return None
+    head = chr(ord(head) - 1)
+    if head < 'Z':
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + ''.join(digits)
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """Fração entre a e b (a < b; '' é o início e None o fim do intervalo)"""
+    if b is not None:
+        # Prefixo comum (a é completado com zeros à direita)
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else DIGITS[0]) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    low = DIGITS.index(a[0]) if a else 0
+    high = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if high - low > 1:
+        return DIGITS[(low + high) // 2]
+    # Dígitos consecutivos: se b tem mais dígitos, seu primeiro dígito já fica entre a e b
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[low] + _midpoint(a[1:], None)
+
+def key_between(before: Optional[str], after: Optional[str]) -> str:
+    """
+    Retorna uma chave estritamente entre duas chaves
+
+    Args:
+        before: Chave anterior (None = início da coluna)
+        after: Chave seguinte (None = fim da coluna)
+
+    Raises:
+        ValueError: Se alguma chave for inválida ou before >= after
+    """
+    for key in (before, after):
+        if key is not None:
+            _validate(key)
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Posições fora de ordem: {before!r} >= {after!r}")
+
+    if before is None:
+        if after is None:
+            return INTEGER_ZERO
+        integer = _integer_part(after)
+        if integer == SMALLEST_INTEGER:
+            return integer + _midpoint('', after[len(integer):])
+        if integer < after:
+            return integer
+        previous = _decrement(integer)
+        if previous is None:
+            raise ValueError("Não há posição antes da primeira")
+        return previous
+
+    integer = _integer_part(before)
+    fraction = before[len(integer):]
+    if after is None:
+        following = _increment(integer)
+        return integer + _midpoint(fraction, None) if following is None else following
+
+    after_integer = _integer_part(after)
+    if integer == after_integer:
+        return integer + _midpoint(fraction, after[len(integer):])
+    following = _increment(integer)
+    if following is not None and following < after:
+        return following
+    return integer + _midpoint(fraction, None)
+
+def keys_after(before: Optional[str], count: int) -> List[str]:
+    """
+    Gera chaves crescentes após ``before`` (a última chave da coluna)
+
+    Args:
+        before: Última chave existente (None = coluna vazia)
+        count: Quantidade de chaves
+    """
+    keys = []
+    for _ in range(count):
+        before = key_between(before, None)
+        keys.append(before)
+    return keys
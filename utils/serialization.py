@@ -0,0 +1,106 @@
+"""
+Formatos de resposta das listagens: JSON (padrão) ou MessagePack, negociado
+pelo cabeçalho Accept, com corpo em objetos ou colunar (format=columnar), e
+listas JSON em streaming (stream=1)
+"""
+from typing import Any, Dict, Iterable, Iterator, Optional
+from flask import Response, current_app, jsonify, request
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Dependência opcional: sem o pacote msgpack as respostas continuam em JSON
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+# Itens serializados acumulados antes de cada escrita na resposta em streaming
+_STREAM_CHUNK_ITEMS = 100
+
+def negotiated_mimetype() -> str:
+    """Retorna o formato de resposta preferido pelo cliente entre os disponíveis"""
+    if msgpack is None:
+        return JSON_MIMETYPE
+    return request.accept_mimetypes.best_match([JSON_MIMETYPE, *MSGPACK_MIMETYPES], JSON_MIMETYPE)
+
+def wants_columnar() -> bool:
+    """
+    Indica se o cliente pediu o formato colunar (format=columnar)
+
+    Raises:
+        ValueError: Se o formato for desconhecido
+    """
+    value: Optional[str] = request.args.get('format')
+    if value in (None, '', 'objects'):
+        return False
+    if value == 'columnar':
+        return True
+    raise ValueError("Formato inválido (use objects ou columnar)")
+
+def api_response(body: Dict[str, Any], status: int = 200) -> Response:
+    """
+    Serializa o corpo no formato negociado com o cliente
+
+    Args:
+        body: Corpo da resposta ({'success', 'data', 'meta'})
+        status: Código HTTP
+    """
+    mimetype = negotiated_mimetype()
+    if mimetype == JSON_MIMETYPE:
+        response = jsonify(body)
+    else:
+        response = Response(msgpack.packb(body), mimetype=mimetype)
+    response.status_code = status
+    response.vary.add('Accept')
+    return response
+
+def wants_stream() -> bool:
+    """Indica se o cliente pediu a lista completa em streaming (stream=1)"""
+    return request.args.get('stream', '').lower() in ('1', 'true')
+
+def stream_json_list(items: Iterable[Dict[str, Any]], meta: Optional[Dict[str, Any]] = None) -> Response:
+    """
+    Envia {'success', 'data', 'meta'} em JSON com 'data' escrito aos poucos
+    
+    O primeiro item é lido antes de a resposta começar, então erros da
+    consulta ainda viram respostas de erro normais; depois disso a lista é
+    serializada em blocos conforme o iterador avança. Uma falha no meio do
+    envio só pode interromper a conexão (o status 200 já foi enviado), o que
+    deixa o JSON incompleto para o cliente.
+    
+    Args:
+        items: Iterador de itens (normalmente de um método iter_* dos modelos)
+        meta: Metadados, escritos após a lista
+    """
+    iterator = iter(items)
+    first = next(iterator, None)
+    dumps = current_app.json.dumps
+
+    def generate() -> Iterator[str]:
+        yield '{"success": true, "data": ['
+        if first is not None:
+            chunk = [dumps(first)]
+            separator = ''
+            try:
+                for item in iterator:
+                    chunk.append(dumps(item))
+                    if len(chunk) >= _STREAM_CHUNK_ITEMS:
+                        yield separator + ', '.join(chunk)
+                        chunk, separator = [], ', '
+            except Exception as e:
+                logger.error(f"Erro durante resposta em streaming: {e}")
+                raise
+            finally:
+                # Encerra a leitura das páginas mesmo se o cliente desconectar
+                close = getattr(iterator, 'close', None)
+                if close:
+                    close()
+            if chunk:
+                yield separator + ', '.join(chunk)
+        yield '], "meta": ' + dumps(meta or {}) + '}'
+
+    return Response(generate(), mimetype=JSON_MIMETYPE)
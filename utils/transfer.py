@@ -0,0 +1,213 @@
+"""
+Exportação e importação em streaming (NDJSON e CSV)
+
+A exportação serializa os itens conforme as páginas são lidas e a importação
+lê o corpo da requisição aos poucos, aplicando lotes de tamanho limitado,
+então o uso de memória não depende do tamanho do conjunto de dados.
+"""
+import csv
+import io
+import json
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+from flask import current_app
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+FORMATS = ('ndjson', 'csv')
+MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+# Linhas serializadas acumuladas antes de cada escrita na resposta
+_CHUNK_ROWS = 500
+
+# Campos gravados como JSON nas células do CSV
+_JSON_FIELDS = ('checklist',)
+
+def parse_format(value: Optional[str]) -> str:
+    """
+    Valida o formato de exportação/importação (padrão ndjson)
+
+    Raises:
+        ValueError: Se o formato for desconhecido
+    """
+    value = (value or 'ndjson').lower()
+    if value not in FORMATS:
+        raise ValueError(f"Formato inválido. Use: {', '.join(FORMATS)}")
+    return value
+
+def export_rows(items: Iterable[Dict[str, Any]], fmt: str,
+                columns: Optional[List[str]] = None) -> Iterator[str]:
+    """
+    Serializa os itens em NDJSON ou CSV, em blocos
+
+    O primeiro item é lido na chamada, então erros da consulta surgem antes
+    de a resposta começar. Os iteradores iter_* dos modelos leem uma página
+    por consulta, então a exportação não reserva uma conexão do pool nem
+    mantém uma transação de leitura aberta enquanto o cliente baixa.
+
+    Args:
+        items: Iterador de itens (de um método iter_* dos modelos)
+        fmt: 'ndjson' ou 'csv'
+        columns: Cabeçalho do CSV; por padrão, as chaves do primeiro item
+    """
+    iterator = iter(items)
+    first = next(iterator, None)
+    if fmt == 'csv':
+        return _csv_chunks(first, iterator, columns)
+    return _ndjson_chunks(first, iterator, current_app.json.dumps)
+
+def _ndjson_chunks(first: Optional[Dict[str, Any]], iterator: Iterator[Dict[str, Any]],
+                   dumps: Callable[[Any], str]) -> Iterator[str]:
+    """Gera as linhas NDJSON, um objeto por linha"""
+    if first is None:
+        return
+    chunk = [dumps(first)]
+    try:
+        for item in iterator:
+            chunk.append(dumps(item))
+            if len(chunk) >= _CHUNK_ROWS:
+                yield '\n'.join(chunk) + '\n'
+                chunk = []
+    finally:
+        _close(iterator)
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+def _csv_chunks(first: Optional[Dict[str, Any]], iterator: Iterator[Dict[str, Any]],
+                columns: Optional[List[str]]) -> Iterator[str]:
+    """Gera o CSV com cabeçalho; listas e objetos vão como JSON na célula"""
+    columns = columns or (list(first) if first else [])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+
+    def write(item: Dict[str, Any]) -> None:
+        writer.writerow([_csv_value(item.get(column)) for column in columns])
+
+    if first is not None:
+        write(first)
+        try:
+            for count, item in enumerate(iterator, 2):
+                write(item)
+                if count % _CHUNK_ROWS == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+        finally:
+            _close(iterator)
+    yield buffer.getvalue()
+
+def _csv_value(value: Any) -> Any:
+    """Converte um valor para uma célula do CSV"""
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+def _close(iterator: Iterator) -> None:
+    """Fecha o iterador (encerrando a leitura das páginas) se ele suportar"""
+    close = getattr(iterator, 'close', None)
+    if close:
+        close()
+
+def read_records(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Lê os registros do corpo da requisição, um de cada vez
+
+    Linhas vazias são ignoradas. Uma linha NDJSON inválida (ou que não seja
+    um objeto) é entregue como a string de erro, para ser reportada sem
+    interromper a importação.
+
+    Args:
+        stream: Corpo da requisição (request.stream)
+        fmt: 'ndjson' ou 'csv'
+
+    Yields:
+        tuple: (número da linha, registro ou mensagem de erro)
+    """
+    text = io.TextIOWrapper(io.BufferedReader(stream), encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, _csv_record(record)
+        return
+
+    for number, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield number, 'JSON inválido'
+            continue
+        yield number, record if isinstance(record, dict) else 'Registro deve ser um objeto JSON'
+
+def _csv_record(record: Dict[str, Any]) -> Any:
+    """Converte uma linha do CSV em registro: células vazias são omitidas"""
+    data = {}
+    for key, value in record.items():
+        if key is None or value in (None, ''):
+            continue
+        if key in _JSON_FIELDS:
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return f"Campo '{key}' deve conter JSON"
+        data[key] = value
+    return data
+
+def import_records(records: Iterable[Tuple[int, Any]],
+                   apply_batch: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+                   batch_size: int) -> Iterator[Dict[str, Any]]:
+    """
+    Importa os registros em lotes, relatando o progresso após cada lote
+
+    Cada lote é aplicado em uma transação pelo bulk_apply do modelo;
+    registros inválidos são ignorados e reportados com o número da linha.
+
+    Args:
+        records: Pares (linha, registro) de read_records
+        apply_batch: bulk_apply do modelo
+        batch_size: Registros por lote
+
+    Yields:
+        Progresso de cada lote ({'processados', 'importados', 'falhas', 'erros'})
+        e, por fim, o resumo com 'concluido'
+    """
+    totals = {'processados': 0, 'importados': 0, 'falhas': 0}
+
+    def flush(batch: List[Tuple[int, Any]]) -> Dict[str, Any]:
+        errors = []
+        valid = []
+        for line, record in batch:
+            if isinstance(record, str):
+                errors.append({'linha': line, 'erros': [record]})
+            else:
+                valid.append((line, record))
+        if valid:
+            results = apply_batch([{'op': 'create', 'data': record} for _, record in valid])
+            for (line, _), result in zip(valid, results):
+                if not result['success']:
+                    errors.append({'linha': line, 'erros': result['errors']})
+        errors.sort(key=lambda error: error['linha'])
+        totals['processados'] += len(batch)
+        totals['importados'] += len(batch) - len(errors)
+        totals['falhas'] += len(errors)
+        return {**totals, 'erros': errors}
+
+    batch: List[Tuple[int, Any]] = []
+    try:
+        for line, record in records:
+            batch.append((line, record))
+            if len(batch) >= batch_size:
+                yield flush(batch)
+                batch = []
+        if batch:
+            yield flush(batch)
+    except Exception as e:
+        # Os lotes anteriores já foram gravados; o cliente recebe o ponto de parada
+        logger.error(f"Erro durante importação: {e}")
+        yield {**totals, 'concluido': False, 'erro': str(e)}
+        return
+    yield {**totals, 'concluido': True}
@@ -9,12 +9,13 @@ from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-def validate_task_data(data: Dict[str, Any]) -> Tuple[bool, List[str]]:
+def validate_task_data(data: Dict[str, Any], partial: bool = False) -> Tuple[bool, List[str]]:
     """
     Valida dados de uma tarefa
     
     Args:
         data: Dicionário com dados da tarefa
+        partial: Se True, valida apenas os campos presentes (atualização parcial)
         
     Returns:
         tuple: (is_valid, errors)
@@ -24,11 +25,15 @@ def validate_task_data(data: Dict[str, Any]) -> Tuple[bool, List[str]]:
     # Campos obrigatórios
     required_fields = ['titulo', 'categoria', 'prioridade', 'status']
     for field in required_fields:
-        if not data.get(field):
+        if (field in data or not partial) and not data.get(field):
             errors.append(f"Campo '{field}' é obrigatório")
     
+    # Campos de texto (ex.: valores numéricos vindos de uma importação)
+    invalid_types = _non_text_fields(data, ('prioridade', 'status', 'data_limite'))
+    errors.extend(f"Campo '{field}' deve ser texto" for field in invalid_types)
+    
     # Validar prioridade
-    if data.get('prioridade'):
+    if data.get('prioridade') and 'prioridade' not in invalid_types:
         try:
             TaskPriority(data['prioridade'].lower())
         except ValueError:
@@ -36,7 +41,7 @@ def validate_task_data(data: Dict[str, Any]) -> Tuple[bool, List[str]]:
             errors.append(f"Prioridade inválida. Deve ser uma de: {', '.join(valid)}")
     
     # Validar status
-    if data.get('status'):
+    if data.get('status') and 'status' not in invalid_types:
         try:
             TaskStatus(data['status'].lower())
         except ValueError:
@@ -44,7 +49,7 @@ def validate_task_data(data: Dict[str, Any]) -> Tuple[bool, List[str]]:
             errors.append(f"Status inválido. Deve ser um de: {', '.join(valid)}")
     
     # Validar data limite (se fornecida)
-    if data.get('data_limite'):
+    if data.get('data_limite') and 'data_limite' not in invalid_types:
         try:
             # Aceita YYYY-MM-DD
             datetime.strptime(data['data_limite'], '%Y-%m-%d')
@@ -57,12 +62,14 @@ def validate_task_data(data: Dict[str, Any]) -> Tuple[bool, List[str]]:
     
     return True, []
 
-def validate_appointment_data(data: Dict[str, Any]) -> Tuple[bool, List[str]]:
+def validate_appointment_data(data: Dict[str, Any], partial: bool = False) -> Tuple[bool, List[str]]:
     """
     Valida dados de um compromisso
     
     Args:
         data: Dicionário com dados do compromisso
+        partial: Se True, valida apenas os campos presentes (atualização parcial);
+                 a ordem dos horários só é verificada se ambos vierem
         
     Returns:
         tuple: (is_valid, errors)
@@ -72,18 +79,23 @@ def validate_appointment_data(data: Dict[str, Any]) -> Tuple[bool, List[str]]:
     # Campos obrigatórios
     required_fields = ['titulo', 'data', 'horario_inicio', 'horario_fim']
     for field in required_fields:
-        if not data.get(field):
+        if (field in data or not partial) and not data.get(field):
             errors.append(f"Campo '{field}' é obrigatório")
     
+    # Campos de texto (ex.: valores numéricos vindos de uma importação)
+    invalid_types = _non_text_fields(data, ('data', 'horario_inicio', 'horario_fim'))
+    errors.extend(f"Campo '{field}' deve ser texto" for field in invalid_types)
+    
     # Validar data
-    if data.get('data'):
+    if data.get('data') and 'data' not in invalid_types:
         try:
             datetime.strptime(data['data'], '%Y-%m-%d')
         except ValueError:
             errors.append("Data inválida. Use formato YYYY-MM-DD")
     
     # Validar horários
-    if data.get('horario_inicio') and data.get('horario_fim'):
+    if (data.get('horario_inicio') and data.get('horario_fim')
+            and not {'horario_inicio', 'horario_fim'} & set(invalid_types)):
         try:
             inicio = datetime.strptime(data['horario_inicio'], '%H:%M')
             fim = datetime.strptime(data['horario_fim'], '%H:%M')
@@ -98,6 +110,22 @@ def validate_appointment_data(data: Dict[str, Any]) -> Tuple[bool, List[str]]:
     
     return True, []
 
+def parse_date(value: str) -> datetime:
+    """
+    Converte uma data de parâmetro da requisição (YYYY-MM-DD)
+    
+    Raises:
+        ValueError: Se a data for inválida
+    """
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise ValueError("Data inválida. Use formato YYYY-MM-DD")
+
+def _non_text_fields(data: Dict[str, Any], fields: Tuple[str, ...]) -> List[str]:
+    """Retorna os campos presentes (não nulos) que não são strings"""
+    return [field for field in fields if data.get(field) is not None and not isinstance(data[field], str)]
+
 def sanitize_string(value: Any) -> str:
     """
     Sanitiza uma string removendo caracteres perigosos e espaços extras
@@ -136,3 +164,39 @@ def sanitize_for_search(value: str) -> str:
     if not value:
         return ""
     return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def build_fts_query(value: str) -> str:
+    """
+    Converte o texto digitado pelo usuário em uma consulta FTS5 segura
+    
+    Cada palavra vira um termo entre aspas com busca por prefixo, e todos
+    os termos precisam aparecer (AND implícito). Operadores e sintaxe FTS5
+    digitados pelo usuário são descartados.
+    
+    Args:
+        value: Texto de busca
+        
+    Returns:
+        Consulta FTS5 (string vazia se não houver termos)
+    """
+    if not value:
+        return ""
+    terms = re.findall(r'\w+', value)[:20]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def parse_field_list(value: Optional[str]) -> Optional[List[str]]:
+    """
+    Converte o parâmetro fields (nomes separados por vírgula) em lista
+    
+    A validação dos nomes fica a cargo do modelo, contra sua lista de campos permitidos.
+    
+    Args:
+        value: Valor do parâmetro
+        
+    Returns:
+        Lista de campos, ou None se nenhum for informado (todos os campos)
+    """
+    if not value:
+        return None
+    fields = [f.strip() for f in value.split(',') if f.strip()]
+    return fields or None
@@ -2,26 +2,62 @@
 Script de verificação de lógica e segurança
 """
 import os
+import sqlite3
 import sys
+import tempfile
+import threading
 import unittest
-from datetime import datetime
+from unittest import mock
+from datetime import datetime, timedelta
 import json
+import random
 
 # Adicionar diretório atual ao path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+import config
 from config import TaskStatus, TaskPriority
-from models import Task, Appointment
-from database import init_database
+from models import Task, TaskArchive, Appointment, Search, Sync
+from database import (ConnectionPool, GroupCommitWriter, check_stat_counters, close_pool, execute_query,
+                      execute_update, get_pool, init_database, prune_tombstones, rebuild_stat_counters)
+from utils.pagination import decode_cursor, encode_cursor
+from utils.ranking import INTEGER_ZERO, SMALLEST_INTEGER, key_between, keys_after
 from utils.validators import sanitize_string, sanitize_for_search
+from utils.cache import response_cache
+from utils import events, serialization
+from app import app
 
 class TestBackendLogic(unittest.TestCase):
     
     @classmethod
     def setUpClass(cls):
-        """Inicializa o banco de dados para testes"""
+        """Inicializa um banco de dados temporário para os testes"""
         print("\n=== Iniciando Testes de Lógica e Segurança ===")
+        cls._tmpdir = tempfile.TemporaryDirectory()
+        cls._database_path = config.DATABASE_PATH
+        config.DATABASE_PATH = os.path.join(cls._tmpdir.name, 'teste.db')
         init_database()
+        cls.client = app.test_client()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Fecha as conexões e remove o banco temporário"""
+        close_pool()
+        config.DATABASE_PATH = cls._database_path
+        cls._tmpdir.cleanup()
+    
+    def _create_task(self, **data):
+        """Cria uma tarefa de teste, com valores padrão para os campos obrigatórios"""
+        task = {'titulo': 'Tarefa de teste', 'categoria': 'Teste', 'prioridade': 'media', 'status': 'pendente'}
+        task.update(data)
+        return Task.create(task)
+    
+    def _create_appointment(self, **data):
+        """Cria um compromisso de teste, com valores padrão para os campos obrigatórios"""
+        appointment = {'titulo': 'Compromisso de teste', 'data': '2030-01-15',
+                       'horario_inicio': '09:00', 'horario_fim': '10:00'}
+        appointment.update(data)
+        return Appointment.create(appointment)
 
     def test_01_sql_injection_prevention(self):
         """Teste de prevenção contra SQL Injection"""
@@ -80,7 +116,7 @@ class TestBackendLogic(unittest.TestCase):
             'categoria': 'Segurança',
             'prioridade': 'alta',
             'status': 'pendente'
-        })
+        })['id']
         
         task = Task.get_by_id(task_id)
         self.assertNotIn("<script>", task['titulo'], "Script tag não foi removida!")
@@ -103,7 +139,7 @@ class TestBackendLogic(unittest.TestCase):
             'status': 'pendente',
             'data_limite': '2025-12-31'
         }
-        task_id = Task.create(task_data)
+        task_id = Task.create(task_data)['id']
         self.assertIsNotNone(task_id)
         
         saved_task = Task.get_by_id(task_id)
@@ -118,5 +154,1099 @@ class TestBackendLogic(unittest.TestCase):
         # Limpar
         Task.delete(task_id)
 
+    def test_05_connection_pool(self):
+        """Teste do pool de conexões (reuso, PRAGMAs e limite de conexões)"""
+        print("\n[TEST] Verificando pool de conexões...")
+        
+        pool = get_pool()
+        conn = pool.acquire()
+        try:
+            pragmas = config.SQLITE_PRAGMAS
+            self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0].lower(),
+                             pragmas['journal_mode'].lower())
+            self.assertEqual(conn.execute('PRAGMA cache_size').fetchone()[0], pragmas['cache_size'])
+            self.assertEqual(conn.execute('PRAGMA busy_timeout').fetchone()[0], pragmas['busy_timeout'])
+            conn.execute('BEGIN')
+        finally:
+            pool.release(conn)
+        
+        # A conexão devolvida é reaproveitada, sem a transação deixada aberta
+        again = pool.acquire()
+        try:
+            self.assertIs(again, conn)
+            self.assertFalse(again.in_transaction)
+        finally:
+            pool.release(again)
+        print("   Reuso e PRAGMAs: OK")
+        
+        small = ConnectionPool(config.DATABASE_PATH, max_size=1, timeout=0.05, pragmas=config.SQLITE_PRAGMAS)
+        held = small.acquire()
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                small.acquire()
+        finally:
+            small.release(held)
+        self.assertEqual(small.stats()['timeouts'], 1)
+        self.assertEqual(small.stats()['abertas'], 1)
+        small.close_all()
+        print("   Limite do pool: OK")
+
+    def test_06_group_commit_savepoints(self):
+        """Teste do group commit: a falha de um item não desfaz os demais do lote"""
+        print("\n[TEST] Verificando group commit...")
+        
+        writer = GroupCommitWriter(config.DATABASE_PATH, pragmas=config.SQLITE_PRAGMAS)
+        try:
+            writer.submit(lambda conn: conn.execute(
+                'CREATE TABLE IF NOT EXISTS teste_group_commit (valor TEXT)')).result()
+            
+            # Segura o escritor para que os três itens seguintes formem um único lote
+            started, release = threading.Event(), threading.Event()
+            
+            def block(conn):
+                started.set()
+                return release.wait(5)
+            
+            blocker = writer.submit(block)
+            self.assertTrue(started.wait(5))
+            
+            def insert(value):
+                return lambda conn: conn.execute('INSERT INTO teste_group_commit VALUES (?)', (value,)).rowcount
+            
+            def insert_and_fail(conn):
+                conn.execute("INSERT INTO teste_group_commit VALUES ('falha')")
+                raise ValueError('falha proposital')
+            
+            futures = [writer.submit(insert('a')), writer.submit(insert_and_fail), writer.submit(insert('b'))]
+            release.set()
+            blocker.result(5)
+            
+            self.assertEqual(futures[0].result(5), 1)
+            with self.assertRaises(ValueError):
+                futures[1].result(5)
+            self.assertEqual(futures[2].result(5), 1)
+            self.assertEqual(writer.stats()['ultimo_lote'], 3)
+        finally:
+            writer.stop(5)
+        
+        rows = sqlite3.connect(config.DATABASE_PATH).execute(
+            'SELECT valor FROM teste_group_commit ORDER BY valor').fetchall()
+        self.assertEqual([row[0] for row in rows], ['a', 'b'])
+        print("   Rollback isolado por SAVEPOINT: OK")
+
+    def test_07_bulk_operations(self):
+        """Teste das operações em lote (falhas parciais e conflito de versão)"""
+        print("\n[TEST] Verificando operações em lote...")
+        
+        existing = self._create_task(titulo='Lote existente', categoria='Lote')
+        removed = self._create_task(titulo='Lote removido', categoria='Lote')
+        
+        response = self.client.post('/api/tasks/bulk', json={'operations': [
+            {'op': 'create', 'data': {'titulo': 'Lote novo', 'categoria': 'Lote',
+                                      'prioridade': 'alta', 'status': 'pendente'}},
+            {'op': 'create', 'data': {'titulo': 'Lote inválido', 'categoria': 'Lote',
+                                      'prioridade': 'nenhuma', 'status': 'pendente'}},
+            {'op': 'update', 'id': existing['id'], 'data': {'titulo': 'Lote alterado'}},
+            {'op': 'update', 'id': existing['id'] + 100000, 'data': {'titulo': 'Inexistente'}},
+            {'op': 'delete', 'id': removed['id'], 'versao': removed['versao'] + 1},
+            {'op': 'renomear', 'id': existing['id']}
+        ]})
+        self.assertEqual(response.status_code, 207)
+        body = response.get_json()
+        self.assertEqual([r['success'] for r in body['data']], [True, False, True, False, False, False])
+        self.assertEqual(body['meta'], {'total': 6, 'succeeded': 2, 'failed': 4})
+        
+        created = Task.get_by_id(body['data'][0]['id'])
+        self.assertEqual(created['titulo'], 'Lote novo')
+        self.assertEqual(Task.get_by_id(existing['id'])['titulo'], 'Lote alterado')
+        self.assertEqual(Task.get_by_id(existing['id'])['versao'], existing['versao'] + 1)
+        self.assertIsNotNone(Task.get_by_id(removed['id']), "Exclusão com versão antiga foi aplicada")
+        print("   Falhas parciais e versão: OK")
+        
+        response = self.client.post('/api/appointments/bulk', json=[
+            {'op': 'create', 'data': {'titulo': 'Lote compromisso', 'data': '2030-01-10',
+                                      'horario_inicio': '10:00', 'horario_fim': '11:00'}},
+            {'op': 'delete', 'id': removed['id'] + 100000}
+        ])
+        self.assertEqual(response.status_code, 207)
+        appointment_id = response.get_json()['data'][0]['id']
+        self.assertEqual(Appointment.get_by_id(appointment_id)['titulo'], 'Lote compromisso')
+        
+        self.assertEqual(self.client.post('/api/tasks/bulk', json={'operations': []}).status_code, 400)
+        self.assertEqual(self.client.post('/api/tasks/bulk', data='x').status_code, 415)
+        print("   Rotas de lote: OK")
+
+    def test_08_task_cursor_pagination(self):
+        """Teste da paginação por cursor de tarefas (datas nulas e cursores adulterados)"""
+        print("\n[TEST] Verificando paginação por cursor de tarefas...")
+        
+        # Mesma prioridade: a ordem depende de data_limite, com NULL antes das datas
+        for deadline in ('2030-03-01', None, '2030-01-01', None, '2030-02-01'):
+            self._create_task(categoria='Cursor', prioridade='alta', data_limite=deadline)
+        self._create_task(categoria='Cursor', prioridade='urgente')
+        self._create_task(categoria='Cursor', prioridade='baixa')
+        expected = [task['id'] for task in Task.get_all({'categoria': 'Cursor'})]
+        
+        seen, cursor = [], None
+        while True:
+            page = Task.get_page({'categoria': 'Cursor'}, limit=2, cursor=cursor)
+            seen.extend(task['id'] for task in page['items'])
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, expected)
+        deadlines = [Task.get_by_id(task_id)['data_limite'] for task_id in seen[1:6]]
+        self.assertEqual(deadlines, [None, None, '2030-01-01', '2030-02-01', '2030-03-01'])
+        print("   Páginas com data limite nula: OK")
+        
+        # Cursores adulterados são rejeitados com 400, nunca chegam à consulta
+        tampered = ['%%%', encode_cursor({'a': 1}), encode_cursor([1, 2]),
+                    encode_cursor([[1], None, 1]), encode_cursor([{'x': 1}, None, 1]),
+                    encode_cursor([True, None, 1]), encode_cursor([1, None, 2 ** 70])]
+        for cursor in tampered:
+            response = self.client.get('/api/tasks', query_string={'cursor': cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor([1, [2]]), 2)
+        
+        # Valores do tipo certo, mas fora da ordem esperada, só resultam em página vazia
+        response = self.client.get('/api/tasks', query_string={'cursor': encode_cursor([None, None, 0])})
+        self.assertEqual(response.status_code, 200)
+        print("   Cursores adulterados: OK")
+
+    def test_09_appointment_seek_pagination(self):
+        """Teste da paginação por cursor de compromissos (ordem, total e cursor)"""
+        print("\n[TEST] Verificando paginação de compromissos...")
+        
+        for day, start in (('2031-05-02', '09:00'), ('2031-05-01', '14:00'),
+                           ('2031-05-01', '08:00'), ('2031-05-01', '08:00'), ('2031-05-03', '07:00')):
+            self._create_appointment(palavra_chave='seek', data=day, horario_inicio=start, horario_fim='23:00')
+        filters = {'palavra_chave': 'seek'}
+        expected = [a['id'] for a in Appointment.get_all(filters)]
+        keys = [(a['data'], a['horario_inicio'], a['id']) for a in Appointment.get_all(filters)]
+        self.assertEqual(keys, sorted(keys))
+        
+        seen, cursor = [], None
+        while True:
+            response = self.client.get('/api/appointments', query_string={
+                'palavra_chave': 'seek', 'per_page': 2, 'include_total': 1, 'cursor': cursor or ''})
+            self.assertEqual(response.status_code, 200)
+            body = response.get_json()
+            self.assertEqual(body['meta']['total'], 5)
+            seen.extend(a['id'] for a in body['data'])
+            cursor = body['meta']['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, expected)
+        print("   Páginas e total: OK")
+        
+        for cursor in (encode_cursor(['2031-05-01', {'h': 1}, 1]), encode_cursor(['2031-05-01'])):
+            response = self.client.get('/api/appointments', query_string={'cursor': cursor})
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get('/api/appointments?per_page=0').status_code, 400)
+        print("   Parâmetros inválidos: OK")
+
+    def test_10_priority_ordering(self):
+        """Teste da ordenação por prioridade (prioridade_rank) servida por índice"""
+        print("\n[TEST] Verificando ordenação por prioridade...")
+        
+        for priority in ('baixa', 'media', 'urgente', 'alta'):
+            self._create_task(categoria='Ordem', prioridade=priority, status='adiada')
+        tasks = Task.get_all({'categoria': 'Ordem'})
+        self.assertEqual([t['prioridade'] for t in tasks], ['urgente', 'alta', 'media', 'baixa'])
+        self.assertEqual([t['prioridade_rank'] for t in tasks], [1, 2, 3, 4])
+        
+        # A coluna gerada acompanha a troca de prioridade
+        Task.update(tasks[-1]['id'], {'prioridade': 'URGENTE'})
+        self.assertEqual(Task.get_by_id(tasks[-1]['id'])['prioridade_rank'], 1)
+        print("   Ordem das prioridades: OK")
+        
+        for where, params in (('status = ?', ['adiada']), ('1=1', [])):
+            plan = ' '.join(row[3] for row in execute_query(
+                f'EXPLAIN QUERY PLAN SELECT * FROM tarefas WHERE {where} '
+                f'ORDER BY prioridade_rank ASC, data_limite ASC, id ASC LIMIT 10', params or None))
+            self.assertIn('USING INDEX', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+        print("   Plano sem ordenação temporária: OK")
+
+    def test_11_full_text_search(self):
+        """Teste da busca textual (acentos, prefixos, operadores e sincronia do índice)"""
+        print("\n[TEST] Verificando busca textual...")
+        
+        task = self._create_task(titulo='Revisão orçamentária trimestral', descricao='Planilhas do xilofone')
+        appointment = self._create_appointment(titulo='Reunião xilofone', assunto_principal='Orçamento')
+        
+        found = Search.query('revisao orcament')['items']
+        self.assertIn(('tarefa', task['id']), [(item['tipo'], item['id']) for item in found])
+        
+        found = Search.query('xilofone', include_total=True)
+        self.assertEqual({(item['tipo'], item['id']) for item in found['items']},
+                         {('tarefa', task['id']), ('compromisso', appointment['id'])})
+        self.assertEqual(found['total'], 2)
+        self.assertEqual(Search.query('xilofone', ['compromissos'])['items'][0]['id'], appointment['id'])
+        self.assertIn('<mark>', found['items'][0]['trecho'])
+        print("   Acentos, prefixos e tipos: OK")
+        
+        # Sintaxe FTS5 digitada pelo usuário é tratada como texto
+        self.assertEqual(self.client.get('/api/search', query_string={'q': 'xilofone" OR NEAR(*'}).status_code, 200)
+        self.assertEqual(self.client.get('/api/search', query_string={'q': '"*'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/search', query_string={'q': 'x', 'tipo': 'outro'}).status_code, 400)
+        
+        # O índice acompanha alterações e exclusões
+        Task.update(task['id'], {'descricao': 'Sem o instrumento'})
+        Appointment.delete(appointment['id'])
+        self.assertEqual(Search.query('xilofone')['items'], [])
+        print("   Sincronia do índice: OK")
+
+    def test_12_dashboard_stats(self):
+        """Teste das estatísticas do dashboard (contagens por status, prioridade e categoria)"""
+        print("\n[TEST] Verificando estatísticas do dashboard...")
+        
+        before = self.client.get('/api/dashboard/stats').get_json()['data']
+        self._create_task(categoria='Estatística', prioridade='urgente', status='em_andamento')
+        task = self._create_task(categoria='Estatística', prioridade='baixa')
+        Task.update(task['id'], {'status': 'concluida', 'prioridade': 'alta'})
+        self._create_appointment()
+        after = self.client.get('/api/dashboard/stats').get_json()['data']
+        
+        tasks_before, tasks_after = before['tarefas'], after['tarefas']
+        self.assertEqual(tasks_after['total'] - tasks_before['total'], 2)
+        self.assertEqual(tasks_after['por_status']['em_andamento'] - tasks_before['por_status']['em_andamento'], 1)
+        self.assertEqual(tasks_after['por_status']['concluida'] - tasks_before['por_status']['concluida'], 1)
+        self.assertEqual(tasks_after['por_status']['pendente'], tasks_before['por_status']['pendente'])
+        self.assertEqual(tasks_after['por_prioridade']['alta'] - tasks_before['por_prioridade']['alta'], 1)
+        self.assertEqual(tasks_after['por_prioridade']['baixa'], tasks_before['por_prioridade']['baixa'])
+        self.assertEqual(tasks_after['por_categoria']['Estatística'], 2)
+        self.assertEqual(after['compromissos']['total'] - before['compromissos']['total'], 1)
+        print("   Contagens: OK")
+
+    def test_13_stat_counters_consistency(self):
+        """Teste dos contadores materializados (triggers, verificação e reconstrução)"""
+        print("\n[TEST] Verificando contadores materializados...")
+        
+        task = self._create_task(categoria='Contador', prioridade='urgente')
+        Task.update(task['id'], {'categoria': 'Contador 2', 'status': 'adiada'})
+        Task.bulk_apply([{'op': 'create', 'data': {'titulo': 'c', 'categoria': 'Contador',
+                                                   'prioridade': 'alta', 'status': 'pendente'}},
+                         {'op': 'delete', 'id': task['id']}])
+        appointment = self._create_appointment(data='2031-12-24')
+        Appointment.update(appointment['id'], {'data': '2031-12-25'})
+        self.assertEqual(check_stat_counters(), [])
+        print("   Contadores consistentes após escritas: OK")
+        
+        # Uma divergência é detectada e corrigida pela reconstrução
+        execute_update("UPDATE estatisticas_contadores SET total = total + 5 WHERE escopo = 'tarefas'")
+        divergences = check_stat_counters()
+        self.assertEqual([(d['escopo'], d['atual'] - d['esperado']) for d in divergences], [('tarefas', 5)])
+        rebuild_stat_counters()
+        self.assertEqual(check_stat_counters(), [])
+        print("   Verificação e reconstrução: OK")
+
+    def test_14_urgent_items(self):
+        """Teste dos itens urgentes do dashboard (prioridade, prazo e tarefas concluídas)"""
+        print("\n[TEST] Verificando itens urgentes...")
+        
+        today = datetime.now().date()
+        urgent = self._create_task(categoria='Urgente', prioridade='urgente')
+        due_soon = self._create_task(categoria='Urgente', prioridade='baixa',
+                                     data_limite=(today + timedelta(days=1)).isoformat())
+        overdue = self._create_task(categoria='Urgente', prioridade='media',
+                                    data_limite=(today - timedelta(days=10)).isoformat())
+        done = self._create_task(categoria='Urgente', prioridade='urgente', status='concluida')
+        later = self._create_task(categoria='Urgente', prioridade='alta',
+                                  data_limite=(today + timedelta(days=30)).isoformat())
+        
+        ids = [task['id'] for task in Task.get_urgent(3)]
+        for task in (urgent, due_soon, overdue):
+            self.assertIn(task['id'], ids)
+        for task in (done, later):
+            self.assertNotIn(task['id'], ids)
+        self.assertIn(later['id'], [task['id'] for task in Task.get_urgent(30)])
+        print("   Seleção de tarefas urgentes: OK")
+        
+        response = self.client.get('/api/dashboard/urgent', query_string={'fields_tarefas': 'titulo'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.get_json()['data']['tarefas_urgentes'][0]), {'id', 'titulo'})
+        self.assertEqual(self.client.get('/api/dashboard/urgent?dias=999').status_code, 400)
+        print("   Rota de itens urgentes: OK")
+
+    def test_15_calendar_range(self):
+        """Teste do calendário por intervalo (filtro de datas e validação dos parâmetros)"""
+        print("\n[TEST] Verificando calendário por intervalo...")
+        
+        inside = self._create_task(categoria='Calendário', data_limite='2032-02-29')
+        outside = self._create_task(categoria='Calendário', data_limite='2032-03-01')
+        appointment = self._create_appointment(data='2032-02-01')
+        
+        response = self.client.get('/api/dashboard/calendar', query_string={'year': 2032, 'month': 2})
+        self.assertEqual(response.status_code, 200)
+        days = response.get_json()['data']
+        self.assertEqual([t['id'] for t in days['2032-02-29']['tarefas']], [inside['id']])
+        self.assertEqual([a['id'] for a in days['2032-02-01']['compromissos']], [appointment['id']])
+        self.assertNotIn('2032-03-01', days)
+        
+        response = self.client.get('/api/dashboard/calendar', query_string={
+            'data_inicio': '2032-02-29', 'data_fim': '2032-03-01', 'fields_tarefas': 'titulo'})
+        days = response.get_json()['data']
+        self.assertEqual([t['id'] for t in days['2032-03-01']['tarefas']], [outside['id']])
+        self.assertEqual(set(days['2032-03-01']['tarefas'][0]), {'id', 'titulo', 'data_limite'})
+        print("   Filtro por intervalo: OK")
+        
+        for params in ({'data_inicio': '2032-02-30', 'data_fim': '2032-03-01'},
+                       {'data_inicio': '2032-03-01'},
+                       {'data_inicio': '2032-03-01', 'data_fim': '2032-02-01'},
+                       {'data_inicio': '2030-01-01', 'data_fim': '2033-01-01'},
+                       {'year': 2032, 'month': 13}):
+            self.assertEqual(self.client.get('/api/dashboard/calendar', query_string=params).status_code, 400,
+                             params)
+        print("   Parâmetros inválidos: OK")
+
+    def test_16_calendar_summary(self):
+        """Teste do resumo do calendário (contagens por dia e prioridade)"""
+        print("\n[TEST] Verificando resumo do calendário...")
+        
+        self._create_task(data_limite='2033-06-10', prioridade='alta')
+        self._create_task(data_limite='2033-06-10', prioridade='alta')
+        self._create_task(data_limite='2033-06-10', prioridade='baixa')
+        self._create_task(data_limite='2033-06-12', prioridade='urgente')
+        self._create_appointment(data='2033-06-10')
+        self._create_appointment(data='2033-06-11')
+        
+        response = self.client.get('/api/dashboard/calendar/summary',
+                                   query_string={'data_inicio': '2033-06-10', 'data_fim': '2033-06-11'})
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(body['meta'], {'data_inicio': '2033-06-10', 'data_fim': '2033-06-11'})
+        self.assertEqual(body['data'], {
+            '2033-06-10': {'compromissos': 1, 'tarefas': 3, 'tarefas_por_prioridade': {'alta': 2, 'baixa': 1}},
+            '2033-06-11': {'compromissos': 1, 'tarefas': 0, 'tarefas_por_prioridade': {}}
+        })
+        self.assertEqual(self.client.get('/api/dashboard/calendar/summary?year=2033&month=0').status_code, 400)
+        print("   Contagens por dia: OK")
+
+    def test_17_response_cache(self):
+        """Teste do cache de respostas (acerto e invalidação por escrita)"""
+        print("\n[TEST] Verificando cache de respostas...")
+        
+        self._create_task(categoria='Cache')
+        query = {'categoria': 'Cache', 'include_total': 1}
+        first = self.client.get('/api/tasks', query_string=query)
+        hits = response_cache.stats()['acertos']
+        second = self.client.get('/api/tasks', query_string=query)
+        self.assertEqual(response_cache.stats()['acertos'], hits + 1)
+        self.assertEqual(first.get_data(), second.get_data())
+        print("   Acerto no cache: OK")
+        
+        # Qualquer escrita na tabela muda a chave e a resposta é recalculada
+        self._create_task(categoria='Cache')
+        third = self.client.get('/api/tasks', query_string=query)
+        self.assertEqual(response_cache.stats()['acertos'], hits + 1)
+        self.assertEqual(third.get_json()['meta']['total'], 2)
+        print("   Invalidação por escrita: OK")
+
+    def test_18_conditional_get(self):
+        """Teste de ETag / If-None-Match nas listagens e nos registros"""
+        print("\n[TEST] Verificando GET condicional...")
+        
+        task = self._create_task(categoria='ETag')
+        response = self.client.get('/api/tasks?categoria=ETag')
+        etag = response.headers['ETag']
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        
+        response = self.client.get('/api/tasks?categoria=ETag', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+        
+        # Outra consulta ou uma escrita geram outra ETag
+        self.assertNotEqual(self.client.get('/api/tasks?categoria=Outra').headers['ETag'], etag)
+        Task.update(task['id'], {'titulo': 'ETag alterada'})
+        response = self.client.get('/api/tasks?categoria=ETag', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        print("   ETag das listagens: OK")
+        
+        response = self.client.get(f"/api/tasks/{task['id']}")
+        self.assertEqual(response.headers['ETag'], f'"{task["versao"] + 1}"')
+        response = self.client.get(f"/api/tasks/{task['id']}", headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        print("   ETag por registro: OK")
+
+    def test_19_delta_sync(self):
+        """Teste da sincronização incremental (alterações, exclusões e poda do registro)"""
+        print("\n[TEST] Verificando sincronização incremental...")
+        
+        since = execute_query('SELECT seq FROM sincronizacao')[0][0]
+        created = self._create_task(categoria='Sync')
+        updated = self._create_task(categoria='Sync')
+        deleted = self._create_task(categoria='Sync')
+        appointment = self._create_appointment()
+        Task.update(updated['id'], {'titulo': 'Sync alterada'})
+        Task.delete(deleted['id'])
+        Appointment.delete(appointment['id'])
+        
+        changes = Sync.changes(since)
+        self.assertEqual([t['id'] for t in changes['tarefas']], [created['id'], updated['id']])
+        self.assertEqual(changes['tarefas'][1]['titulo'], 'Sync alterada')
+        self.assertEqual(changes['compromissos'], [])
+        self.assertEqual([(e['tipo'], e['id']) for e in changes['excluidos']],
+                         [('tarefas', deleted['id']), ('compromissos', appointment['id'])])
+        self.assertEqual(Sync.changes(changes['seq'])['tarefas'], [])
+        print("   Alterações e exclusões: OK")
+        
+        # Com limite, 'mais' e o seq devolvido permitem continuar de onde parou
+        page = Sync.changes(since, limit=1, types=['tarefas'])
+        self.assertTrue(page['mais'])
+        self.assertEqual([t['id'] for t in page['tarefas']], [created['id']])
+        self.assertEqual([t['id'] for t in Sync.changes(page['seq'], limit=1, types=['tarefas'])['tarefas']],
+                         [updated['id']])
+        
+        # Carga completa (since=0) não traz exclusões
+        self.assertEqual(Sync.changes(0)['excluidos'], [])
+        print("   Limite e carga completa: OK")
+        
+        # Exclusões antigas são podadas; clientes anteriores à poda precisam recomeçar
+        tombstone_seq = changes['excluidos'][0]['seq']
+        execute_update("UPDATE exclusoes SET excluido_em = '2000-01-01' WHERE seq <= ?", (tombstone_seq,))
+        self.assertGreaterEqual(prune_tombstones(30), 1)
+        self.assertEqual(prune_tombstones(30), 0)
+        self.assertTrue(Sync.changes(since)['reiniciar'])
+        self.assertFalse(Sync.changes(tombstone_seq)['reiniciar'])
+        response = self.client.get('/api/sync', query_string={'since': since})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(self.client.get('/api/sync?since=-1').status_code, 400)
+        self.assertEqual(self.client.get('/api/sync?tipo=outro').status_code, 400)
+        print("   Poda do registro de exclusões: OK")
+
+    def test_20_event_feed(self):
+        """Teste do feed de eventos (limite de assinantes e conexão do broker)"""
+        print("\n[TEST] Verificando feed de eventos...")
+        
+        opened = []
+        original = events.open_connection
+        def open_connection(database_path=None):
+            opened.append(original(database_path))
+            return opened[-1]
+        
+        with mock.patch.object(config, 'EVENTS_MAX_SUBSCRIBERS', 1), \
+             mock.patch.object(config, 'EVENTS_POLL_INTERVAL', 0.05), \
+             mock.patch.object(config, 'EVENTS_HEARTBEAT', 0.5), \
+             mock.patch.object(events, 'open_connection', open_connection), \
+             mock.patch.object(events, '_broker', None):
+            response = self.client.get('/api/events', buffered=False)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(next(response.response), b'retry: 3000\n\n')
+            broker = events.get_broker()
+            self.assertEqual(broker.stats()['assinantes'], 1)
+            
+            # Acima do limite a conexão é recusada sem ocupar a thread
+            refused = self.client.get('/api/events')
+            self.assertEqual(refused.status_code, 503)
+            self.assertIn('Retry-After', refused.headers)
+            self.assertEqual(broker.stats()['recusados'], 1)
+            print("   Limite de assinantes: OK")
+            
+            task = self._create_task(categoria='Eventos')
+            for _ in range(20):
+                chunk = next(response.response).decode()
+                if 'event: alteracoes' in chunk:
+                    break
+            payload = json.loads(chunk.split('data: ', 1)[1])
+            self.assertIn({'tipo': 'tarefas', 'id': task['id'], 'acao': 'criado'}, payload['eventos'])
+            print("   Entrega de eventos: OK")
+            
+            # O broker verifica o banco por uma conexão própria com o perfil de PRAGMAs
+            self.assertEqual(len(opened), 1)
+            self.assertEqual(opened[0].execute('PRAGMA cache_size').fetchone()[0],
+                             config.SQLITE_PRAGMAS['cache_size'])
+            print("   PRAGMAs da conexão do broker: OK")
+            
+            # Encerrar a resposta libera a vaga, mesmo sem ter transmitido nada
+            response.close()
+            self.assertEqual(broker.stats()['assinantes'], 0)
+            idle = self.client.get('/api/events', buffered=False)
+            self.assertEqual(idle.status_code, 200)
+            idle.close()
+            self.assertEqual(broker.stats()['assinantes'], 0)
+            print("   Liberação da vaga: OK")
+
+    def test_21_field_projection(self):
+        """Teste da projeção de campos (fields=) nas listagens"""
+        print("\n[TEST] Verificando projeção de campos...")
+        
+        for i in range(3):
+            self._create_task(categoria='Campos', titulo=f'Campos {i}', descricao='x' * 500,
+                              checklist=[{'texto': 'item', 'feito': False}])
+        
+        page = Task.get_page({'categoria': 'Campos'}, 2, None, fields=['titulo', 'checklist'])
+        self.assertEqual([set(t) for t in page['items']], [{'id', 'titulo', 'checklist'}] * 2)
+        self.assertEqual(page['items'][0]['checklist'], [{'texto': 'item', 'feito': False}])
+        
+        # Colunas lidas só para ordenação e cursor não aparecem, e o cursor continua válido
+        response = self.client.get('/api/tasks', query_string={'categoria': 'Campos', 'per_page': 2,
+                                                               'fields': 'titulo,status'})
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual([set(t) for t in body['data']], [{'id', 'titulo', 'status'}] * 2)
+        response = self.client.get('/api/tasks', query_string={'categoria': 'Campos', 'per_page': 2,
+                                                               'fields': 'titulo,status',
+                                                               'cursor': body['meta']['next_cursor']})
+        titles = [t['titulo'] for t in body['data'] + response.get_json()['data']]
+        self.assertEqual(sorted(titles), ['Campos 0', 'Campos 1', 'Campos 2'])
+        print("   Campos das tarefas: OK")
+        
+        self._create_appointment(data='2031-03-10', titulo='Projeção')
+        response = self.client.get('/api/appointments', query_string={
+            'data_inicio': '2031-03-01', 'data_fim': '2031-03-31', 'fields': 'titulo'})
+        self.assertEqual(response.get_json()['data'], [{'id': response.get_json()['data'][0]['id'],
+                                                        'titulo': 'Projeção'}])
+        print("   Campos dos compromissos: OK")
+        
+        self.assertEqual(self.client.get('/api/tasks?fields=titulo,senha').status_code, 400)
+        self.assertEqual(self.client.get('/api/appointments?fields=categoria').status_code, 400)
+        self.assertEqual(self.client.get('/api/sync?fields_tarefas=inexistente').status_code, 400)
+        with self.assertRaises(ValueError):
+            Task.get_page(None, 10, None, fields=['titulo', 'rowid'])
+        print("   Campos inválidos: OK")
+
+    def test_22_columnar_format(self):
+        """Teste do formato colunar e da negociação de MessagePack"""
+        print("\n[TEST] Verificando formato colunar...")
+        
+        for i in range(3):
+            self._create_task(categoria='Colunar', titulo=f'Colunar {i}',
+                              checklist=[{'texto': f'item {i}', 'feito': True}])
+        
+        objects = Task.get_page({'categoria': 'Colunar'}, 2, None)
+        columnar = Task.get_page({'categoria': 'Colunar'}, 2, None, columnar=True)
+        self.assertEqual(columnar['next_cursor'], objects['next_cursor'])
+        self.assertEqual([dict(zip(columnar['items']['columns'], row)) for row in columnar['items']['rows']],
+                         objects['items'])
+        print("   Mesmos dados e cursor do formato de objetos: OK")
+        
+        response = self.client.get('/api/tasks', query_string={'categoria': 'Colunar', 'format': 'columnar',
+                                                               'fields': 'titulo,checklist,posicao'})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()['data']
+        self.assertEqual(data['columns'], ['id', 'titulo', 'checklist', 'posicao'])
+        self.assertEqual(len(data['rows']), 3)
+        self.assertEqual(data['rows'][0][2], [{'texto': 'item 0', 'feito': True}])
+        print("   Projeção com checklist decodificado: OK")
+        
+        self._create_appointment(data='2031-04-10', titulo='Colunar')
+        response = self.client.get('/api/appointments', query_string={
+            'data_inicio': '2031-04-01', 'data_fim': '2031-04-30', 'format': 'columnar', 'fields': 'titulo'})
+        self.assertEqual(response.get_json()['data']['columns'], ['id', 'titulo'])
+        self.assertEqual(response.get_json()['data']['rows'][0][1], 'Colunar')
+        print("   Compromissos: OK")
+        
+        # Sem o pacote msgpack a resposta continua em JSON; Accept entra no Vary
+        response = self.client.get('/api/tasks?categoria=Colunar', headers={'Accept': 'application/msgpack'})
+        self.assertIn('Accept', response.headers['Vary'])
+        if serialization.msgpack is None:
+            self.assertEqual(response.mimetype, 'application/json')
+        else:
+            self.assertEqual(response.mimetype, 'application/msgpack')
+        self.assertEqual(self.client.get('/api/tasks?format=xml').status_code, 400)
+        self.assertEqual(self.client.get('/api/tasks?format=columnar&stream=1').status_code, 400)
+        print("   Negociação e formatos inválidos: OK")
+
+    def test_23_streaming_lists(self):
+        """Teste das listas em streaming (páginas curtas, sem reservar conexão)"""
+        print("\n[TEST] Verificando listas em streaming...")
+        
+        created = [self._create_task(categoria='Stream', titulo=f'Stream {i}',
+                                     prioridade=['alta', 'baixa'][i % 2],
+                                     data_limite=None if i % 3 == 0 else f'2031-05-{10 + i:02d}')
+                   for i in range(7)]
+        expected = [t['id'] for t in Task.get_page({'categoria': 'Stream'}, 100, None)['items']]
+        self.assertEqual(sorted(expected), sorted(t['id'] for t in created))
+        
+        with mock.patch('models.STREAM_BATCH_SIZE', 2):
+            iterator = Task.iter_all({'categoria': 'Stream'}, ['titulo'])
+            first = next(iterator)
+            # Entre as páginas nenhuma conexão fica reservada
+            self.assertEqual(get_pool().stats()['em_uso'], 0)
+            ids = [first['id']] + [t['id'] for t in iterator]
+            self.assertEqual(ids, expected)
+            self.assertEqual(set(first), {'id', 'titulo'})
+            print("   Ordem e páginas das tarefas: OK")
+            
+            response = self.client.get('/api/tasks', query_string={'categoria': 'Stream', 'stream': 1,
+                                                                   'fields': 'titulo'})
+            self.assertEqual([t['id'] for t in response.get_json()['data']], expected)
+            
+            for day in (3, 1, 2, 1):
+                self._create_appointment(data=f'2031-06-0{day}', titulo='Stream')
+            appointments = list(Appointment.iter_all({'data_inicio': '2031-06-01', 'data_fim': '2031-06-30'}))
+            self.assertEqual([a['data'] for a in appointments],
+                             ['2031-06-01', '2031-06-01', '2031-06-02', '2031-06-03'])
+            
+            for task in created[:3]:
+                Task.update(task['id'], {'status': 'concluida'})
+            history = list(Task.iter_completed())
+            self.assertEqual([t['id'] for t in history],
+                             [t['id'] for t in Task.get_history(None, 1000, None)['items']])
+            print("   Compromissos e histórico: OK")
+        
+        with self.assertRaises(ValueError):
+            Task.iter_all(None, ['senha'])
+        self.assertEqual(self.client.get('/api/tasks?stream=1&fields=senha').status_code, 400)
+        print("   Campos validados antes da resposta: OK")
+
+    def test_24_export_import(self):
+        """Teste da exportação em streaming e da importação com falhas parciais"""
+        print("\n[TEST] Verificando exportação e importação...")
+        
+        lines = [
+            {'titulo': 'Importada 1', 'categoria': 'Importacao', 'prioridade': 'alta', 'status': 'pendente'},
+            {'titulo': 'Prioridade numérica', 'categoria': 'Importacao', 'prioridade': 3, 'status': 'pendente'},
+            {'titulo': 'Status nulo', 'categoria': 'Importacao', 'prioridade': 'baixa', 'status': None},
+            {'titulo': 'Data numérica', 'categoria': 'Importacao', 'prioridade': 'media',
+             'status': 'pendente', 'data_limite': 20310101},
+            '{"titulo": "quebrada"',
+            ['não', 'é', 'objeto'],
+            {'titulo': 'Importada 2', 'categoria': 'Importacao', 'prioridade': 'Media',
+             'status': 'em_andamento', 'data_limite': '2031-07-01'},
+        ]
+        body = '\n'.join(line if isinstance(line, str) else json.dumps(line) for line in lines) + '\n'
+        with mock.patch.object(config, 'IMPORT_BATCH_SIZE', 4):
+            response = self.client.post('/api/import?tipo=tarefas', data=body)
+        self.assertEqual(response.status_code, 200)
+        progress = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(len(progress), 3)
+        self.assertEqual([e['linha'] for e in progress[0]['erros']], [2, 3, 4])
+        self.assertEqual(progress[0]['erros'][0]['erros'], ["Campo 'prioridade' deve ser texto"])
+        self.assertIn("Campo 'data_limite' deve ser texto", progress[0]['erros'][2]['erros'])
+        self.assertEqual([e['linha'] for e in progress[1]['erros']], [5, 6])
+        final = progress[-1]
+        self.assertTrue(final['concluido'])
+        self.assertEqual((final['processados'], final['importados'], final['falhas']), (7, 2, 5))
+        imported = Task.get_all({'categoria': 'Importacao'})
+        self.assertEqual(sorted(t['titulo'] for t in imported), ['Importada 1', 'Importada 2'])
+        print("   Importação com falhas parciais: OK")
+        
+        response = self.client.post('/api/import?tipo=compromissos', data=json.dumps(
+            {'titulo': 'Horário numérico', 'data': '2031-07-01', 'horario_inicio': 900, 'horario_fim': '10:00'}))
+        final = json.loads(response.get_data(as_text=True).splitlines()[-1])
+        self.assertEqual((final['importados'], final['falhas']), (0, 1))
+        self.assertEqual(self.client.patch(f"/api/tasks/{imported[0]['id']}/status",
+                                           json={'status': 1}).status_code, 400)
+        print("   Tipos inválidos nos compromissos e no status: OK")
+        
+        # A exportação lê uma página por consulta e não reserva conexão durante o download
+        with mock.patch('models.STREAM_BATCH_SIZE', 1):
+            response = self.client.get('/api/export', query_string={'tipo': 'tarefas', 'categoria': 'Importacao',
+                                                                   'fields': 'titulo'}, buffered=False)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(get_pool().stats()['em_uso'], 0)
+            exported = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(exported, [{'id': t['id'], 'titulo': t['titulo']} for t in imported])
+        self.assertEqual(get_pool().stats()['em_uso'], 0)
+        print("   Exportação em páginas: OK")
+
+    def test_25_if_match(self):
+        """Teste do controle de concorrência otimista (If-Match e versao no lote)"""
+        print("\n[TEST] Verificando If-Match...")
+        
+        task = self._create_task(categoria='IfMatch')
+        stale = {'If-Match': f'"{task["versao"]}"'}
+        Task.update(task['id'], {'titulo': 'Alterada por outro'})
+        current = task['versao'] + 1
+        
+        response = self.client.put(f"/api/tasks/{task['id']}", json={'titulo': 'Minha versão'}, headers=stale)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response.headers['ETag'], f'"{current}"')
+        self.assertEqual(response.get_json()['data']['titulo'], 'Alterada por outro')
+        response = self.client.patch(f"/api/tasks/{task['id']}/status", json={'status': 'concluida'}, headers=stale)
+        self.assertEqual(response.status_code, 412)
+        response = self.client.delete(f"/api/tasks/{task['id']}", headers=stale)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(self.client.put(f"/api/tasks/{task['id']}", json={'titulo': 'x'},
+                                         headers={'If-Match': '"abc"'}).status_code, 412)
+        unchanged = Task.get_by_id(task['id'])
+        self.assertEqual((unchanged['titulo'], unchanged['status'], unchanged['versao']),
+                         ('Alterada por outro', 'pendente', current))
+        print("   412 em PUT, PATCH e DELETE de tarefas: OK")
+        
+        fresh = {'If-Match': f'"{current}"'}
+        response = self.client.put(f"/api/tasks/{task['id']}", json={'titulo': 'Minha versão'}, headers=fresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['ETag'], f'"{current + 1}"')
+        response = self.client.patch(f"/api/tasks/{task['id']}/status", json={'status': 'concluida'},
+                                     headers={'If-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.delete(f"/api/tasks/{task['id']}", headers={'If-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(Task.get_by_id(task['id']))
+        self.assertEqual(self.client.delete(f"/api/tasks/{task['id']}", headers=fresh).status_code, 404)
+        print("   Versão atual e If-Match '*': OK")
+        
+        appointment = self._create_appointment(data='2031-08-01')
+        Appointment.update(appointment['id'], {'titulo': 'Alterado por outro'})
+        stale = {'If-Match': f'"{appointment["versao"]}"'}
+        self.assertEqual(self.client.put(f"/api/appointments/{appointment['id']}", json={'titulo': 'x'},
+                                         headers=stale).status_code, 412)
+        self.assertEqual(self.client.delete(f"/api/appointments/{appointment['id']}", headers=stale).status_code, 412)
+        self.assertEqual(self.client.delete(f"/api/appointments/{appointment['id']}",
+                                            headers={'If-Match': '*'}).status_code, 200)
+        print("   412 em compromissos: OK")
+        
+        # No lote, 'versao' desatualizada falha só a operação correspondente
+        task = self._create_task(categoria='IfMatch')
+        other = self._create_task(categoria='IfMatch')
+        removed = self._create_task(categoria='IfMatch')
+        results = Task.bulk_apply([
+            {'op': 'update', 'id': task['id'], 'versao': task['versao'] + 1, 'data': {'titulo': 'x'}},
+            {'op': 'update', 'id': other['id'], 'versao': other['versao'], 'data': {'titulo': 'Lote'}},
+            {'op': 'delete', 'id': task['id'], 'versao': task['versao'] + 1},
+            {'op': 'delete', 'id': removed['id'], 'versao': removed['versao']}
+        ])
+        self.assertEqual([r['success'] for r in results], [False, True, False, True])
+        self.assertEqual(Task.get_by_id(task['id'])['titulo'], 'Tarefa de teste')
+        self.assertEqual(Task.get_by_id(other['id'])['titulo'], 'Lote')
+        self.assertIsNone(Task.get_by_id(removed['id']))
+        print("   Versão nas operações em lote: OK")
+
+    def test_26_ranking_keys(self):
+        """Teste das chaves de posição do quadro (key_between e keys_after)"""
+        print("\n[TEST] Verificando chaves de posição...")
+        
+        self.assertEqual(key_between(None, None), INTEGER_ZERO)
+        self.assertEqual(keys_after(None, 3), ['a0', 'a1', 'a2'])
+        self.assertEqual(keys_after('az', 2), ['b00', 'b01'])     # a parte inteira ganha um dígito
+        self.assertEqual(key_between('Zz', None), 'a0')           # de negativo para zero
+        self.assertEqual(key_between(None, 'a0'), 'Zz')
+        self.assertEqual(key_between('a0', 'a1'), 'a0V')
+        self.assertEqual(keys_after('a0', 0), [])
+        print("   Início, fim e troca de tamanho da parte inteira: OK")
+        
+        # Nos extremos do espaço de inteiros as chaves passam a usar a parte fracionária
+        largest = 'z' + 'z' * 26
+        self.assertGreater(key_between(largest, None), largest)
+        smallest = key_between(None, SMALLEST_INTEGER + '1')
+        self.assertLess(smallest, SMALLEST_INTEGER + '1')
+        self.assertTrue(smallest.startswith(SMALLEST_INTEGER))
+        print("   Extremos: OK")
+        
+        # Inserções repetidas no mesmo ponto continuam gerando chaves entre os vizinhos
+        rng = random.Random(42)
+        keys = ['a0']
+        for _ in range(500):
+            index = rng.randint(0, len(keys))
+            before = keys[index - 1] if index > 0 else None
+            after = keys[index] if index < len(keys) else None
+            key = key_between(before, after)
+            self.assertTrue((before is None or before < key) and (after is None or key < after))
+            keys.insert(index, key)
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(len(set(keys)), len(keys))
+        low, high = 'a0', 'a1'
+        for _ in range(50):
+            low = key_between(low, high)
+        self.assertLess(len(low), 20)
+        print("   Inserções aleatórias e repetidas: OK")
+        
+        for invalid in ('', 'a', 'a00', 'a0!', SMALLEST_INTEGER):
+            with self.assertRaises(ValueError):
+                key_between(invalid, None)
+        with self.assertRaises(ValueError):
+            key_between('a1', 'a0')
+        with self.assertRaises(ValueError):
+            key_between('a1', 'a1')
+        print("   Chaves inválidas e fora de ordem: OK")
+    
+    def _column(self, status):
+        """IDs da coluna do quadro, na ordem de posicao"""
+        return [row['id'] for row in execute_query(
+            'SELECT id FROM tarefas WHERE status = ? ORDER BY posicao', (status,))]
+    
+    def test_27_board_moves(self):
+        """Teste dos movimentos do quadro e da posição após mudança de status"""
+        print("\n[TEST] Verificando movimentos do quadro...")
+        
+        a, b, c = (self._create_task(categoria='Quadro', status='adiada') for _ in range(3))
+        self.assertEqual(self._column('adiada')[-3:], [a['id'], b['id'], c['id']])
+        
+        moved = Task.move([{'id': c['id'], 'status': 'adiada', 'apos': None},
+                           {'id': a['id'], 'status': 'adiada', 'apos': c['id']}])
+        self.assertEqual([t['id'] for t in moved], [c['id'], a['id']])
+        self.assertEqual(self._column('adiada')[:2], [c['id'], a['id']])
+        self.assertEqual(moved[0]['versao'], c['versao'] + 1)
+        print("   Movimentos encadeados no lote: OK")
+        
+        # Versão desatualizada: 412 e nenhum movimento do lote é aplicado
+        before = self._column('adiada')
+        response = self.client.post('/api/tasks/moves', json={'moves': [
+            {'id': b['id'], 'status': 'adiada', 'apos': None},
+            {'id': a['id'], 'status': 'em_andamento', 'versao': a['versao']}
+        ]})
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response.get_json()['data']['id'], a['id'])
+        self.assertEqual(self._column('adiada'), before)
+        print("   Conflito de versão atômico: OK")
+        
+        other = self._create_task(categoria='Quadro', status='pendente')
+        invalid = [
+            [{'id': b['id'], 'status': 'adiada', 'apos': other['id']}],   # âncora em outra coluna
+            [{'id': b['id'], 'status': 'adiada'}, {'id': b['id'], 'status': 'pendente'}],
+            [{'id': 999999, 'status': 'adiada'}],
+            [{'id': b['id'], 'status': 'arquivada'}],
+            [{'id': b['id'], 'status': 'adiada', 'apos': 'x'}],
+            []
+        ]
+        for moves in invalid:
+            self.assertEqual(self.client.post('/api/tasks/moves', json={'moves': moves}).status_code, 400)
+        self.assertEqual(self.client.post('/api/tasks/moves', data='[]').status_code, 415)
+        self.assertEqual(self._column('adiada'), before)
+        print("   Movimentos inválidos: OK")
+        
+        # Mudar o status por update, PATCH ou lote leva o cartão ao fim da nova coluna
+        pending = self._create_task(categoria='Quadro', status='pendente')
+        updated = Task.update(b['id'], {'status': 'pendente'})
+        self.assertEqual(self._column('pendente')[-1], b['id'])
+        self.assertGreater(updated['posicao'], pending['posicao'])
+        self.assertEqual(Task.update(b['id'], {'titulo': 'Sem mudança', 'status': 'pendente'})['posicao'],
+                         updated['posicao'])
+        
+        response = self.client.patch(f"/api/tasks/{c['id']}/status", json={'status': 'pendente'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._column('pendente')[-2:], [b['id'], c['id']])
+        
+        created = self._create_task(categoria='Quadro', status='em_andamento')
+        results = Task.bulk_apply([
+            {'op': 'update', 'id': a['id'], 'data': {'status': 'em_andamento'}},
+            {'op': 'update', 'id': other['id'], 'data': {'status': 'em_andamento', 'titulo': 'Outra'}},
+            {'op': 'update', 'id': pending['id'], 'data': {'status': 'em_andamento'}}
+        ])
+        self.assertTrue(all(r['success'] for r in results))
+        self.assertEqual(self._column('em_andamento')[-4:], [created['id'], a['id'], pending['id'], other['id']])
+        print("   Fim da coluna após mudança de status: OK")
+
+    def test_28_task_board(self):
+        """Teste do quadro agrupado por status (totais e cursor por coluna)"""
+        print("\n[TEST] Verificando quadro de tarefas...")
+        
+        for _ in range(3):
+            self._create_task(categoria='Board', status='adiada')
+        
+        response = self.client.get('/api/tasks/board?limit=2&fields=titulo')
+        self.assertEqual(response.status_code, 200)
+        board = response.get_json()['data']
+        self.assertEqual(set(board), {s.value for s in TaskStatus})
+        for status, column in board.items():
+            ids = self._column(status)
+            self.assertEqual(column['total'], len(ids))
+            self.assertEqual([t['id'] for t in column['items']], ids[:2])
+            self.assertEqual((column['next_cursor'] is not None), len(ids) > 2)
+        self.assertEqual(set(board['adiada']['items'][0]), {'id', 'titulo'})
+        print("   Totais e primeiros cartões: OK")
+        
+        # Tarefas sem posição (anteriores à coluna posicao) vêm primeiro e não quebram o cursor
+        last_id = self._column('adiada')[-1]
+        execute_update('UPDATE tarefas SET posicao = NULL WHERE id = ?', (last_id,))
+        try:
+            expected = self._column('adiada')
+            self.assertEqual(expected[0], last_id)
+            ids, cursor = [], None
+            while True:
+                params = {'status': 'adiada', 'limit': 2}
+                if cursor:
+                    params['cursor'] = cursor
+                response = self.client.get('/api/tasks/board', query_string=params)
+                data = response.get_json()['data']
+                self.assertEqual(list(data), ['adiada'])
+                ids += [t['id'] for t in data['adiada']['items']]
+                cursor = data['adiada']['next_cursor']
+                if cursor is None:
+                    break
+            self.assertEqual(ids, expected)
+        finally:
+            execute_update("UPDATE tarefas SET posicao = (SELECT MAX(posicao) FROM tarefas "
+                           "WHERE status = 'adiada') || 'V' WHERE id = ?", (last_id,))
+        print("   Cursor por coluna: OK")
+        
+        cursor = encode_cursor(['a0', 1])
+        self.assertEqual(self.client.get('/api/tasks/board', query_string={'cursor': cursor}).status_code, 400)
+        self.assertEqual(self.client.get('/api/tasks/board?status=arquivada').status_code, 400)
+        self.assertEqual(self.client.get('/api/tasks/board?status=adiada&cursor=xyz').status_code, 400)
+        self.assertEqual(self.client.get('/api/tasks/board?fields=senha').status_code, 400)
+        print("   Parâmetros inválidos: OK")
+
+    def test_29_task_history(self):
+        """Teste do histórico de tarefas concluídas (ordem, período e cursor)"""
+        print("\n[TEST] Verificando histórico de tarefas...")
+        
+        done = []
+        for day in (3, 1, 2, 1):
+            task = self._create_task(categoria='Historico')
+            task = Task.update(task['id'], {'status': 'concluida'})
+            self.assertIsNotNone(task['concluido_em'])
+            execute_update('UPDATE tarefas SET concluido_em = ? WHERE id = ?',
+                           (f'2031-09-0{day} 12:00:00', task['id']))
+            done.append(task['id'])
+        expected = [done[0], done[2], done[3], done[1]]   # concluido_em e id decrescentes
+        
+        page = Task.get_history({'categoria': 'Historico'}, 10, None, include_total=True)
+        self.assertEqual([t['id'] for t in page['items']], expected)
+        self.assertEqual(page['total'], 4)
+        self.assertFalse(any(t['arquivada'] for t in page['items']))
+        
+        ids, cursor = [], None
+        while True:
+            params = {'categoria': 'Historico', 'per_page': 3}
+            if cursor:
+                params['cursor'] = cursor
+            body = self.client.get('/api/tasks/history', query_string=params).get_json()
+            ids += [t['id'] for t in body['data']]
+            cursor = body['meta']['next_cursor']
+            if cursor is None:
+                break
+        self.assertEqual(ids, expected)
+        print("   Ordem e cursor: OK")
+        
+        # Período inclusivo; datas sem zero à esquerda são normalizadas
+        for start, end, result in (('2031-09-01', '2031-09-01', [done[3], done[1]]),
+                                   ('2031-09-2', '2031-9-3', [done[0], done[2]]),
+                                   ('2031-09-03', None, [done[0]])):
+            params = {'categoria': 'Historico', 'data_inicio': start}
+            if end:
+                params['data_fim'] = end
+            response = self.client.get('/api/tasks/history', query_string=params)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([t['id'] for t in response.get_json()['data']], result)
+        print("   Filtro por período: OK")
+        
+        for params in ({'data_inicio': '2031-13-01'}, {'data_fim': 'ontem'},
+                       {'data_inicio': '2031-09-03', 'data_fim': '2031-09-01'}):
+            response = self.client.get('/api/tasks/history', query_string=params)
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(response.get_json()['success'])
+        print("   Datas inválidas: OK")
+        
+        # Reabrir a tarefa tira do histórico
+        reopened = Task.update(done[0], {'status': 'pendente'})
+        self.assertIsNone(reopened['concluido_em'])
+        page = Task.get_history({'categoria': 'Historico'}, 10, None)
+        self.assertEqual([t['id'] for t in page['items']], expected[1:])
+        print("   Reabertura: OK")
+
+    def test_30_task_archive(self):
+        """Teste do arquivamento de tarefas (ida e volta, histórico, busca e estatísticas)"""
+        print("\n[TEST] Verificando arquivamento de tarefas...")
+        
+        task = self._create_task(categoria='Arquivo', titulo='Relatorio zanzibar', prioridade='alta')
+        task = Task.update(task['id'], {'status': 'concluida'})
+        execute_update("UPDATE tarefas SET concluido_em = '2000-01-01 08:00:00' WHERE id = ?", (task['id'],))
+        stats = Task.get_stats()
+        
+        self.assertEqual(TaskArchive.archive(30), 1)
+        self.assertEqual(TaskArchive.archive(30), 0)
+        self.assertIsNone(Task.get_by_id(task['id']))
+        
+        # As estatísticas continuam contando a tarefa, agora como arquivada
+        archived_stats = Task.get_stats()
+        self.assertEqual(archived_stats['arquivadas'], stats['arquivadas'] + 1)
+        self.assertEqual({k: v for k, v in archived_stats.items() if k != 'arquivadas'},
+                         {k: v for k, v in stats.items() if k != 'arquivadas'})
+        self.assertEqual(self.client.get('/api/dashboard/stats').get_json()['data']['tarefas'], archived_stats)
+        self.assertEqual(check_stat_counters(), [])
+        print("   Estatísticas após arquivar: OK")
+        
+        history = Task.get_history({'categoria': 'Arquivo'}, 10, None)['items']
+        self.assertEqual([(t['id'], t['arquivada']) for t in history], [(task['id'], True)])
+        self.assertEqual(history[0]['concluido_em'], '2000-01-01 08:00:00')
+        self.assertEqual([t['id'] for t in Search.query('zanzibar')['items']], [task['id']])
+        board = Task.get_board(1000)
+        self.assertNotIn(task['id'], [t['id'] for t in board['concluida']['items']])
+        print("   Histórico, busca e quadro: OK")
+        
+        response = self.client.post(f"/api/tasks/{task['id']}/unarchive")
+        self.assertEqual(response.status_code, 200)
+        restored = response.get_json()['data']
+        self.assertEqual((restored['id'], restored['status'], restored['concluido_em']),
+                         (task['id'], 'concluida', '2000-01-01 08:00:00'))
+        self.assertEqual(restored['versao'], task['versao'] + 1)
+        self.assertEqual(self._column('concluida')[-1], task['id'])
+        self.assertEqual(Task.get_stats(), stats)
+        self.assertEqual(check_stat_counters(), [])
+        self.assertIsNone(TaskArchive.unarchive(task['id']))
+        self.assertEqual(self.client.post(f"/api/tasks/{task['id']}/unarchive").status_code, 404)
+        print("   Desarquivamento: OK")
+        
+        # Bancos anteriores aos contadores do arquivo têm os contadores recalculados na inicialização
+        TaskArchive.archive(30)
+        execute_update("DROP TRIGGER trg_tarefas_arquivo_contadores_insert")
+        execute_update("DELETE FROM estatisticas_contadores WHERE escopo LIKE 'tarefas_arquivo%'")
+        self.assertNotEqual(check_stat_counters(), [])
+        init_database()
+        self.assertEqual(check_stat_counters(), [])
+        self.assertEqual(Task.get_stats(), archived_stats)
+        with self.assertRaises(ValueError):
+            TaskArchive.archive(-1)
+        print("   Migração dos contadores: OK")
+
+    def test_31_event_resume_ahead(self):
+        """Teste da retomada do feed com Last-Event-ID à frente do broker (outro processo)"""
+        print("\n[TEST] Verificando retomada do feed entre processos...")
+        
+        self._create_task(categoria='Retomada')
+        broker = events.EventBroker(config.DATABASE_PATH, 60, 100, 1)
+        broker._last_id = broker._floor = events._max_event_id()
+        self._create_task(categoria='Retomada')
+        self._create_task(categoria='Retomada')
+        newest = events._max_event_id()
+        seen = broker._last_id
+        self.assertGreater(newest, seen + 1)
+        
+        # O cliente já recebeu eventos que este broker ainda não publicou: sem reinício nem cursor menor
+        self.assertEqual(broker.wait(newest, 0.01), ([], newest, False))
+        print("   Id à frente sem reinício: OK")
+        
+        result = []
+        waiter = threading.Thread(target=lambda: result.append(broker.wait(seen + 1, 5)))
+        waiter.start()
+        rows = execute_query('SELECT id, tabela, registro_id, operacao FROM eventos WHERE id > ? ORDER BY id', (seen,))
+        broker._publish(rows)
+        waiter.join(5)
+        delivered, last, reset = result[0]
+        self.assertFalse(reset)
+        self.assertEqual([e['id'] for e in delivered], list(range(seen + 2, newest + 1)))
+        self.assertEqual(last, newest)
+        print("   Entrega após a verificação do broker, sem duplicatas: OK")
+        
+        # Só um id além do fim do log (ex.: banco recriado) leva ao reinício
+        self.assertEqual(broker.wait(newest + 100, 0.01), ([], newest, True))
+        print("   Reinício apenas além do log: OK")
+
+    def test_32_bulk_repeated_id(self):
+        """Teste de registros repetidos em um mesmo lote"""
+        print("\n[TEST] Verificando registros repetidos no lote...")
+        
+        task = self._create_task(titulo='Repetido', categoria='Repetido')
+        response = self.client.post('/api/tasks/bulk', json={'operations': [
+            {'op': 'update', 'id': task['id'], 'versao': task['versao'], 'data': {'titulo': 'Primeira'}},
+            {'op': 'update', 'id': task['id'], 'versao': task['versao'] + 1, 'data': {'titulo': 'Segunda'}},
+            {'op': 'delete', 'id': task['id'], 'versao': task['versao'] + 1}
+        ]})
+        self.assertEqual(response.status_code, 207)
+        body = response.get_json()
+        self.assertEqual([r['success'] for r in body['data']], [True, False, False])
+        self.assertIn('operação 0', body['data'][1]['errors'][0])
+        self.assertIn('operação 0', body['data'][2]['errors'][0])
+        stored = Task.get_by_id(task['id'])
+        self.assertEqual(stored['titulo'], 'Primeira')
+        self.assertEqual(stored['versao'], task['versao'] + 1)
+        print("   Tarefas: OK")
+        
+        appointment = self._create_appointment(titulo='Repetido', data='2030-02-10',
+                                               horario_inicio='10:00', horario_fim='11:00')
+        results = Appointment.bulk_apply([
+            {'op': 'delete', 'id': appointment['id']},
+            {'op': 'update', 'id': appointment['id'], 'data': {'titulo': 'Depois'}}
+        ])
+        self.assertEqual([r['success'] for r in results], [True, False])
+        self.assertIsNone(Appointment.get_by_id(appointment['id']))
+        print("   Compromissos: OK")
+
 if __name__ == '__main__':
     unittest.main()